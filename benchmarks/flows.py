@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Module for generating synthetic Flows for benchmarks
+
+make_wide_flow: A function to create a Flow with a single start, many independent steps and a single end
+make_flow_from_edges: A function to create a Flow from a dict of {step name: list of next step names}
+make_chain_edges: A function to create the edges of a single long chain of steps
+make_diamond_edges: A function to create the edges of diamonds joined one after another
+make_random_dag_edges: A function to create the edges of a random DAG
+"""
+import random
+
+from flowrunner import BaseFlow, end, start, step
+
+
+def _make_function(name: str, body):
+    """Function to create a method with a given name
+
+    Args:
+        name: A str value of the name of the method
+        body: A callable taking the Flow instance, the actual work done by the method
+
+    Returns:
+        method: A function with __name__ set to name
+    """
+
+    def method(self):
+        return body(self)
+
+    method.__name__ = name
+    method.__qualname__ = name
+    return method
+
+
+def make_wide_flow(name: str, width: int, body, module: str = __name__):
+    """Function to create a Flow with a single start, 'width' independent steps and a single end
+
+    Args:
+        name: A str value of the name of the Flow class
+        width: An int value of the number of independent middle steps
+        body: A callable taking the Flow instance, the work done by each middle step
+        module: A str value of the module the class belongs to, the class has to be an attribute of this module
+            for it to be picklable by the 'process' executor
+
+    Returns:
+        flow_class: A subclass of BaseFlow
+    """
+    middle_names = [f"step_{index}" for index in range(width)]
+    namespace = {"__module__": module, "__qualname__": name}
+    namespace["first"] = start(
+        step(_make_function("first", lambda self: None), next=middle_names)
+    )
+    for middle_name in middle_names:
+        namespace[middle_name] = step(_make_function(middle_name, body), next="last")
+    namespace["last"] = end(step(_make_function("last", lambda self: None)))
+    return type(name, (BaseFlow,), namespace)
+
+
+def make_flow_from_edges(name: str, edges: dict, body=None, module: str = __name__):
+    """Function to create a Flow from a dict of {step name: list of next step names}
+
+    Steps that are not in the next of any other step are decorated with 'start' and steps
+    without a next are decorated with 'end'
+
+    Args:
+        name: A str value of the name of the Flow class
+        edges: A dict of {step name: list of next step names}, in the order the steps are defined
+        body: An optional callable taking the Flow instance, the work done by each step, defaults to doing nothing
+        module: A str value of the module the class belongs to
+
+    Returns:
+        flow_class: A subclass of BaseFlow
+    """
+    body = body or (lambda self: None)
+    has_previous = {
+        next_name for next_names in edges.values() for next_name in next_names
+    }
+    namespace = {"__module__": module, "__qualname__": name}
+    for step_name, next_names in edges.items():
+        method = _make_function(step_name, body)
+        if next_names:
+            method = step(method, next=list(next_names))
+        else:
+            method = end(step(method))
+        if step_name not in has_previous:
+            method = start(method)
+        namespace[step_name] = method
+    return type(name, (BaseFlow,), namespace)
+
+
+def make_chain_edges(length: int) -> dict:
+    """Function to create the edges of a single long chain of steps
+
+    Args:
+        length: An int value of the number of steps, at least 3
+
+    Returns:
+        edges: A dict of {step name: list of next step names}
+    """
+    return {
+        f"step_{index}": [f"step_{index + 1}"] if index < length - 1 else []
+        for index in range(length)
+    }
+
+
+def make_diamond_edges(count: int) -> dict:
+    """Function to create the edges of diamonds joined one after another
+
+    Args:
+        count: An int value of the number of diamonds, each has 3 steps and shares its bottom step with the next
+
+    Returns:
+        edges: A dict of {step name: list of next step names}
+    """
+    edges = {}
+    for index in range(count):
+        edges[f"top_{index}"] = [f"left_{index}", f"right_{index}"]
+        edges[f"left_{index}"] = [f"top_{index + 1}"]
+        edges[f"right_{index}"] = [f"top_{index + 1}"]
+    edges[f"top_{count}"] = []
+    return edges
+
+
+def make_random_dag_edges(size: int, max_previous: int = 3, seed: int = 0) -> dict:
+    """Function to create the edges of a random DAG
+
+    Each step after the first gets between 1 and max_previous predecessors picked from the steps before it,
+    so every step can be reached from the first step and edges of different lengths lead to the same step
+
+    Args:
+        size: An int value of the number of steps
+        max_previous: An int value of the maximum number of predecessors of a step
+        seed: An int value of the seed for the random number generator
+
+    Returns:
+        edges: A dict of {step name: list of next step names}
+    """
+    generator = random.Random(seed)
+    edges = {f"step_{index}": [] for index in range(size)}
+    for index in range(1, size):
+        previous_count = generator.randint(1, min(max_previous, index))
+        for previous_index in generator.sample(range(index), previous_count):
+            edges[f"step_{previous_index}"].append(f"step_{index}")
+    return edges
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of building the Graph of large generated Flows
+
+We time GraphOptions and Graph construction, which arranges the nodes into levels, for a long chain,
+joined diamonds and a random DAG.
+
+Usage: python -m benchmarks.graph_build --size 10000
+"""
+import time
+
+import click
+
+from benchmarks.flows import (
+    make_chain_edges,
+    make_diamond_edges,
+    make_flow_from_edges,
+    make_random_dag_edges,
+)
+from flowrunner.core.base import Graph, GraphOptions
+
+
+def _time_graph_build(flow_class, repeat: int) -> float:
+    """Function to time building the Graph of a Flow class
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        repeat: An int value of the number of times to build it, we return the fastest
+
+    Returns:
+        elapsed: A float value of seconds taken by the fastest build
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        Graph(graph_options=GraphOptions(flow_class))
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+@click.command()
+@click.option("--size", default=10_000, help="Number of steps in each generated Flow")
+@click.option("--repeat", default=3, help="Number of runs, the fastest is reported")
+def main(size: int, repeat: int):
+    """Time Graph construction for generated Flows of the given size"""
+    flows = {
+        "chain": make_flow_from_edges("ChainFlow", make_chain_edges(size)),
+        "diamonds": make_flow_from_edges("DiamondFlow", make_diamond_edges(size // 3)),
+        "random_dag": make_flow_from_edges("RandomFlow", make_random_dag_edges(size)),
+    }
+    for flow_name, flow_class in flows.items():
+        elapsed = _time_graph_build(flow_class, repeat)
+        click.secho(f"{flow_name} ({size} steps): {elapsed * 1000:.1f}ms", fg="blue")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the time taken to import flowrunner, with a budget
+
+We run 'python -X importtime -c "import <module>"' in a new interpreter a few times and keep the fastest run, so
+the time of a cold start is measured every time. The slowest modules imported along with it are printed, and
+the command exits with 1 if the import takes longer than the budget.
+
+Heavy dependencies (pandas, matplotlib, IPython, jinja2, cookiecutter, coloredlogs) are imported only when they are
+used, so they should never show up here.
+
+Usage: python -m benchmarks.import_time --module flowrunner.cli --budget-ms 300
+"""
+import subprocess
+import sys
+
+import click
+
+# modules that 'import flowrunner' and the cli must not import, they are loaded when they are used
+HEAVY_MODULES = (
+    "pandas",
+    "matplotlib",
+    "IPython",
+    "jinja2",
+    "cookiecutter",
+    "coloredlogs",
+)
+
+
+def parse_importtime(output: str) -> dict:
+    """Function to parse the output of 'python -X importtime'
+
+    Args:
+        output: A str value of the stderr of the interpreter
+
+    Returns:
+        timings: A dict of {module name: cumulative microseconds}
+    """
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = int(cumulative)
+    return timings
+
+
+def measure_import(module: str = "flowrunner") -> dict:
+    """Function to import a module in a new interpreter and get the time taken by each module it imported
+
+    Args:
+        module: A str value of the module to import
+
+    Returns:
+        timings: A dict of {module name: cumulative microseconds}
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(process.stderr)
+
+
+@click.command()
+@click.option(
+    "--module", default="flowrunner.cli", show_default=True, help="Module to import"
+)
+@click.option(
+    "--budget-ms",
+    default=300,
+    show_default=True,
+    help="Maximum milliseconds the import can take",
+)
+@click.option(
+    "--repeat",
+    default=5,
+    show_default=True,
+    help="Number of imports, the fastest is kept",
+)
+@click.option(
+    "--top", default=15, show_default=True, help="Number of slowest modules to print"
+)
+def main(module: str, budget_ms: int, repeat: int, top: int):
+    """Time 'import MODULE' in a new interpreter and check it is within the budget"""
+    timings = min(
+        (measure_import(module) for _ in range(repeat)),
+        key=lambda result: result[module],
+    )
+    for name in sorted(timings, key=timings.get, reverse=True)[:top]:
+        click.secho(f"{timings[name] / 1000:>10.1f}ms  {name}", fg="blue")
+
+    heavy = [name for name in timings if name.split(".")[0] in HEAVY_MODULES]
+    elapsed_ms = timings[module] / 1000
+    click.secho(
+        f"\nimport {module}: {elapsed_ms:.1f}ms (budget {budget_ms}ms)", fg="green"
+    )
+    if heavy:
+        click.secho(f"Heavy modules imported: {', '.join(heavy)}", fg="bright_red")
+    if elapsed_ms > budget_ms or heavy:
+        click.secho("Import budget exceeded", fg="bright_red")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
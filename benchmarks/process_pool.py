@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the 'process' executor against the 'thread' executor and a sequential run
+
+We run a wide Flow of CPU bound steps that hold the GIL, so threads cannot run them in parallel.
+
+Usage: python -m benchmarks.process_pool --width 8 --workers 4 --size 2000000
+"""
+import os
+import time
+
+import click
+
+from benchmarks.flows import make_wide_flow
+
+SIZE = int(os.environ.get("FLOWRUNNER_BENCHMARK_SIZE", 2_000_000))
+
+
+def sum_of_squares(self):
+    """CPU bound work in pure Python"""
+    return sum(number * number for number in range(self.param_store["size"]))
+
+
+WideCPUFlow = make_wide_flow(
+    "WideCPUFlow", width=8, body=sum_of_squares, module=__name__
+)
+
+
+def _time_run(flow_class, size: int, **run_kwargs) -> float:
+    """Function to time a single run of a Flow
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        size: An int value of the amount of work done in each step
+        run_kwargs: Keyword arguments passed to BaseFlow.run
+
+    Returns:
+        elapsed: A float value of seconds taken
+    """
+    flow_instance = flow_class(param_store={"size": size})
+    start_time = time.perf_counter()
+    flow_instance.run(**run_kwargs)
+    return time.perf_counter() - start_time
+
+
+@click.command()
+@click.option("--width", default=8, help="Number of independent CPU bound steps")
+@click.option("--workers", default=os.cpu_count(), help="Number of workers")
+@click.option("--size", default=SIZE, help="Amount of work in each step")
+def main(width: int, workers: int, size: int):
+    """Compare sequential, thread and process runs of a wide CPU bound Flow"""
+    global WideCPUFlow  # pylint: disable=global-statement
+    WideCPUFlow = make_wide_flow(
+        "WideCPUFlow", width=width, body=sum_of_squares, module=__name__
+    )
+
+    sequential = _time_run(WideCPUFlow, size)
+    threads = _time_run(WideCPUFlow, size, max_workers=workers)
+    processes = _time_run(WideCPUFlow, size, max_workers=workers, executor="process")
+
+    click.secho(f"width={width} workers={workers} size={size}", fg="green")
+    click.secho(f"sequential: {sequential:.3f}s", fg="blue")
+    click.secho(f"thread:     {threads:.3f}s (x{sequential / threads:.2f})", fg="blue")
+    click.secho(
+        f"process:    {processes:.3f}s (x{sequential / processes:.2f})", fg="blue"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of passing large DataFrames to worker processes through shared memory against pickling them
+
+A start step creates a DataFrame of float columns, four steps read it in worker processes and an end step
+sums their outputs. Without shared memory the DataFrame is pickled for each of the four steps, with shared
+memory it is copied once and mapped by the workers.
+
+Usage: python -m benchmarks.shared_memory --size-mb 1024 --workers 4
+"""
+import os
+import time
+
+import click
+import numpy as np
+import pandas as pd
+
+from flowrunner import BaseFlow, end, start, step
+
+COLUMNS = 8
+
+
+class LargeFrameFlow(BaseFlow):
+    """Flow passing a large DataFrame from a single step to four steps"""
+
+    @start
+    @step(next=["read_0", "read_1", "read_2", "read_3"])
+    def create(self):
+        rows = self.param_store["size_mb"] * 1024**2 // (COLUMNS * 8)
+        return pd.DataFrame(
+            {
+                f"column_{index}": np.full(rows, index, dtype="float64")
+                for index in range(COLUMNS)
+            }
+        )
+
+    @step(next=["last"])
+    def read_0(self):
+        return float(self.data_store["create"]["column_0"].sum())
+
+    @step(next=["last"])
+    def read_1(self):
+        return float(self.data_store["create"]["column_1"].sum())
+
+    @step(next=["last"])
+    def read_2(self):
+        return float(self.data_store["create"]["column_2"].sum())
+
+    @step(next=["last"])
+    def read_3(self):
+        return float(self.data_store["create"]["column_3"].sum())
+
+    @end
+    @step
+    def last(self):
+        return sum(self.data_store[f"read_{index}"] for index in range(4))
+
+
+def _time_run(size_mb: int, **run_kwargs) -> float:
+    """Function to time a single run of LargeFrameFlow
+
+    Args:
+        size_mb: An int value of the size of the DataFrame in MB
+        run_kwargs: Keyword arguments passed to BaseFlow.run
+
+    Returns:
+        elapsed: A float value of seconds taken
+    """
+    flow_instance = LargeFrameFlow(param_store={"size_mb": size_mb})
+    start_time = time.perf_counter()
+    flow_instance.run(executor="process", **run_kwargs)
+    return time.perf_counter() - start_time
+
+
+@click.command()
+@click.option("--size-mb", default=1024, help="Size of the DataFrame in MB")
+@click.option("--workers", default=os.cpu_count(), help="Number of worker processes")
+def main(size_mb: int, workers: int):
+    """Compare pickling a large DataFrame for each worker with sharing it through shared memory"""
+    pickled = _time_run(size_mb, max_workers=workers)
+    shared = _time_run(size_mb, max_workers=workers, shared_memory=True)
+
+    click.secho(f"size={size_mb}MB workers={workers}", fg="green")
+    click.secho(f"pickle:        {pickled:.3f}s", fg="blue")
+    click.secho(f"shared memory: {shared:.3f}s (x{pickled / shared:.2f})", fg="blue")
+
+
+if __name__ == "__main__":
+    main()
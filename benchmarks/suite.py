@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""Benchmark suite of building, validating, running and rendering generated Flows, with JSON baselines
+
+For each shape of Flow (wide fan-out, long chain, joined diamonds and a random DAG) and each size we time:
+- graph_build: GraphOptions and Graph construction
+- validate: GraphValidator.run_validations on a Graph that has not been validated yet
+- render: DAGGenerator.dag, without saving the file
+- render_svg: DAGGenerator.svg, the layout and drawing of the DAG in Python
+- run: FlowRunner.run with no-op steps one after another, the overhead of the runner for each node
+- run_threads: FlowRunner.run with no-op steps in 4 threads, the overhead of the DependencyScheduler
+- run_sleep: FlowRunner.run with steps sleeping 1ms in 8 threads
+The runs are only timed for sizes up to --max-run-size, as they take much longer than the rest.
+
+Each benchmark is run --repeat times and the fastest time is kept, results are written to a JSON file which can
+be kept as a baseline and compared with a later run. A benchmark is a regression if it is slower than the baseline
+by more than --threshold, and by more than --min-difference so that timings of a few microseconds are not flagged.
+
+The reference baseline is benchmarks/baseline.json, which 'make benchmark' compares with. Timings depend on the
+machine, so record a baseline on the machine the comparisons run on with 'make benchmark-baseline'.
+
+Usage:
+    python -m benchmarks.suite run --output benchmarks/baseline.json
+    python -m benchmarks.suite run --sizes 10,100,1000 --output current.json --baseline benchmarks/baseline.json
+    python -m benchmarks.suite compare benchmarks/baseline.json current.json --threshold 0.2
+"""
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import click
+
+from benchmarks.flows import (
+    make_chain_edges,
+    make_diamond_edges,
+    make_flow_from_edges,
+    make_random_dag_edges,
+    make_wide_flow,
+)
+from flowrunner.core.base import Graph, GraphOptions
+from flowrunner.core.helpers import DAGGenerator, GraphValidator
+from flowrunner.system.logger import logger
+
+DEFAULT_SIZES = (10, 100, 1000, 10_000)
+SLEEP_SECONDS = 0.001
+SHAPES = ("wide", "chain", "diamonds", "random_dag")
+
+
+def no_op(self):
+    """Step doing nothing, to measure the overhead of the runner"""
+    return None
+
+
+def sleep(self):
+    """Step waiting without using the CPU, to measure how well the workers are kept busy"""
+    time.sleep(SLEEP_SECONDS)
+
+
+def make_flow(shape: str, size: int, body=no_op):
+    """Function to create a Flow of a given shape with about 'size' steps
+
+    Args:
+        shape: A str value of 'wide', 'chain', 'diamonds' or 'random_dag'
+        size: An int value of the number of steps
+        body: A callable taking the Flow instance, the work done by each step
+
+    Returns:
+        flow_class: A subclass of BaseFlow
+    """
+    name = f"{shape.title().replace('_', '')}Flow{size}"
+    if shape == "wide":
+        return make_wide_flow(name, width=size - 2, body=body)
+    if shape == "chain":
+        edges = make_chain_edges(size)
+    elif shape == "diamonds":
+        edges = make_diamond_edges((size - 1) // 3)
+    elif shape == "random_dag":
+        edges = make_random_dag_edges(size)
+    else:
+        raise ValueError(f"shape can only be one of {SHAPES}, got '{shape}'")
+    return make_flow_from_edges(name, edges, body=body)
+
+
+def time_function(function, repeat: int) -> float:
+    """Function to time a function
+
+    Args:
+        function: A callable without arguments
+        repeat: An int value of the number of times to call it
+
+    Returns:
+        elapsed: A float value of seconds taken by the fastest call
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def _validate(graph: Graph):
+    """Function to validate a Graph, the stored results are cleared so the validations run again"""
+    graph.validation_results = None
+    GraphValidator(graph).run_validations(terminal_output=False)
+
+
+def run_suite(sizes: list, repeat: int = 3, max_run_size: int = 1000) -> dict:
+    """Function to run every benchmark for every shape and size
+
+    Args:
+        sizes: A list of int values of the number of steps in the generated Flows
+        repeat: An int value of the number of times each benchmark is run, the fastest is kept
+        max_run_size: An int value of the largest size the runs are timed for
+
+    Returns:
+        results: A dict of {'<benchmark>/<shape>/<size>': {'seconds': float, 'per_node_us': float}}
+    """
+    results = {}
+
+    def record(benchmark: str, shape: str, size: int, function, nodes: int):
+        seconds = time_function(function, repeat)
+        results[f"{benchmark}/{shape}/{size}"] = {
+            "seconds": seconds,
+            "per_node_us": seconds / nodes * 1_000_000,
+        }
+        click.secho(
+            f"{benchmark:<12} {shape:<11} {size:>6}  {seconds * 1000:>10.2f}ms",
+            fg="blue",
+        )
+
+    for size in sizes:
+        for shape in SHAPES:
+            flow_class = make_flow(shape, size)
+            flow_instance = flow_class()  # builds and stores the Graph of the class
+            graph = flow_instance.graph
+            nodes = len(graph.nodes)
+            record(
+                "graph_build",
+                shape,
+                size,
+                lambda: Graph(graph_options=GraphOptions(flow_class)),
+                nodes,
+            )
+            record("validate", shape, size, lambda: _validate(graph), nodes)
+            record(
+                "render", shape, size, lambda: DAGGenerator.dag(flow_instance), nodes
+            )
+            record(
+                "render_svg",
+                shape,
+                size,
+                lambda: DAGGenerator.svg(flow_instance),
+                nodes,
+            )
+            if size > max_run_size:
+                continue
+            record("run", shape, size, lambda: flow_class().run(), nodes)
+            record(
+                "run_threads",
+                shape,
+                size,
+                lambda: flow_class().run(max_workers=4),
+                nodes,
+            )
+            sleep_flow_class = make_flow(shape, size, body=sleep)
+            record(
+                "run_sleep",
+                shape,
+                size,
+                lambda: sleep_flow_class().run(max_workers=8),
+                nodes,
+            )
+    return results
+
+
+def save_results(results: dict, path: str, repeat: int):
+    """Function to write benchmark results to a JSON file
+
+    Args:
+        results: A dict returned by run_suite
+        path: A str value of the path of the file
+        repeat: An int value of the number of times each benchmark was run
+
+    Returns:
+        None
+    """
+    content = {
+        "metadata": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    with open(path, mode="w", encoding="utf-8") as json_file:
+        json.dump(content, json_file, indent=4)
+
+
+def load_results(path: str) -> dict:
+    """Function to read the results written by save_results
+
+    Args:
+        path: A str value of the path of the file
+
+    Returns:
+        results: A dict of {'<benchmark>/<shape>/<size>': {'seconds': float, 'per_node_us': float}}
+    """
+    with open(path, encoding="utf-8") as json_file:
+        return json.load(json_file)["results"]
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = 0.2, min_difference: float = 0.001
+) -> list:
+    """Function to compare benchmark results with a baseline
+
+    Args:
+        baseline: A dict of results of the baseline
+        current: A dict of results to compare
+        threshold: A float value of the fraction a benchmark can be slower than the baseline by eg. 0.2 for 20%
+        min_difference: A float value of seconds a benchmark has to be slower by to be a regression
+
+    Returns:
+        comparisons: A list of tuples of (benchmark, baseline seconds, current seconds, ratio, regression) for the
+            benchmarks in both results
+    """
+    comparisons = []
+    for benchmark in sorted(baseline.keys() & current.keys()):
+        baseline_seconds = baseline[benchmark]["seconds"]
+        current_seconds = current[benchmark]["seconds"]
+        ratio = current_seconds / baseline_seconds if baseline_seconds else float("inf")
+        regression = (
+            ratio > 1 + threshold
+            and current_seconds - baseline_seconds > min_difference
+        )
+        comparisons.append(
+            (benchmark, baseline_seconds, current_seconds, ratio, regression)
+        )
+    return comparisons
+
+
+def show_comparisons(comparisons: list) -> bool:
+    """Function to print the comparisons of benchmark results
+
+    Args:
+        comparisons: A list returned by compare_results
+
+    Returns:
+        A bool value, True if any benchmark is a regression
+    """
+    for benchmark, baseline_seconds, current_seconds, ratio, regression in comparisons:
+        if regression:
+            color = "bright_red"
+        elif ratio < 1:
+            color = "green"
+        else:
+            color = "blue"
+        click.secho(
+            f"{benchmark:<32} {baseline_seconds * 1000:>10.2f}ms {current_seconds * 1000:>10.2f}ms"
+            f"   x{ratio:.2f}{'   REGRESSION' if regression else ''}",
+            fg=color,
+        )
+    regressions = sum(comparison[-1] for comparison in comparisons)
+    if regressions:
+        click.secho(f"\n{regressions} regression(s) found", fg="bright_red")
+    else:
+        click.secho("\nNo regressions found", fg="green")
+    return bool(regressions)
+
+
+@click.group()
+@click.option(
+    "--log-level",
+    default="ERROR",
+    show_default=True,
+    help="Level of the flowrunner logger, the debug messages of every node would be timed along with it",
+)
+def main(log_level: str):
+    """Benchmark suite of flowrunner"""
+    logger.setLevel(log_level)
+
+
+@main.command()
+@click.option(
+    "--sizes",
+    default=",".join(str(size) for size in DEFAULT_SIZES),
+    show_default=True,
+    help="Comma separated numbers of steps in the generated Flows",
+)
+@click.option(
+    "--repeat", default=3, show_default=True, help="Number of runs, the fastest is kept"
+)
+@click.option(
+    "--max-run-size",
+    default=1000,
+    show_default=True,
+    help="Largest size the runs of the Flows are timed for",
+)
+@click.option(
+    "--output",
+    default="benchmark_results.json",
+    show_default=True,
+    help="JSON file to write the results to",
+)
+@click.option(
+    "--baseline",
+    default=None,
+    help="JSON file of a baseline to compare the results with",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Fraction slower than the baseline to flag",
+)
+def run(
+    sizes: str,
+    repeat: int,
+    max_run_size: int,
+    output: str,
+    baseline: str,
+    threshold: float,
+):
+    """Run the benchmark suite and write the results"""
+    results = run_suite(
+        [int(size) for size in sizes.split(",")],
+        repeat=repeat,
+        max_run_size=max_run_size,
+    )
+    save_results(results, output, repeat)
+    click.secho(f"\nResults written to {output}", fg="green")
+    if baseline and show_comparisons(
+        compare_results(load_results(baseline), results, threshold=threshold)
+    ):
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("baseline")
+@click.argument("current")
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Fraction slower than the baseline to flag",
+)
+@click.option(
+    "--min-difference",
+    default=0.001,
+    show_default=True,
+    help="Seconds a benchmark has to be slower by to be flagged",
+)
+def compare(baseline: str, current: str, threshold: float, min_difference: float):
+    """Compare the results in CURRENT with BASELINE, exits with 1 if there are regressions"""
+    comparisons = compare_results(
+        load_results(baseline),
+        load_results(current),
+        threshold=threshold,
+        min_difference=min_difference,
+    )
+    if show_comparisons(comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
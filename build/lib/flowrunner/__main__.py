@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""This module is used to expose the cli commands
+to user"""
+
+from flowrunner.cli import cli
+
+if __name__ == "__main__":
+    cli()
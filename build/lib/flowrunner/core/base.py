@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""Module with base classes for use in other modules
+
+Node: A class for containing functions, with the function name, actual function reference, docstring and its next functions
+GraphOptions: A class for all the options to be given to Graph, a collection of start, middle and end nodes
+Graph: A class containing an arranged collection of Nodes from start, middle, end in Graph.levels
+"""
+from dataclasses import dataclass
+from typing import Type
+
+from flowrunner.system.exceptions import CyclicFlowException
+from flowrunner.system.logger import logger
+
+
+@dataclass
+class Node:
+    """A class for containing functions, with the function name, actual function reference, docstring and
+    its next functions
+
+    Attributes:
+        name: A str value of the name of the function __name__
+        function_reference: The actual function or callable
+        next: None by default, list value of what is next node, assigned in __post_init__
+        docstring: Docstring of method assigned in __post_init__
+        is_async: A bool value, True if the function is an 'async def' function, assigned in __post_init__
+        cache: A bool value, True if the output of the function is cached with @step(cache=True), assigned in __post_init__
+        pin: A bool value, True if the output of the function is kept with @step(pin=True), assigned in __post_init__
+        profile: A bool value, True if the function is profiled with @step(profile=True), assigned in __post_init__
+    """
+
+    name: str
+    function_reference: callable
+
+    def __post_init__(self):
+        """In post init we get the next node if
+        its present.
+
+        We make sure that 'next' keyword argument is passed as either a single 'str' or 'list'. If
+        next is None then we just assign an empty list as 'next' attribute
+
+        Raises:
+            - If more than 1 type of element found in 'next' keyword argument. Only a single string referencing a
+                function or a list of strings referencing functions are accepted
+        """
+        # store the __doc__ as attribute docstring
+        self.docstring = self.function_reference.__doc__
+        self.is_async = getattr(self.function_reference, "is_async", False)
+        self.cache = getattr(self.function_reference, "cache", False)
+        self.pin = getattr(self.function_reference, "pin", False)
+        self.profile = getattr(self.function_reference, "profile", False)
+        # if next has value
+        if self.function_reference.next:
+            if isinstance(self.function_reference.next, list):
+                # iterate over each elment in the list and peform checks on them
+                # we stop these errors at Node level as they can break the GraphOptions and Graph objects
+                for next_node in self.function_reference.next:
+                    if not isinstance(
+                        next_node, str
+                    ):  # if its not string raise a Type Error
+                        raise TypeError(
+                            f"Elements of 'next' can only be 'str' type, found {type(next_node)} for {next_node}"
+                        )
+                    if (
+                        self.function_reference.next.count(next_node) > 1
+                    ):  # if the count it means its a duplicate next node
+                        raise ValueError(
+                            f"'next' values are not unique, got duplicate values for '{next_node}'"
+                        )
+
+                self.next = self.function_reference.next
+            elif isinstance(self.function_reference.next, str):
+                # we make sure that the next is put in a list
+                self.next = [self.function_reference.next]
+
+            else:  # We do not allow any other types other than list and str
+                raise TypeError(
+                    f"'next' value can only be 'list of str' or 'str', found: {type(self.function_reference.next)}"
+                )
+        else:
+            self.next = []
+
+        # check if method name in next is same as current
+        if self.next:  # only if next list if full. ie. Only for start and middle
+            bad_next_list = [
+                next_callable
+                for next_callable in self.function_reference.next
+                if self.name == next_callable
+            ]
+            if bad_next_list:
+                raise ValueError(
+                    f"Value for next cannot be same as method {self.name}.next={bad_next_list}"
+                )
+
+    def __repr__(self):
+        """String representation of this node, which will be actual function
+        name
+
+        Returns:
+            - A string representation of the Node instance
+
+        Examples:
+            >>> node_example Node('some_func', some_func)
+            some_func
+        """
+        return self.name
+
+    def __hash__(self):
+        """Method to make sure we hash on the function/method name
+        We expect the function/method names to be unique
+        """
+        return hash(self.name)
+
+
+# class to handle the seperation of functions
+@dataclass
+class GraphOptions:
+    """A class for all the options to be given to Graph, a collection of start, middle and end nodes
+
+    We only take base_flow argument, the rest of the attributes are assigned in the __post_init__. We iterate over
+    all the methods in the class and arrange them according to 'start', 'step', 'end' as per the decorators.
+
+    Attributes:
+        base_flow: A subclass of BaseFlow
+        functions: A dictionary of {'test_1': <function Test.test_1 at 0x000002390259E9D0>} using inbuilt __dict__ method
+        middle_nodes: A list of middle nodes i.e methods with only 'step' and no 'start' and 'end' decorator
+        start: A list of middle nodes i.e methods with 'start' decorator
+        end: A list of middle nodes i.e methods with 'end' decorator
+        base_flow_instance: An instance of base_flow we use later to run flows
+    """
+
+    # list of functions/module
+    base_flow: Type
+
+    def __post_init__(self):
+        """Method to assign some attributes for the BaseFlow.
+
+        We assign the following attributes
+
+        Attributes:
+            functions: A dictionary of {'test_1': <function Test.test_1 at 0x000002390259E9D0>} using inbuilt __dict__ method
+            middle_nodes: A list of middle nodes i.e methods with only 'step' and no 'start' and 'end' decorator
+            start: A list of middle nodes i.e methods with 'start' decorator
+            end: A list of middle nodes i.e methods with 'end' decorator
+            base_flow_instance: An instance of base_flow we use later to run flows
+
+        Returns:
+            A string representation of the class
+
+        Examples:
+            >>> print(graph_options_instance)
+            Start=['method_1']
+            Middle Nodes=['method_2']
+            End=['method_3']
+
+        """
+        self.functions = (
+            self.base_flow.__dict__
+        )  # returns a dict of method name and actual reference {'test_1': <function Test.test_1 at 0x000002390259E9D0>}
+        self.middle_nodes = (
+            []
+        )  # list to store any methods that have 'step' decorator but NO 'start' or 'end'
+        self.start = []  # list to store any methods that have 'start' decorator
+        self.end = []  # list to store any methods that have 'end' decorator
+
+        # iterate over list of functions/methods of the class, we do a check to make sure that it is a callable.
+        # if it is a callable we make distinctions based on attributes. 'is_step', 'is_end' and 'is_start'. Following conditions classify them
+        # IF 'is_step' NO 'is_start' NO 'is_end' THEN 'middle_nodes'
+        # IF 'is_step' YES 'is_start' NO 'is_end' THEN 'start'
+        # IF 'is_step' NO 'is_start' YES 'is_end' THEN 'end'
+        for name_func, func in self.functions.items():
+            if callable(func):
+                # we check if it has 'is_step' in the attribute
+                # then we do other checks on it
+                if hasattr(func, "is_step"):
+                    # START NODES
+                    if hasattr(func, "is_start") and not hasattr(
+                        func, "is_end"
+                    ):  # IF 'is_step'== YES 'is_start'== NO 'is_end' THEN 'start'
+                        self.start.append(Node(name_func, func))
+
+                    # MIDDLE NODES
+                    elif not hasattr(func, "is_start") and not hasattr(
+                        func, "is_end"
+                    ):  # IF 'is_step'== YES AND 'is_start' NO 'is_end' == NO THEN 'middle_nodes'
+                        self.middle_nodes.append(Node(name_func, func))
+
+                    elif hasattr(func, "is_start") and hasattr(
+                        func, "is_end"
+                    ):  # edge case if has step and start and end
+                        raise ValueError(f"Not cannot have both start and end, {func}")
+
+                    # END NODES
+                    elif hasattr(func, "is_end") and not hasattr(
+                        func, "is_start"
+                    ):  # IF 'is_step' == YES AND 'is_end'==YES THEN 'end'
+                        self.end.append(Node(name_func, func))
+                        if func.next:
+                            raise ValueError(
+                                f"End nodes cannot have next attribute {func}"
+                            )  # check if there is next attribute, if it is, then raise an error
+
+    def __repr__(self):
+        """String representation of class
+
+        Returns:
+            A string representation of the GraphOptions instance
+
+        Examples:
+            >>> print(graph_options_instance)
+            Start=['method_1']
+            Middle Nodes=['method_2']
+            End=['method_3']
+
+        """
+        return f"Start={self.start}\nMiddle Nodes={self.middle_nodes}\nEnd={self.end}"
+
+
+@dataclass
+class Graph:
+    """A class containing an arranged collection of Nodes from start, middle, end in Graph.levels
+
+    Attributes:
+        graph_options: An instance of GraphOptions class
+        start: A list of start nodes, we take this from GraphOptions.start, A list of nodes decorated with @start
+        middle_nodes: A list of middle nodes, we take this from GraphOptions.middle_nodes, A list of nodes decorated with @step only
+        end: A list of end nodes, we take this from GraphOptions.end, A list of nodes decorated with @end
+        nodes: A list of all the nodes start + middle_nodes + end
+        node_map: A dict of {node.name: node} for reference for later
+        levels: A list containing the iteration order for methods from start -> middle_nodes -> end
+        validation_results: None until the Graph is validated, then a list of (test_result, output_message) tuples
+            stored by GraphValidator so that the checks are not run again
+    """
+
+    graph_options: GraphOptions
+
+    def __post_init__(self):
+        """Method to arrange the start, middle and end nodes.
+
+        In addition to arranging the nodes as per their order of iteration
+
+        Graph.levels = [
+            ['method_1'], # start nodes
+            ['method_2', 'method_3'], # middle nodes
+            ['method_4'] # end nodes
+        ]
+        In addition, we assign the following attributes.
+
+        Attributes:
+            start: A list of start nodes, we take this from GraphOptions.start, A list of nodes decorated with @start
+            middle_nodes: A list of middle nodes, we take this from GraphOptions.middle_nodes, A list of nodes decorated with @step only
+            end: A list of end nodes, we take this from GraphOptions.end, A list of nodes decorated with @end
+            nodes: A list of all the nodes start + middle_nodes + end
+            node_map: A dict of {node.name: node} for reference for later
+
+        """
+        self.start = self.graph_options.start
+        self.middle_nodes = self.graph_options.middle_nodes
+        self.end = self.graph_options.end
+        self.nodes = self.start + self.middle_nodes + self.end
+        self.node_map = {node.name: node for node in self.nodes}
+        self.levels = []
+        self.validation_results = None
+        self._arrange_graph()
+
+    def _arrange_graph(self):
+        """Method to arrange the Nodes in the Graph into the order of iteration
+
+        We assume that start will be the root node. We find all the nodes reachable from the start nodes
+        and count the number of predecessors (in-degree) of each of them. Then we take nodes in topological
+        order (Kahn's algorithm), a node is only taken once all of its predecessors are, and place it one
+        level below the deepest of its predecessors. This means each node is placed exactly once, at the
+        length of the longest path to it, even when it can be reached by paths of different lengths.
+
+        This runs in O(V+E) and nodes in the same level keep the order they are defined in the class.
+
+        Raises:
+            CyclicFlowException: In case the flow is cycle, for example if a node points to a node before it
+        """
+        # TODO: Maybe in the future there may be a need to add 'end' node or a later node in 'middle_nodes' to the 'next' of 'start'. Need to add
+        # check to remove any function in end and mentioned in middle nodes
+        # find all the nodes reachable from the start nodes
+        reachable = set(self.start)
+        to_visit = list(self.start)
+        while to_visit:
+            node = to_visit.pop()
+            for next_node_name in node.next:
+                next_node = self.node_map[next_node_name]
+                if next_node not in reachable:
+                    reachable.add(next_node)
+                    to_visit.append(next_node)
+
+        # count the predecessors of each reachable node
+        in_degrees = {node: 0 for node in reachable}
+        for node in reachable:
+            for next_node_name in node.next:
+                in_degrees[self.node_map[next_node_name]] += 1
+
+        depths = {node: 0 for node in reachable}
+        ready = [
+            node for node in self.nodes if node in reachable and in_degrees[node] == 0
+        ]
+        arranged = []  # nodes in topological order
+        while ready:
+            node = ready.pop()
+            arranged.append(node)
+            for next_node_name in node.next:
+                next_node = self.node_map[next_node_name]
+                depths[next_node] = max(depths[next_node], depths[node] + 1)
+                in_degrees[next_node] -= 1
+                if in_degrees[next_node] == 0:
+                    ready.append(next_node)
+
+        # if we could not take all the nodes, the ones left are waiting on each other
+        if len(arranged) != len(reachable):
+            cyclic_node = next(
+                node
+                for node in self.nodes
+                if node in reachable and in_degrees[node] > 0
+            )
+            logger.error("node=%s is cyclic", cyclic_node)
+            raise CyclicFlowException(f"DAG is cyclic due to node={cyclic_node}")
+
+        # group the nodes by depth, we go over self.nodes so each level keeps the order of definition
+        self.levels = [[] for _ in range(max(depths.values(), default=-1) + 1)]
+        for node in self.nodes:
+            if node in depths:
+                self.levels[depths[node]].append(node)
+
+    def get_previous(self) -> dict:
+        """Method to get the previous nodes of each node, i.e the nodes that have it in their 'next'
+
+        Returns:
+            previous: A dict of {node.name: list of str values of previous node names}
+        """
+        previous = {node.name: [] for node in self.nodes}
+        for node in self.nodes:
+            for next_node in node.next:
+                previous[next_node].append(node.name)
+        return previous
+
+    def get_upstream(self, node_names: list) -> set:
+        """Method to get the names of all the nodes that come before the given nodes
+
+        We follow the 'next' edges backwards from each of the given nodes, so the result contains
+        every node whose output can be read by them. The given nodes themselves are not included
+        unless they come before another given node.
+
+        Args:
+            node_names: A list of str values of node names
+
+        Returns:
+            upstream: A set of str values of node names
+        """
+        previous = self.get_previous()
+        upstream = set()
+        to_visit = [
+            previous_node
+            for node_name in node_names
+            for previous_node in previous[node_name]
+        ]
+        while to_visit:
+            node_name = to_visit.pop()
+            if node_name not in upstream:
+                upstream.add(node_name)
+                to_visit.extend(previous[node_name])
+        return upstream
+
+    def get_downstream(self, node_names: list) -> set:
+        """Method to get the names of all the nodes that come after the given nodes
+
+        We follow the 'next' edges from each of the given nodes, so the result contains every node
+        that can read their output. The given nodes themselves are not included unless they come
+        after another given node.
+
+        Args:
+            node_names: A list of str values of node names
+
+        Returns:
+            downstream: A set of str values of node names
+        """
+        downstream = set()
+        to_visit = [
+            next_node
+            for node_name in node_names
+            for next_node in self.node_map[node_name].next
+        ]
+        while to_visit:
+            node_name = to_visit.pop()
+            if node_name not in downstream:
+                downstream.add(node_name)
+                to_visit.extend(self.node_map[node_name].next)
+        return downstream
+
+    def get_critical_path(self, durations: dict) -> list:
+        """Method to get the critical path of the Graph, i.e the path through the 'next' edges that takes the longest
+
+        We go through Graph.levels, which is in topological order, and for each node keep the longest time it
+        takes to finish it including the nodes before it. The critical path is followed back from the node that
+        finishes last. Shortening any other node does not make the whole Flow finish sooner.
+
+        Args:
+            durations: A dict of {node.name: seconds}, nodes that are missing take 0 seconds
+
+        Returns:
+            critical_path: A list of str values of node names, from a start node to an end node
+        """
+        previous = self.get_previous()
+        finish_times = {}
+        slowest_previous = {}
+        for level in self.levels:
+            for node in level:
+                slowest = max(
+                    (name for name in previous[node.name] if name in finish_times),
+                    key=finish_times.get,
+                    default=None,
+                )
+                slowest_previous[node.name] = slowest
+                finish_times[node.name] = durations.get(node.name, 0) + (
+                    finish_times[slowest] if slowest is not None else 0
+                )
+        if not finish_times:
+            return []
+
+        node_name = max(finish_times, key=finish_times.get)
+        critical_path = []
+        while node_name is not None:
+            critical_path.append(node_name)
+            node_name = slowest_previous[node_name]
+        return critical_path[::-1]
@@ -0,0 +1,629 @@
+# -*- coding: utf-8 -*-
+"""Modules for any helpers for any base.py classes
+
+GraphValidator: A class for validating any subclass of BaseFlow
+DAGGenerator: A class for creating dags based on a subclass of BaseFlow
+
+jinja2, matplotlib and IPython are imported in the methods that use them, so that 'import flowrunner' and
+running a Flow do not pay for importing them
+"""
+
+
+import base64
+import hashlib
+import os
+from dataclasses import dataclass
+from itertools import chain
+from typing import Tuple
+
+import click
+
+from flowrunner.core.svg import render_svg
+from flowrunner.runner.flow import Graph
+from flowrunner.system.exceptions import InvalidFlowException
+from flowrunner.system.formatting import format_duration
+from flowrunner.system.logger import logger
+
+# colors of the nodes of a timed DAG, from the smallest to the largest share of the total time
+HEAT_COLORS = ["#fff5eb", "#fdd0a2", "#fdae6b", "#fd8d3c", "#e6550d"]
+CRITICAL_PATH_COLOR = "#d62728"
+# mermaid: laid out by mermaid-js in the browser or by https://mermaid.ink, svg: laid out by flowrunner.core.svg
+RENDERERS = ("mermaid", "svg")
+
+
+@dataclass
+class GraphValidator:
+    """This class is used to validate any Graph
+
+    Each of the method represents a seperate check of the validation suite to be conducted on the self.graph attribute.
+    All the methods a tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+    of the output message.
+
+    Attributes:
+        graph: An instance of Graph class to be checked
+    """
+
+    graph: Graph
+
+    def validate_length_start_nodes(self) -> Tuple[bool, str]:
+        """Method to validate the length of start nodes.
+
+        We make sure that there is atleast one start node
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+                of the output message.
+        """
+        # check that the len of start is more than 1
+        if len(self.graph.start) == 0:
+            return (False, "No start nodes present, please specify with '@start'")
+        return (True, "Validated number of start nodes")
+
+    def validate_start_next_nodes(self) -> Tuple[bool, str]:
+        """Method to check that the start nodes specified are valid.
+
+        We make sure that each of the nodes specified has a next
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+                of the output message
+        """
+        # check that all the start have a next value
+        # All start nodes have a next value
+        bad_start_nodes = []
+        for start_node in self.graph.start:
+            if not start_node.function_reference.next:
+                bad_start_nodes.append(start_node.name)
+        if bad_start_nodes:
+            return (False, f"Nodes {bad_start_nodes} do not have next")
+        return (True, "Validated start nodes 'next' values")
+
+    def validate_length_middle_nodes(self) -> Tuple[bool, str]:
+        """Method to validate the length of middle nodes.
+
+        We make sure that there is atleast one start node
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+                of the output message.
+        """
+        # check that the len of start is more than 1
+        if len(self.graph.middle_nodes) == 0:
+            return (
+                False,
+                "No middle_nodes present, please specify with '@step' and without '@start' or '@end'",
+            )
+        return (True, "Validate number of middle_nodes")
+
+    def validate_middle_next_nodes(self) -> Tuple[bool, str]:
+        """Method to check that the middle nodes specified are valid.
+
+        We make sure that each of the nodes specified has a next
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+                of the output message
+        """
+        # check that all the start have a next value
+        # All start nodes have a next value
+        bad_middle_nodes = []
+        for middle_node in self.graph.middle_nodes:
+            if not middle_node.function_reference.next:
+                bad_middle_nodes.append(
+                    middle_node.name
+                )  # append the node to bad nodes for later
+        # if bad nodes has a length then we assume a failure
+        if bad_middle_nodes:
+            return (False, f"Nodes {bad_middle_nodes} do not have next")
+        return (True, "Validated middle_nodes 'next' values")
+
+    def validate_length_end_nodes(self) -> Tuple[bool, str]:
+        """Method to validate the length of end nodes.
+
+        We make sure that there is atleast one end node
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+                of the output message.
+        """
+        # check that the len of start is more than 1
+        if len(self.graph.end) == 0:
+            return (False, "No end present, please specify with '@end'")
+        return (True, "Validated end nodes")
+
+    def check_step_not_included_next(self) -> Tuple[bool, str]:
+        """Method to validate that a step mentioned is used in the next.
+
+        We find any `step` that is not mentioned in a next that is not start or end, meaning a mid starting node
+
+        Returns:
+            A tuple of (test_result, output_message) where test_result will be a True/False bool and output_message is a string value
+            of the output message.
+        """
+        all_nodes = self.graph.nodes  # get all the function names
+        # levels attribute in the graph object contains a list of string all the next nodes contained in a
+        # 2 dimensional array
+        all_nexts = list(
+            chain(*self.graph.levels)
+        )  # we use itertools chain to flatten the 2d array to 1d
+        bad_nodes = [node for node in all_nodes if node not in all_nexts]
+        if bad_nodes:
+            return (False, f"{bad_nodes} not in any `next=[]` value")
+        return (True, "Validated step next mentions")
+
+    def get_validation_suite(self):
+        """Define validation suite, more methods
+        need to be added to validation suite list
+
+        Any new validation method has to be added to validation_suite so that it can
+        be called on validation checks.
+
+        Returns:
+            - validation_suite: A dict object containing the list of GraphValidator methods to be used to validate
+                base_flow subclasses
+        """
+        validation_suite = [
+            self.validate_length_start_nodes,
+            self.validate_start_next_nodes,
+            self.validate_length_middle_nodes,
+            self.validate_middle_next_nodes,
+            self.validate_length_end_nodes,
+            self.check_step_not_included_next,
+        ]
+        return validation_suite
+
+    def get_validation_results(self) -> list:
+        """Method to get the results of all validation methods
+
+        A Graph does not change once it is built, so we run the validation suite only once
+        and store the results in Graph.validation_results
+
+        Returns:
+            validation_results: A list of (test_result, output_message) tuples, one for each validation method
+        """
+        if self.graph.validation_results is None:
+            self.graph.validation_results = [
+                validation() for validation in self.get_validation_suite()
+            ]
+        return self.graph.validation_results
+
+    def run_validations(self, terminal_output: bool = True):
+        """Method to run all validation methods
+        We iterate through the validation suite for each method and check
+        the output. Output is always in the form of Tuple[bool, str]. With bool for Pass or
+        Fail and str being the output message
+
+        Args:
+            terminal_output: An optional bool argument for whether to show the output in terminal
+
+        Returns:
+            Echo of output {✅} or {❌} if passed or failed respectively with message
+        """
+        # iterate through the list of validations
+        for result, message in self.get_validation_results():
+            if result == True and terminal_output:
+                click.secho(f"✅ {message}", fg="green")
+            elif result == False and terminal_output:
+                click.secho(f"❌ {message}", fg="bright_red")
+
+    def run_validations_raise_error(self, terminal_output: bool = True):
+        """Method to run all validation methods but we raise an error if anything fails
+        We iterate through the validation suite for each method and check
+        the output. Output is always in the form of Tuple[bool, str]. With bool for Pass or
+        Fail and str being the output message
+
+        Args:
+            terminal_output: An optional bool argument for whether to show the output in terminal
+
+        Returns:
+            Echo of output {✅} or {❌} if passed or failed respectively with message
+
+        Raises:
+            InvalidFlowException: If any validation check failed
+        """
+        validation_output = []  # a list to store the values of the output
+
+        # iterate through the list of validations
+        for result, message in self.get_validation_results():
+            validation_output.append(result)
+            if result == True and terminal_output:
+                click.secho(f"✅ {message}", fg="green")
+            elif result == False and terminal_output:
+                click.secho(f"❌ {message}", fg="bright_red")
+
+        if all(validation_output) != True:
+            raise InvalidFlowException("Invalid Flow detected")
+
+
+class DAGGenerator:
+    """Class to flowrunner DAGs based on Flow"""
+
+    @classmethod
+    def _create_descriptive_dag(
+        cls, flow_instance, description=True, run_report=None
+    ) -> str:
+        """This method is used to create a more descriptive graph from a Flow instance
+
+        We use subgraphs to enclose a function and its accompanying description in them
+
+        With a RunReport, each subgraph is labeled with the duration of the step and its share of the total time
+        of all steps, each step is colored by that share and the critical path, the slowest path through the
+        'next' edges, is highlighted.
+
+        Args:
+            flow_instance(BaseFlow): An instance of subclass of BaseFlow
+            description(bool): A bool value to add description to DAG display, defaults to True
+            run_report(RunReport): An optional RunReport of a run of the Flow, defaults to None
+
+        Returns:
+            mermaid_js_string(str): A string value of mermaid js string
+        """
+        # base mermaid js string start
+        graph = flow_instance.graph  # get the graph attribute which is Graph object
+        mermaid_js_string = (
+            """graph TD;\n"""  # this will be passed to mermaid-js for rendering
+        )
+
+        durations = {}
+        critical_path = []
+        critical_edges = set()
+        if run_report is not None:
+            durations = {
+                node_report.name: node_report.wall_time
+                for node_report in run_report.nodes
+            }
+            critical_path = graph.get_critical_path(durations)
+            critical_edges = set(zip(critical_path, critical_path[1:]))
+        total_time = sum(durations.values())
+        max_duration = max(durations.values(), default=0)
+        # mermaid counts every link, including the invisible ones, for linkStyle
+        link_index = 0
+        styles = ""
+
+        # we iterate over the graph levels
+        for level in graph.levels:
+            # iterate over each node in level
+            for node in level:
+                subgraph_string = "subgraph "  # create the subgraph
+                # we store the subgraph name so that we can use it later as an edge connection
+                subgraph_name = f"step-{node.name}"  # subgraph name
+                # add the subgraph name to the subgraph string
+                subgraph_string += subgraph_name
+                if run_report is not None:
+                    subgraph_string += f' ["{cls._get_duration_label(node.name, durations, total_time)}"]'
+                    styles += cls._get_node_style(node.name, durations, max_duration)
+                subgraph_string += "\n"
+                subgraph_string += (
+                    f"{node.name}({node.name})"  # add the actual node_name
+                )
+                if (
+                    node.docstring and description
+                ):  # if there is a docstring we that as an edge and if description is set to True
+                    subgraph_description = f' ~~~ {node.name}_description[["""{node.docstring}"""]];\n'  # and its description if any
+                    subgraph_string += subgraph_description
+                    link_index += 1
+                else:
+                    # subgraph_string += f'\n{node.name}\n'
+                    subgraph_string += "\n"
+                subgraph_string += "end;\n"  # end the subgraph
+                for next_node in node.next:  # iterate over the next of the node
+                    # we point the edge of end of the current subgraph to the next subgraph
+                    # this is so that when rendering the directional arrows do not overlap text
+                    edge_node = f"{subgraph_name} ==> step-{next_node};\n"  # now iterate over next
+                    # add the next node the edge
+                    subgraph_string += edge_node  # add the edge notation
+                    if (node.name, next_node) in critical_edges:
+                        styles += f"linkStyle {link_index} stroke:{CRITICAL_PATH_COLOR},stroke-width:4px;\n"
+                    link_index += 1
+
+                # finally add the subgraph to the main mermaid js string
+                mermaid_js_string += subgraph_string
+
+        for node_name in critical_path:
+            styles += f"style step-{node_name} stroke:{CRITICAL_PATH_COLOR},stroke-width:3px;\n"
+        return mermaid_js_string + styles
+
+    @classmethod
+    def _get_duration_label(
+        cls, node_name: str, durations: dict, total_time: float
+    ) -> str:
+        """Private class method to get the label of a step in a timed DAG eg. 'load: 1.20s (35%)'
+
+        Args:
+            node_name: A str value of the name of the node
+            durations: A dict of {node.name: seconds}
+            total_time: A float value of the sum of the durations
+
+        Returns:
+            label: A str value of the label
+        """
+        if node_name not in durations:
+            return f"{node_name}: not run"
+        duration = durations[node_name]
+        share = duration / total_time if total_time else 0
+        return f"{node_name}: {format_duration(duration)} ({share:.0%})"
+
+    @classmethod
+    def _get_node_style(
+        cls, node_name: str, durations: dict, max_duration: float
+    ) -> str:
+        """Private class method to get the mermaid style of a step colored by its share of the total time
+
+        The colors go from HEAT_COLORS[0] for the fastest steps to HEAT_COLORS[-1] for the slowest step
+
+        Args:
+            node_name: A str value of the name of the node
+            durations: A dict of {node.name: seconds}
+            max_duration: A float value of the duration of the slowest step
+
+        Returns:
+            style: A str value of the mermaid style statement, empty if the node was not run
+        """
+        if node_name not in durations:
+            return ""
+        fill, text_color = cls._get_heat_colors(node_name, durations, max_duration)
+        return f"style {node_name} fill:{fill},color:{text_color};\n"
+
+    @classmethod
+    def _get_heat_colors(
+        cls, node_name: str, durations: dict, max_duration: float
+    ) -> tuple:
+        """Private class method to get the colors of a step that was run, by its share of the total time
+
+        The colors go from HEAT_COLORS[0] for the fastest steps to HEAT_COLORS[-1] for the slowest step
+
+        Args:
+            node_name: A str value of the name of the node, it has to be in durations
+            durations: A dict of {node.name: seconds}
+            max_duration: A float value of the duration of the slowest step
+
+        Returns:
+            A tuple of str values of (fill color, text color)
+        """
+        share_of_slowest = durations[node_name] / max_duration if max_duration else 0
+        color_index = min(
+            int(share_of_slowest * len(HEAT_COLORS)), len(HEAT_COLORS) - 1
+        )
+        text_color = "white" if color_index == len(HEAT_COLORS) - 1 else "black"
+        return HEAT_COLORS[color_index], text_color
+
+    @classmethod
+    def get_dag_filename(cls, flow_name: str) -> str:
+        """Class method to get the name of the html file the DAG of a Flow is saved to eg. 'examplepandas.html'
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+
+        Returns:
+            A str value of the file name
+        """
+        return f"{flow_name.lower()}.html"
+
+    @classmethod
+    def get_graph_hash(cls, flow_instance, description: bool = True) -> str:
+        """Class method to get a hash of the DAG of a Flow, it changes if a step, its 'next' or docstring changes
+
+        Args:
+            flow_instance: An instance of BaseFlow subclass object
+            description: Bool value of adding the docstrings of the steps to the DAG
+
+        Returns:
+            A str value of the sha256 hex digest of the mermaid js string of the DAG
+        """
+        mermaid_js_string = cls._create_descriptive_dag(
+            flow_instance=flow_instance, description=description
+        )
+        return hashlib.sha256(mermaid_js_string.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def svg(cls, flow_instance, description: bool = True, run_report=None) -> str:
+        """Class method to draw the DAG of a Flow as SVG, laid out in Python from Graph.levels
+
+        Unlike the mermaid js DAG, it does not need a browser or network access to be laid out
+
+        Args:
+            flow_instance: An instance of BaseFlow subclass object
+            description: Bool value of adding the docstrings of the steps to the DAG
+            run_report: An optional RunReport of a run of the Flow, to label each step with its duration,
+                color it by its share of the total time and highlight the critical path
+
+        Returns:
+            svg: A str value of the SVG document
+        """
+        graph = flow_instance.graph
+        labels = {}
+        colors = {}
+        critical_path = []
+        if run_report is not None:
+            durations = {
+                node_report.name: node_report.wall_time
+                for node_report in run_report.nodes
+            }
+            critical_path = graph.get_critical_path(durations)
+            total_time = sum(durations.values())
+            max_duration = max(durations.values(), default=0)
+            for node in graph.nodes:
+                labels[node.name] = cls._get_duration_label(
+                    node.name, durations, total_time
+                )
+                if node.name in durations:
+                    colors[node.name] = cls._get_heat_colors(
+                        node.name, durations, max_duration
+                    )
+        return render_svg(
+            graph,
+            title=flow_instance.__class__.__name__,
+            description=description,
+            labels=labels,
+            colors=colors,
+            highlighted=critical_path,
+            highlight_color=CRITICAL_PATH_COLOR,
+        )
+
+    @classmethod
+    def dag(
+        cls,
+        flow_instance,
+        save_file: bool = False,
+        path: str = None,
+        description: bool = True,
+        run_report=None,
+        renderer: str = "mermaid",
+    ) -> str:
+        """Class method to generate DAG from Flow in the form of html output
+
+        We use the Flow class to generate a flowchart and return the html content. This method can
+        be used to save locally or use the html content elsewhere
+
+        Args:
+            flow_instance: An instance of BaseFlow subclass object
+            save_file: Bool value to save file, defaults to False
+            path: A path to save file
+            description: Bool value of saving description of class
+            run_report: An optional RunReport of a run of the Flow, to label each step with its duration,
+                color it by its share of the total time and highlight the critical path
+            renderer: A str value of 'mermaid' to lay out the DAG with mermaid js in the browser or 'svg' to embed
+                an SVG laid out in Python, which opens without network access, defaults to 'mermaid'
+
+        Returns:
+            content: The html data containing the flow diagram
+
+        Raises:
+            ValueError: If renderer is not one of RENDERERS
+        """
+
+        from jinja2 import (  # pylint: disable=import-outside-toplevel
+            Environment,
+            FileSystemLoader,
+        )
+
+        if renderer not in RENDERERS:
+            raise ValueError(
+                f"renderer can only be one of {RENDERERS}, got '{renderer}'"
+            )
+        mermaid_js_string = None
+        svg = None
+        if renderer == "svg":
+            svg = cls.svg(flow_instance, description=description, run_report=run_report)
+        else:
+            mermaid_js_string = cls._create_descriptive_dag(
+                flow_instance=flow_instance,
+                description=description,
+                run_report=run_report,
+            )
+
+        root = os.path.dirname(os.path.abspath(__file__))
+        templates_dir = os.path.join(root, "templates")
+        environment = Environment(
+            loader=FileSystemLoader(templates_dir), trim_blocks=True, lstrip_blocks=True
+        )
+        template = environment.get_template("base.html")
+
+        flow_name = flow_instance.__class__.__name__  # Output eg.'ExamplePandas'
+
+        # if path is provided, we use that also
+
+        filename = cls.get_dag_filename(flow_name)  # Output eg. examplepandas.html
+
+        if path:  # path has a value
+            os.makedirs(path, exist_ok=True)  # create the directory if it does not exit
+            filename = path + filename
+            # if path has a value we can safely assume that they want to save to that path
+            save_file = True  # we change the value to True to make sure we save i
+
+        summary = None
+        if run_report is not None:
+            durations = {
+                node_report.name: node_report.wall_time
+                for node_report in run_report.nodes
+            }
+            critical_path = flow_instance.graph.get_critical_path(durations)
+            critical_time = sum(
+                durations.get(node_name, 0) for node_name in critical_path
+            )
+            summary = (
+                f"Total: {format_duration(run_report.wall_time)}, "
+                f"critical path: {' → '.join(critical_path)} ({format_duration(critical_time)})"
+            )
+
+        content = template.render(
+            flow_name=flow_name,
+            mermaid_js_string=mermaid_js_string,
+            svg=svg,
+            summary=summary,
+        )
+
+        # if save_file is true we save the file in the local directory from where it is running
+        if save_file:  # if save_file is true
+            with open(filename, mode="w", encoding="utf-8") as message:
+                logger.debug("Saving file: %s", filename)
+                message.write(content)
+                logger.debug("Saved file %s", filename)
+
+        return content
+
+    @classmethod
+    def display(
+        cls,
+        flow_instance,
+        description: bool = True,
+        run_report=None,
+        renderer: str = "svg",
+    ) -> None:
+        """Class method to display the DAG of the Flow
+
+        This method only works in IPython style notebooks. Does not work in script
+        This method displays the flowchart of the Flow based the Flow class itself.
+
+        Args
+            flow_instance: An instance of subclass of BaseFlow
+            description: A bool value of descriptive, descriptive on adds docstring to DAG
+            run_report: An optional RunReport of a run of the Flow to show the duration of each step
+            renderer: A str value of 'svg' to draw the DAG in Python or 'mermaid' to fetch an image of it from
+                https://mermaid.ink, defaults to 'svg'
+
+        Returns:
+            None: display the flowchart of the Flow
+
+        Raises:
+            ValueError: If renderer is not one of RENDERERS
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(
+                f"renderer can only be one of {RENDERERS}, got '{renderer}'"
+            )
+        if renderer == "svg":
+            from IPython.display import (  # pylint: disable=import-outside-toplevel
+                SVG,
+                display,
+            )
+
+            display(
+                SVG(
+                    cls.svg(
+                        flow_instance, description=description, run_report=run_report
+                    )
+                )
+            )
+            return
+
+        # we have to import matplotlib so that we can use display()
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel,unused-import
+        from IPython.display import (  # pylint: disable=import-outside-toplevel
+            Image,
+            display,
+        )
+
+        # get the flowchart mermaid js
+        # in the form of eg. output:
+        # """
+        # graph LR;
+        #   A--> B & C & D;
+        # """"
+        graph = cls._create_descriptive_dag(
+            flow_instance=flow_instance, description=description, run_report=run_report
+        )
+        graphbytes = graph.encode("ascii")
+        base64_bytes = base64.b64encode(graphbytes)
+        base64_string = base64_bytes.decode("ascii")
+        display(Image(url="https://mermaid.ink/img/" + base64_string))
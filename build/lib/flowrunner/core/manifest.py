@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Module for rendering the DAGs of a directory of Flows incrementally
+
+DAGManifest: A class recording the hashes of the Flow files and of the DAGs rendered from them
+get_file_hash: A function to get the hash of the content of a file
+get_render_hash: A function to get the hash of the template and options the DAGs are rendered with
+save_index: A function to write an index page linking the DAG of every Flow in a manifest
+
+The manifest is kept as JSON next to the DAGs. A file is not imported again if its source has not changed since its
+DAGs were rendered. A Flow of a changed file is only rendered again if its graph hash has changed, the hash of the
+mermaid js of its DAG which has the names, 'next' and docstrings of its steps. A change to a module imported by a
+Flow file does not change the source hash of the file, so such DAGs are only rendered again with force=True.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+
+from flowrunner.system.logger import logger
+
+MANIFEST_FILENAME = "flowrunner_manifest.json"
+INDEX_FILENAME = "index.html"
+MANIFEST_VERSION = 1
+TEMPLATES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "templates"
+)
+
+
+def get_file_hash(path: str) -> str:
+    """Function to get the hash of the content of a file
+
+    Args:
+        path: A str value of the path of the file
+
+    Returns:
+        A str value of the sha256 hex digest
+    """
+    with open(path, mode="rb") as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def get_render_hash(description: bool = True, renderer: str = "mermaid") -> str:
+    """Function to get the hash of the template and options the DAGs are rendered with
+
+    Args:
+        description: A bool value of whether the DAGs have the docstrings of the steps
+        renderer: A str value of the renderer of the DAGs, see DAGGenerator.dag
+
+    Returns:
+        A str value of the sha256 hex digest, DAGs rendered with a different one have to be rendered again
+    """
+    template_hash = get_file_hash(os.path.join(TEMPLATES_DIRECTORY, "base.html"))
+    content = f"{MANIFEST_VERSION}:{template_hash}:{bool(description)}:{renderer}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class DAGManifest:
+    """A class recording the hashes of the Flow files and of the DAGs rendered from them
+
+    Attributes:
+        path: A str value of the directory of the DAGs and the manifest
+        render_hash: A str value returned by get_render_hash
+        files: A dict of {file path: {'source_hash': str, 'flows': list of Flow names}}
+        flows: A dict of {Flow name: {'filepath': str, 'graph_hash': str, 'html': str, 'steps': int,
+            'description': str}}, 'html' is the name of the DAG file in path
+    """
+
+    path: str
+    render_hash: str
+    files: dict = field(default_factory=lambda: {})
+    flows: dict = field(default_factory=lambda: {})
+
+    @property
+    def manifest_path(self) -> str:
+        """Path of the JSON file of the manifest"""
+        return os.path.join(self.path, MANIFEST_FILENAME)
+
+    @classmethod
+    def load(cls, path: str, render_hash: str):
+        """Class method to read the manifest of a directory of DAGs
+
+        Args:
+            path: A str value of the directory of the DAGs
+            render_hash: A str value returned by get_render_hash
+
+        Returns:
+            manifest: A DAGManifest, empty if there is none or it was written for another render_hash
+        """
+        manifest = cls(path=path, render_hash=render_hash)
+        try:
+            with open(manifest.manifest_path, encoding="utf-8") as json_file:
+                content = json.load(json_file)
+        except FileNotFoundError:
+            return manifest
+        except ValueError:
+            logger.warning("Ignoring invalid manifest %s", manifest.manifest_path)
+            return manifest
+        if content.get("render_hash") != render_hash:
+            logger.info(
+                "DAGs in %s were rendered differently, rendering all of them", path
+            )
+            return manifest
+        manifest.files = content["files"]
+        manifest.flows = content["flows"]
+        return manifest
+
+    def save(self):
+        """Method to write the manifest as JSON
+
+        Returns:
+            None
+        """
+        os.makedirs(self.path, exist_ok=True)
+        content = {
+            "render_hash": self.render_hash,
+            "files": self.files,
+            "flows": self.flows,
+        }
+        with open(self.manifest_path, mode="w", encoding="utf-8") as json_file:
+            json.dump(content, json_file, indent=4, sort_keys=True)
+
+    def is_unchanged(self, filepath: str, source_hash: str) -> bool:
+        """Method to check whether the DAGs of a file are up to date
+
+        Args:
+            filepath: A str value of the path of the Flow file
+            source_hash: A str value returned by get_file_hash for the file
+
+        Returns:
+            A bool value, True if the file has the same source as when its DAGs were rendered and they still exist
+        """
+        file_entry = self.files.get(filepath)
+        return (
+            file_entry is not None
+            and file_entry["source_hash"] == source_hash
+            and all(
+                flow_name in self.flows
+                and os.path.exists(
+                    os.path.join(self.path, self.flows[flow_name]["html"])
+                )
+                for flow_name in file_entry["flows"]
+            )
+        )
+
+    def get_graph_hashes(self) -> dict:
+        """Method to get the graph hash of every Flow
+
+        Returns:
+            A dict of {Flow name: graph hash}
+        """
+        return {
+            flow_name: flow_entry["graph_hash"]
+            for flow_name, flow_entry in self.flows.items()
+        }
+
+    def update(
+        self, filepath: str, source_hash: str, flow_entries: dict, complete: bool = True
+    ):
+        """Method to record the DAGs rendered from a file
+
+        The DAGs of the Flows which are no longer in the file are removed.
+
+        Args:
+            filepath: A str value of the path of the Flow file
+            source_hash: A str value returned by get_file_hash for the file
+            flow_entries: A dict of {Flow name: {'graph_hash', 'html', 'steps', 'description'}}
+            complete: A bool value, False if some Flows of the file failed, the source hash is then not recorded
+                so that the file is processed again next time
+
+        Returns:
+            None
+        """
+        previous_flows = self.files.get(filepath, {}).get("flows", [])
+        for flow_name in previous_flows:
+            if flow_name not in flow_entries and complete:
+                self._remove_flow(flow_name, filepath)
+        for flow_name, flow_entry in flow_entries.items():
+            self.flows[flow_name] = {"filepath": filepath, **flow_entry}
+        self.files[filepath] = {
+            "source_hash": source_hash if complete else None,
+            "flows": sorted(
+                set(flow_entries) | (set() if complete else set(previous_flows))
+            ),
+        }
+
+    def remove(self, filepath: str):
+        """Method to remove a file and the DAGs of its Flows, eg. when the file was deleted
+
+        Args:
+            filepath: A str value of the path of the Flow file
+
+        Returns:
+            None
+        """
+        for flow_name in self.files.pop(filepath, {}).get("flows", []):
+            self._remove_flow(flow_name, filepath)
+
+    def _remove_flow(self, flow_name: str, filepath: str):
+        """Private method to remove a Flow and its DAG, unless the Flow has moved to another file"""
+        flow_entry = self.flows.get(flow_name)
+        if flow_entry is None or flow_entry["filepath"] != filepath:
+            return
+        del self.flows[flow_name]
+        html_path = os.path.join(self.path, flow_entry["html"])
+        if os.path.exists(html_path):
+            logger.debug("Removing DAG %s", html_path)
+            os.remove(html_path)
+
+
+def save_index(manifest: DAGManifest) -> str:
+    """Function to write an index page linking the DAG of every Flow in a manifest
+
+    Args:
+        manifest: A DAGManifest
+
+    Returns:
+        index_path: A str value of the path of the index page
+    """
+    from jinja2 import (  # pylint: disable=import-outside-toplevel
+        Environment,
+        FileSystemLoader,
+    )
+
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIRECTORY),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        autoescape=True,  # docstrings can have '<' in them
+    )
+    flows = [
+        {"name": flow_name, **manifest.flows[flow_name]}
+        for flow_name in sorted(
+            manifest.flows, key=lambda name: (manifest.flows[name]["filepath"], name)
+        )
+    ]
+    content = environment.get_template(INDEX_FILENAME).render(flows=flows)
+    index_path = os.path.join(manifest.path, INDEX_FILENAME)
+    with open(index_path, mode="w", encoding="utf-8") as index_file:
+        index_file.write(content)
+    return index_path
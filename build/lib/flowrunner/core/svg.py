@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""Module for laying out the Graph of a Flow and drawing it as SVG, without a browser or network access
+
+NodeBox: A class containing the position, size and text of a node in the layout
+get_layout: A function to lay out a Graph in layers
+render_svg: A function to draw a Graph as an SVG document
+
+The layout is a layered (Sugiyama style) layout built on Graph.levels, which already places each node one level
+below the deepest of its previous nodes:
+1. An edge spanning more than one level goes through a dummy point in each level in between, so that it can be
+   routed around the nodes.
+2. The nodes and dummy points of each level are ordered by the barycenter of their neighbours in the level above,
+   then in the level below, a few times over, and the order with the fewest edge crossings is kept.
+3. Each node is moved towards the barycenter of its neighbours while keeping the order and the gaps in its level.
+
+Each sweep takes O((V + E) log V) with V counting the dummy points, a Flow of a thousand steps is laid out in well
+under a second.
+"""
+import textwrap
+from dataclasses import dataclass, field
+from html import escape
+
+FONT_SIZE = 14
+DESCRIPTION_FONT_SIZE = 11
+CHARACTER_WIDTH = 0.6  # average width of a character of a sans-serif font, as a share of the font size
+LINE_HEIGHT = 1.4  # as a share of the font size
+DESCRIPTION_WIDTH = 40  # characters per line of a docstring
+PADDING = 10  # between the border of a node and its text
+NODE_GAP = 30  # horizontal gap between nodes
+EDGE_GAP = 10  # horizontal gap next to the dummy point of an edge
+LEVEL_GAP = 50  # vertical gap between levels
+DUMMY_WIDTH = 10  # width kept free in a level for an edge passing through it
+MARGIN = 20
+SWEEPS = 4  # ordering sweeps, each goes down then up the levels
+
+NODE_COLOR = "#5A5A5A"  # the colors of the mermaid theme of DAGGenerator.dag
+TEXT_COLOR = "white"
+EDGE_COLOR = "#F8B229"
+
+
+@dataclass
+class NodeBox:
+    """A class containing the position, size and text of a node in the layout
+
+    Attributes:
+        name: A str value of the name of the node, None for a dummy point of an edge
+        label: A str value of the first line of text of the node
+        description: A list of str values of the lines of the docstring
+        x: A float value of the horizontal center of the node
+        y: A float value of the top of the node
+        width: A float value of the width of the node
+        height: A float value of the height of the node
+    """
+
+    name: str
+    label: str = ""
+    description: list = field(default_factory=lambda: [])
+    x: float = 0.0
+    y: float = 0.0
+    width: float = DUMMY_WIDTH
+    height: float = 0.0
+
+    @property
+    def bottom(self) -> float:
+        """Bottom of the node"""
+        return self.y + self.height
+
+
+def _get_text_width(text: str, font_size: float) -> float:
+    """Private function to estimate the width of a line of text, we cannot measure it without a browser"""
+    return len(text) * font_size * CHARACTER_WIDTH
+
+
+def _make_box(name: str, label: str, docstring: str = None) -> NodeBox:
+    """Private function to create the NodeBox of a node, sized for its label and docstring"""
+    description = []
+    if docstring:
+        for line in docstring.strip().splitlines():
+            description.extend(textwrap.wrap(line, DESCRIPTION_WIDTH) or [""])
+    width = max(
+        [_get_text_width(label, FONT_SIZE)]
+        + [_get_text_width(line, DESCRIPTION_FONT_SIZE) for line in description]
+    )
+    height = (
+        FONT_SIZE * LINE_HEIGHT + len(description) * DESCRIPTION_FONT_SIZE * LINE_HEIGHT
+    )
+    if description:
+        height += PADDING / 2  # the line between the label and the description
+    return NodeBox(
+        name=name,
+        label=label,
+        description=description,
+        width=width + 2 * PADDING,
+        height=height + 2 * PADDING,
+    )
+
+
+def _count_crossings(edges: list, upper_positions: dict, lower_positions: dict) -> int:
+    """Private function to count the crossings of the edges between two levels
+
+    Two edges cross if their ends are in the opposite order in the two levels. We sort the edges by their upper end
+    and count the inversions of their lower ends with a Fenwick tree, in O(E log V).
+
+    Args:
+        edges: A list of tuples of (upper item, lower item)
+        upper_positions: A dict of {item: position in the upper level}
+        lower_positions: A dict of {item: position in the lower level}
+
+    Returns:
+        crossings: An int value of the number of pairs of edges crossing
+    """
+    lower_ends = [
+        lower_positions[lower]
+        for upper, lower in sorted(
+            edges, key=lambda edge: (upper_positions[edge[0]], lower_positions[edge[1]])
+        )
+    ]
+    tree = [0] * (len(lower_positions) + 1)
+    crossings = 0
+    for seen, position in enumerate(lower_ends):
+        # count the edges seen so far ending at or before this position, the rest cross this edge
+        index = position + 1
+        not_crossing = 0
+        while index > 0:
+            not_crossing += tree[index]
+            index -= index & -index
+        crossings += seen - not_crossing
+        index = position + 1
+        while index < len(tree):
+            tree[index] += 1
+            index += index & -index
+    return crossings
+
+
+def _order_levels(levels: list, edges: list) -> list:
+    """Private function to order the items of each level to reduce the edge crossings, with the barycenter heuristic
+
+    Args:
+        levels: A list of lists of items, in their initial order
+        edges: A list of lists of tuples of (upper item, lower item), the edges between level i and level i + 1
+
+    Returns:
+        levels: A list of lists of items, the order with the fewest crossings found
+    """
+    # {item: list of items in the level above it is connected to}
+    above = [{} for _ in levels]
+    below = [{} for _ in levels]
+    for index, level_edges in enumerate(edges):
+        for upper, lower in level_edges:
+            below[index].setdefault(upper, []).append(lower)
+            above[index + 1].setdefault(lower, []).append(upper)
+
+    def get_crossings(ordered_levels: list) -> int:
+        positions = [
+            {item: position for position, item in enumerate(level)}
+            for level in ordered_levels
+        ]
+        return sum(
+            _count_crossings(level_edges, positions[index], positions[index + 1])
+            for index, level_edges in enumerate(edges)
+        )
+
+    def reorder(level: list, neighbours: dict, neighbour_level: list) -> list:
+        positions = {item: position for position, item in enumerate(neighbour_level)}
+        barycenters = {}
+        for position, item in enumerate(level):
+            connected = neighbours.get(item)
+            # an item without neighbours keeps its position
+            barycenters[item] = (
+                sum(positions[neighbour] for neighbour in connected) / len(connected)
+                if connected
+                else position * len(neighbour_level) / max(len(level), 1)
+            )
+        # sorted is stable, ties keep their order
+        return sorted(level, key=barycenters.get)
+
+    best_levels = [list(level) for level in levels]
+    best_crossings = get_crossings(best_levels)
+    current = [list(level) for level in levels]
+    for _ in range(SWEEPS):
+        if best_crossings == 0:
+            break
+        for index in range(1, len(current)):
+            current[index] = reorder(current[index], above[index], current[index - 1])
+        for index in range(len(current) - 2, -1, -1):
+            current[index] = reorder(current[index], below[index], current[index + 1])
+        crossings = get_crossings(current)
+        if crossings < best_crossings:
+            best_levels = [list(level) for level in current]
+            best_crossings = crossings
+    return best_levels
+
+
+def _get_gap(left: NodeBox, right: NodeBox) -> float:
+    """Private function to get the horizontal space between the centers of two neighbouring boxes"""
+    gap = NODE_GAP if left.name is not None and right.name is not None else EDGE_GAP
+    return (left.width + right.width) / 2 + gap
+
+
+def _place_level(boxes: list, desired: list):
+    """Private function to set the x of the boxes of a level as close to the desired x as the gaps allow
+
+    We pack the boxes from the left, each at its desired x or pushed right by the box before it, and from the right,
+    each at its desired x or pushed left by the box after it. Both keep the gaps, so their average does too.
+    """
+    if not boxes:
+        return
+    from_left = []
+    for index, box in enumerate(boxes):
+        x = desired[index]
+        if index:
+            x = max(x, from_left[-1] + _get_gap(boxes[index - 1], box))
+        from_left.append(x)
+    from_right = [0.0] * len(boxes)
+    for index in range(len(boxes) - 1, -1, -1):
+        x = desired[index]
+        if index < len(boxes) - 1:
+            x = min(x, from_right[index + 1] - _get_gap(boxes[index], boxes[index + 1]))
+        from_right[index] = x
+    for index, box in enumerate(boxes):
+        box.x = (from_left[index] + from_right[index]) / 2
+
+
+def get_layout(graph, description: bool = True, labels: dict = None) -> tuple:
+    """Function to lay out a Graph in layers, one for each of Graph.levels
+
+    Args:
+        graph: A Graph
+        description: A bool value to add the docstring of each step to its node, defaults to True
+        labels: An optional dict of {node name: str value of the label}, defaults to the node name
+
+    Returns:
+        A tuple of (boxes, routes, width, height) where boxes is a dict of {node name: NodeBox}, routes is a list of
+        tuples of (node name, next node name, list of (x, y) points) and width and height are the size of the layout
+    """
+    labels = labels or {}
+    boxes = {
+        node.name: _make_box(
+            node.name,
+            labels.get(node.name, node.name),
+            node.docstring if description else None,
+        )
+        for level in graph.levels
+        for node in level
+    }
+    depths = {
+        node.name: depth for depth, level in enumerate(graph.levels) for node in level
+    }
+
+    # every edge gets a dummy point in each level between its ends
+    levels = [[node.name for node in level] for level in graph.levels]
+    edges = [[] for _ in range(max(len(levels) - 1, 0))]
+    chains = []  # (node name, next node name, list of items from one to the other)
+    for level in graph.levels:
+        for node in level:
+            for next_name in node.next:
+                if next_name not in depths:
+                    continue
+                items = [node.name]
+                for depth in range(depths[node.name] + 1, depths[next_name]):
+                    dummy = (node.name, next_name, depth)
+                    boxes[dummy] = NodeBox(name=None)
+                    levels[depth].append(dummy)
+                    items.append(dummy)
+                items.append(next_name)
+                for offset, (upper, lower) in enumerate(zip(items, items[1:])):
+                    edges[depths[node.name] + offset].append((upper, lower))
+                chains.append((node.name, next_name, items))
+    levels = _order_levels(levels, edges)
+
+    # vertical positions, each level is as tall as its tallest node
+    top = MARGIN
+    for level in levels:
+        level_height = max(boxes[item].height for item in level)
+        for item in level:
+            boxes[item].y = top + (level_height - boxes[item].height) / 2
+            # dummy points span the level so that edges pass straight
+            if boxes[item].name is None:
+                boxes[item].y, boxes[item].height = top, level_height
+        top += level_height + LEVEL_GAP
+    height = max(top - LEVEL_GAP, MARGIN) + MARGIN
+
+    # horizontal positions, packed first and then moved towards their neighbours
+    above = {}
+    below = {}
+    for level_edges in edges:
+        for upper, lower in level_edges:
+            below.setdefault(upper, []).append(lower)
+            above.setdefault(lower, []).append(upper)
+    for level in levels:
+        level_boxes = [boxes[item] for item in level]
+        x = 0.0
+        for index, box in enumerate(level_boxes):
+            box.x = x + _get_gap(level_boxes[index - 1], box) if index else 0.0
+            x = box.x
+        for box in level_boxes:
+            box.x -= x / 2  # centered on 0
+    for _ in range(SWEEPS):
+        for ordered_levels, neighbours in (
+            (levels[1:], above),
+            (levels[-2::-1], below),
+        ):
+            for level in ordered_levels:
+                desired = [
+                    sum(boxes[neighbour].x for neighbour in neighbours[item])
+                    / len(neighbours[item])
+                    if item in neighbours
+                    else boxes[item].x
+                    for item in level
+                ]
+                _place_level([boxes[item] for item in level], desired)
+
+    left = min((box.x - box.width / 2 for box in boxes.values()), default=0)
+    for box in boxes.values():
+        box.x += MARGIN - left
+    width = max((box.x + box.width / 2 for box in boxes.values()), default=0) + MARGIN
+
+    routes = []
+    for node_name, next_name, items in chains:
+        points = [(boxes[node_name].x, boxes[node_name].bottom)]
+        for dummy in items[1:-1]:
+            points.append((boxes[dummy].x, boxes[dummy].y))
+            points.append((boxes[dummy].x, boxes[dummy].bottom))
+        points.append((boxes[next_name].x, boxes[next_name].y))
+        routes.append((node_name, next_name, points))
+    node_boxes = {name: box for name, box in boxes.items() if box.name is not None}
+    return node_boxes, routes, width, height
+
+
+def _get_path(points: list) -> str:
+    """Private function to get the SVG path of an edge, a cubic curve between each pair of points"""
+    path = f"M{points[0][0]:.1f},{points[0][1]:.1f}"
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if x1 == x2:
+            path += f" L{x2:.1f},{y2:.1f}"
+            continue
+        middle = (y1 + y2) / 2
+        path += f" C{x1:.1f},{middle:.1f} {x2:.1f},{middle:.1f} {x2:.1f},{y2:.1f}"
+    return path
+
+
+def render_svg(
+    graph,
+    title: str = None,
+    description: bool = True,
+    labels: dict = None,
+    colors: dict = None,
+    highlighted: list = None,
+    highlight_color: str = "#d62728",
+) -> str:
+    """Function to draw a Graph as an SVG document
+
+    Args:
+        graph: A Graph
+        title: An optional str value of the title of the document eg. the name of the Flow
+        description: A bool value to add the docstring of each step to its node, defaults to True
+        labels: An optional dict of {node name: str value of the label}, defaults to the node name
+        colors: An optional dict of {node name: (fill color, text color)}, defaults to the colors of the mermaid theme
+        highlighted: An optional list of node names of a path to highlight, along with the edges between them
+        highlight_color: A str value of the color of the highlighted path
+
+    Returns:
+        svg: A str value of the SVG document
+    """
+    colors = colors or {}
+    highlighted = highlighted or []
+    highlighted_edges = set(zip(highlighted, highlighted[1:]))
+    boxes, routes, width, height = get_layout(
+        graph, description=description, labels=labels
+    )
+
+    elements = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="sans-serif" class="flowrunner-dag">',
+    ]
+    if title:
+        elements.append(f"<title>{escape(title)}</title>")
+    elements.append(
+        "<defs>"
+        + "".join(
+            f'<marker id="{marker_id}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+            f'markerHeight="8" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{color}"/></marker>'
+            for marker_id, color in (
+                ("arrow", EDGE_COLOR),
+                ("arrow-highlighted", highlight_color),
+            )
+        )
+        + "</defs>"
+    )
+    for node_name, next_name, points in routes:
+        is_highlighted = (node_name, next_name) in highlighted_edges
+        elements.append(
+            f'<path class="edge" data-from="{escape(node_name)}" data-to="{escape(next_name)}" '
+            f'd="{_get_path(points)}" fill="none" '
+            f'stroke="{highlight_color if is_highlighted else EDGE_COLOR}" '
+            f'stroke-width="{3 if is_highlighted else 2}" '
+            f'marker-end="url(#{"arrow-highlighted" if is_highlighted else "arrow"})"/>'
+        )
+    for node_name, box in boxes.items():
+        fill, text_color = colors.get(node_name, (NODE_COLOR, TEXT_COLOR))
+        stroke = (
+            f' stroke="{highlight_color}" stroke-width="3"'
+            if node_name in highlighted
+            else ""
+        )
+        left = box.x - box.width / 2
+        text_top = box.y + PADDING + FONT_SIZE
+        node_elements = [
+            f'<g class="node" id="step-{escape(node_name)}">',
+            f'<rect x="{left:.1f}" y="{box.y:.1f}" width="{box.width:.1f}" height="{box.height:.1f}" '
+            f'rx="5" fill="{fill}"{stroke}/>',
+            f'<text x="{box.x:.1f}" y="{text_top:.1f}" font-size="{FONT_SIZE}" fill="{text_color}" '
+            f'text-anchor="middle">{escape(box.label)}</text>',
+        ]
+        if box.description:
+            line_y = box.y + PADDING + FONT_SIZE * LINE_HEIGHT + PADDING / 4
+            node_elements.append(
+                f'<line x1="{left:.1f}" y1="{line_y:.1f}" x2="{left + box.width:.1f}" y2="{line_y:.1f}" '
+                f'stroke="{text_color}" stroke-opacity="0.4"/>'
+            )
+            for index, line in enumerate(box.description):
+                line_top = (
+                    line_y
+                    + PADDING / 4
+                    + (index + 1) * DESCRIPTION_FONT_SIZE * LINE_HEIGHT
+                )
+                node_elements.append(
+                    f'<text x="{box.x:.1f}" y="{line_top:.1f}" font-size="{DESCRIPTION_FONT_SIZE}" '
+                    f'fill="{text_color}" text-anchor="middle">{escape(line)}</text>'
+                )
+        node_elements.append("</g>")
+        elements.append("".join(node_elements))
+    elements.append("</svg>")
+    return "\n".join(elements)
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""Module for caching the outputs of steps on disk
+
+StepCache: A class for a content addressed, size bounded cache of step outputs in a local directory
+
+The cache key of a step is built from the hash of its source code, the values of the param_store keys it reads
+and the cache keys of the steps before it. So a cached output is reused only if none of these have changed. This
+assumes that steps are deterministic, i.e a step that reads data that changes outside of the Flow should
+not be cached.
+
+The keys a step reads are found in its source, eg. self.param_store['date'] or self.param_store.get('date'). If a step
+uses param_store in any other way, eg. passes it to a function or reads a key from a variable, every key is taken to
+be read. Keys read by helper methods or functions called by a step are not seen, so steps are expected to read their
+parameters directly.
+"""
+import ast
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import tempfile
+import textwrap
+import threading
+from dataclasses import dataclass
+from itertools import chain
+from typing import Optional
+
+from flowrunner.runner.process import NodeResult
+from flowrunner.system.logger import logger
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(".flowrunner", "cache")
+DEFAULT_MAX_SIZE = 1024**3  # 1 GiB
+CACHE_FILE_EXTENSION = ".pkl"
+
+
+def write_pickle(path: str, content) -> bool:
+    """Function to pickle an object to a file
+
+    The object is written to a temporary file in the same directory first and then moved, so that a reader
+    never sees a partly written file. If the object cannot be pickled we log a warning and write nothing.
+
+    Args:
+        path: A str value of the path of the file
+        content: The object to pickle
+
+    Returns:
+        A bool value, True if the file was written
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(file_descriptor, mode="wb") as pickle_file:
+            pickle.dump(content, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        logger.warning("Could not write %s: %s", path, error)
+        os.remove(temporary_path)
+        return False
+    return True
+
+
+def read_pickle(path: str):
+    """Function to read a pickled object from a file
+
+    Args:
+        path: A str value of the path of the file
+
+    Returns:
+        content: The unpickled object, or None if the file does not exist or cannot be read
+    """
+    try:
+        with open(path, mode="rb") as pickle_file:
+            return pickle.load(pickle_file)
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        logger.warning("Ignoring unreadable file %s", path)
+        return None
+
+
+def get_source_hash(function) -> str:
+    """Function to get a hash of the source code of a function
+
+    We use the source code when it is available, otherwise we fall back on the compiled code object,
+    for example for functions created with exec or in an interactive session
+
+    Args:
+        function: A function or callable decorated with step
+
+    Returns:
+        source_hash: A str value of the hex digest
+    """
+    function = inspect.unwrap(function)
+    try:
+        source = inspect.getsource(function).encode("utf-8")
+    except (OSError, TypeError):
+        source = marshal.dumps(function.__code__)
+    return hashlib.sha256(source).hexdigest()
+
+
+def get_param_hash(param_store: dict) -> str:
+    """Function to get a hash of the param_store of a Flow
+
+    Args:
+        param_store: A dict of parameters
+
+    Returns:
+        param_hash: A str value of the hex digest
+    """
+    items = sorted(param_store.items(), key=lambda item: str(item[0]))
+    try:
+        content = pickle.dumps(items, protocol=4)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        content = repr(items).encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_param_keys(function) -> Optional[frozenset]:
+    """Function to find the param_store keys a step reads
+
+    Args:
+        function: A function or callable decorated with step
+
+    Returns:
+        param_keys: A frozenset of the keys, or None if the step may read any key
+    """
+    function = inspect.unwrap(function)
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+    except (OSError, TypeError, SyntaxError):
+        return None
+
+    param_keys = set()
+    # ids of the 'param_store' attributes used in a way we understand
+    read_nodes = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript):
+            store, key = node.value, node.slice
+            # the slice is wrapped in ast.Index before Python 3.9
+            if isinstance(key, getattr(ast, "Index", ())):
+                key = key.value
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "get"
+            and node.args
+        ):
+            store, key = node.func.value, node.args[0]
+        else:
+            continue
+        if (
+            isinstance(store, ast.Attribute)
+            and store.attr == "param_store"
+            and isinstance(key, ast.Constant)
+        ):
+            param_keys.add(key.value)
+            read_nodes.add(id(store))
+
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Attribute)
+            and node.attr == "param_store"
+            and id(node) not in read_nodes
+        ):
+            return None
+    return frozenset(param_keys)
+
+
+def get_param_hashes(graph, param_store: dict) -> dict:
+    """Function to get the hash of the values of the param_store keys each node of a Flow reads
+
+    Args:
+        graph: The Graph of the Flow
+        param_store: A dict of parameters
+
+    Returns:
+        param_hashes: A dict of {node.name: param_hash}
+    """
+    all_param_hash = None
+    param_hashes = {}
+    for node in chain(*graph.levels):
+        param_keys = get_param_keys(node.function_reference)
+        if param_keys is None:
+            if all_param_hash is None:
+                all_param_hash = get_param_hash(param_store)
+            param_hashes[node.name] = all_param_hash
+        else:
+            param_hashes[node.name] = get_param_hash(
+                {key: param_store[key] for key in param_keys if key in param_store}
+            )
+    return param_hashes
+
+
+@dataclass
+class StepCache:
+    """A class for a content addressed, size bounded cache of step outputs in a local directory
+
+    Each entry is a pickled NodeResult, the output of the step along with the attributes it set on 'self'.
+    The file name is '<flow name>.<step name>.<cache key>.pkl'. When the total size of the directory is more
+    than max_size, we remove the least recently used entries. The directory is scanned once for its size, after
+    which the size is kept up to date as entries are stored, so it is only scanned again when we evict.
+
+    Attributes:
+        directory: A str value of the cache directory, defaults to '.flowrunner/cache'
+        max_size: An optional int value of the maximum size of the cache in bytes, defaults to 1 GiB, None never
+            evicts entries
+    """
+
+    directory: str = DEFAULT_CACHE_DIRECTORY
+    max_size: Optional[int] = DEFAULT_MAX_SIZE
+
+    def __post_init__(self):
+        """Post init to create the size of the cache directory, scanned on the first store"""
+        self._size = None
+        self._size_lock = threading.Lock()
+
+    def get_keys(self, graph, flow_instance) -> dict:
+        """Method to get the cache key of each node of a Flow
+
+        The keys only depend on the code and the parameters each step reads, not on the outputs, so we can get all
+        of them before the run. We go through Graph.levels so the keys of the previous nodes are always ready.
+
+        Args:
+            graph: The Graph of the Flow
+            flow_instance: An instance of the Flow class
+
+        Returns:
+            cache_keys: A dict of {node.name: cache key}
+        """
+        flow_name = flow_instance.__class__.__name__
+        param_hashes = get_param_hashes(graph, flow_instance.param_store)
+        previous = graph.get_previous()
+        cache_keys = {}
+        for node in chain(*graph.levels):
+            key_content = "\n".join(
+                [
+                    flow_name,
+                    node.name,
+                    get_source_hash(node.function_reference),
+                    param_hashes[node.name],
+                ]
+                + sorted(
+                    cache_keys[previous_node] for previous_node in previous[node.name]
+                )
+            )
+            cache_keys[node.name] = hashlib.sha256(
+                key_content.encode("utf-8")
+            ).hexdigest()
+        return cache_keys
+
+    def _get_path(self, flow_name: str, node_name: str, key: str) -> str:
+        """Private method to get the path of a cache entry"""
+        return os.path.join(
+            self.directory, f"{flow_name}.{node_name}.{key}{CACHE_FILE_EXTENSION}"
+        )
+
+    def _get_entries(self) -> list:
+        """Private method to get the entries in the cache directory
+
+        Returns:
+            entries: A list of os.DirEntry objects for the cache files
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(CACHE_FILE_EXTENSION)
+        ]
+
+    def load(self, flow_name: str, node_name: str, key: str) -> Optional[NodeResult]:
+        """Method to load a cache entry
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            key: A str value of the cache key of the node
+
+        Returns:
+            node_result: A NodeResult if the entry is in the cache, otherwise None
+        """
+        path = self._get_path(flow_name, node_name, key)
+        node_result = read_pickle(path)
+        if node_result is None:
+            return None
+        os.utime(path)  # mark the entry as recently used
+        logger.debug("Loaded %s.%s from cache", flow_name, node_name)
+        return node_result
+
+    def store(self, flow_name: str, node_name: str, key: str, node_result: NodeResult):
+        """Method to store a cache entry
+
+        If the output cannot be pickled we log a warning and do not cache it.
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            key: A str value of the cache key of the node
+            node_result: The NodeResult to store
+
+        Returns:
+            None
+        """
+        path = self._get_path(flow_name, node_name, key)
+        previous_size = os.path.getsize(path) if os.path.isfile(path) else 0
+        if not write_pickle(path, node_result):
+            return
+        logger.debug("Stored %s.%s in cache", flow_name, node_name)
+        if self.max_size is None:
+            return
+        with self._size_lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in self._get_entries())
+            else:
+                self._size += os.path.getsize(path) - previous_size
+            if self._size <= self.max_size:
+                return
+        self.evict()
+
+    def evict(self):
+        """Method to remove the least recently used entries until the cache fits in max_size
+
+        Returns:
+            None
+        """
+        if self.max_size is None:
+            return
+        with self._size_lock:
+            entries = sorted(
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in self._get_entries()
+            )
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # removed by another process
+                    pass
+                total_size -= size
+                logger.debug("Evicted %s from cache", path)
+            self._size = total_size
+
+    def get_stats(self) -> dict:
+        """Method to get statistics of the cache
+
+        Returns:
+            stats: A dict with the total number of entries and size, and the number of entries and size per step
+                eg. {'entries': 2, 'size': 1024, 'steps': {'ExampleFlow.method1': {'entries': 2, 'size': 1024}}}
+        """
+        stats = {"entries": 0, "size": 0, "steps": {}}
+        for entry in self._get_entries():
+            size = entry.stat().st_size
+            step_name = entry.name.rsplit(".", 2)[0]  # '<flow name>.<step name>'
+            step_stats = stats["steps"].setdefault(step_name, {"entries": 0, "size": 0})
+            step_stats["entries"] += 1
+            step_stats["size"] += size
+            stats["entries"] += 1
+            stats["size"] += size
+        return stats
+
+    def clear(self, flow_name: str = None, node_name: str = None) -> int:
+        """Method to remove entries from the cache
+
+        Args:
+            flow_name: An optional str value, only remove the entries of this Flow class
+            node_name: An optional str value, only remove the entries of steps with this name
+
+        Returns:
+            removed: An int value of the number of entries removed
+        """
+        removed = 0
+        for entry in self._get_entries():
+            entry_flow_name, entry_node_name, _ = entry.name.split(".", 2)
+            if flow_name and entry_flow_name != flow_name:
+                continue
+            if node_name and entry_node_name != node_name:
+                continue
+            os.remove(entry.path)
+            removed += 1
+        with self._size_lock:
+            self._size = None
+        return removed
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""Module for the state shared by the nodes of a single run of a Flow
+
+RunContext: A class containing the Flow instance, its Graph and the options of a run, used by every way of running a node
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from flowrunner.core.base import Graph
+from flowrunner.runner.cache import StepCache
+from flowrunner.runner.checkpoint import RunCheckpoint
+from flowrunner.runner.digest import get_digest
+from flowrunner.runner.incremental import RunState
+from flowrunner.runner.process import NodeResult
+from flowrunner.runner.profiler import profile_node
+from flowrunner.runner.report import RunReport, measure_node
+from flowrunner.runner.transport import SharedMemoryTransport
+from flowrunner.system.logger import logger
+
+
+@dataclass
+class RunContext:
+    """A class containing the Flow instance, its Graph and the options of a run
+
+    The runner calls restore_node_result before running a node, which returns True if the node does not
+    have to run, and store_node_result after a node has run. These are the same whether the node runs
+    in the main thread, in a thread pool, in a worker process or on an event loop.
+
+    Attributes:
+        flow_instance: An instance of the Flow class
+        graph: The Graph of the Flow
+        step_cache: An optional StepCache, used for the steps with @step(cache=True) or all steps if cache_all is True
+        cache_all: A bool value, True to cache the output of every step
+        checkpoint: An optional RunCheckpoint, every completed node is stored in it and nodes already in it are restored
+        release_outputs: A bool value, True to remove the output of a node from data_store once all of its next nodes
+            have finished. The outputs of end nodes and nodes with @step(pin=True) are kept
+        transport: An optional SharedMemoryTransport, used to pass outputs to and from worker processes
+        profile_all: A bool value, True to profile every node, not only the steps with @step(profile=True)
+        rerun: An optional set of str values of the names of nodes that are run even if their result could be
+            restored, eg. the from_steps of a partial run and the steps after them
+        run_state: An optional RunState of an incremental run, every node is stored in it and restored from it
+        fingerprints: An optional dict of {node.name: fingerprint}, recorded in run_state once each node finished
+        dirty: An optional list of str values of the names of the nodes whose fingerprint changed since the last run
+        report: The RunReport of the run, assigned in __post_init__
+        data_store_lock: A threading.Lock guarding writes to the instance, assigned in __post_init__
+        cache_keys: A dict of {node.name: cache key}, assigned in __post_init__
+        consumers: A dict of {node.name: number of next nodes that have not finished}, assigned in __post_init__
+        previous: A dict of {node.name: list of previous node names}, assigned in __post_init__
+        affected: A set of str values of the names of the dirty nodes and the nodes after them, which are run
+            unless their inputs did not change, assigned in __post_init__
+        changed: A set of str values of the names of the nodes whose output changed in this run, assigned in
+            __post_init__
+    """
+
+    flow_instance: object
+    graph: Graph
+    step_cache: StepCache = None
+    cache_all: bool = False
+    checkpoint: RunCheckpoint = None
+    release_outputs: bool = False
+    transport: SharedMemoryTransport = None
+    profile_all: bool = False
+    rerun: set = None
+    run_state: RunState = None
+    fingerprints: dict = None
+    dirty: list = None
+
+    def __post_init__(self):
+        """Post init to get the cache keys of the nodes, only if any of them is cached,
+        to count the next nodes of each node, to start the RunReport and to forget the fingerprints
+        of the nodes that may run again in the RunState"""
+        self.data_store_lock = threading.Lock()
+        self.report = RunReport(flow_name=self.flow_name)
+        self.consumers = {node.name: len(node.next) for node in self.graph.nodes}
+        self.previous = self.graph.get_previous()
+        self.cache_keys = {}
+        if self.step_cache is not None and (
+            self.cache_all or any(node.cache for node in self.graph.nodes)
+        ):
+            self.cache_keys = self.step_cache.get_keys(self.graph, self.flow_instance)
+        self.affected = set()
+        self.changed = set()
+        if self.run_state is not None:
+            dirty = list(self.dirty or [])
+            self.affected = set(dirty) | self.graph.get_downstream(dirty)
+            self.run_state.forget(self.flow_name, self.affected | set(self.rerun or ()))
+
+    @property
+    def flow_name(self) -> str:
+        """The name of the Flow class"""
+        return self.flow_instance.__class__.__name__
+
+    def is_cached(self, node) -> bool:
+        """Method to check if the output of a node is cached
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            A bool value, True if the node is cached
+        """
+        return node.name in self.cache_keys and (self.cache_all or node.cache)
+
+    def keeps_result(self, node) -> bool:
+        """Method to check if the NodeResult of a node is kept after the run, in the cache, a checkpoint or a RunState
+
+        Only then do the attributes the node sets on the instance have to be collected. This is done by comparing
+        the instance before and after the node runs, so it is skipped for the other nodes: it costs a pass over
+        the attributes, and with threads, it can pick up an attribute set by a node running at the same time.
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            A bool value, True if the NodeResult is stored
+        """
+        return (
+            self.is_cached(node)
+            or self.checkpoint is not None
+            or self.run_state is not None
+        )
+
+    def is_profiled(self, node) -> bool:
+        """Method to check if a node is profiled
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            A bool value, True if the node is profiled
+        """
+        return self.profile_all or node.profile
+
+    @contextmanager
+    def profile(self, node):
+        """Context manager to profile a node, if it is profiled, while it runs in the current thread
+
+        The StepProfile is added to the RunReport of the run, even if the node fails
+
+        Args:
+            node: A Node of the Graph
+
+        Yields:
+            None
+        """
+        if not self.is_profiled(node):
+            yield
+            return
+        with profile_node(node.name, node.function_reference) as step_profile:
+            try:
+                yield
+            finally:
+                self.report.profiles[node.name] = step_profile
+
+    @contextmanager
+    def measure(self, node, cpu: bool = True):
+        """Context manager to measure a node and add its NodeReport to the RunReport of the run
+
+        Args:
+            node: A Node of the Graph
+            cpu: A bool value, True to measure the CPU time of the current thread
+
+        Yields:
+            node_report: The NodeReport of the node
+        """
+        with measure_node(node.name, cpu=cpu) as node_report:
+            self.report.add(node_report)
+            yield node_report
+
+    def is_unchanged(self, node) -> bool:
+        """Method to check if a node after a dirty node can be cut off, i.e restored instead of run
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            A bool value, True if the node is not dirty itself and none of its previous nodes has a changed output
+        """
+        return node.name not in (self.dirty or ()) and not any(
+            previous_node in self.changed for previous_node in self.previous[node.name]
+        )
+
+    def apply_node_result(self, node_result: NodeResult):
+        """Method to apply a NodeResult to the Flow instance
+
+        We store the output in BaseFlow.data_store and set the attributes on the instance
+
+        Args:
+            node_result: A NodeResult of a node
+
+        Returns:
+            None
+        """
+        with self.data_store_lock:
+            self.flow_instance.data_store[node_result.name] = node_result.output
+            for attribute_name, value in node_result.attributes.items():
+                setattr(self.flow_instance, attribute_name, value)
+
+    def restore_node_result(self, node) -> bool:
+        """Method to restore the result of a node instead of running it
+
+        We first look for a checkpoint of the node in the run being resumed, then in the RunState of the last
+        run, then in the cache. A result restored from the RunState or the cache is also checkpointed, so the run
+        can be resumed even if they are cleared. A node after a dirty node is only restored from the RunState if
+        its inputs did not change, otherwise its output is taken to have changed unless it is run and has the
+        same digest as in the last run.
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            A bool value, True if the result was restored and the node does not have to run
+        """
+        if self.rerun and node.name in self.rerun:
+            return False
+        if node.name in self.affected:
+            # until it is cut off or run with the same digest
+            self.changed.add(node.name)
+        if self.checkpoint is not None:
+            node_result = self.checkpoint.load(self.flow_name, node.name)
+            if node_result is not None:
+                self.apply_node_result(node_result)
+                return True
+        node_result = None
+        if self.run_state is not None and (
+            node.name not in self.affected or self.is_unchanged(node)
+        ):
+            node_result = self.run_state.load(
+                self.flow_name, node.name, flow_instance=self.flow_instance
+            )
+            if node_result is not None and node.name in self.affected:
+                logger.debug("Inputs of %s did not change, restoring it", node.name)
+                self.changed.discard(node.name)
+        if node_result is None and self.is_cached(node):
+            node_result = self.step_cache.load(
+                self.flow_name, node.name, self.cache_keys[node.name]
+            )
+            if node_result is not None and self.run_state is not None:
+                self.run_state.store(self.flow_name, node.name, node_result)
+        if node_result is None:
+            return False
+        self.apply_node_result(node_result)
+        if self.checkpoint is not None:
+            self.checkpoint.store(self.flow_name, node.name, node_result)
+        return True
+
+    def store_node_result(self, node, node_result: NodeResult):
+        """Method to store the result of a node after it has run
+
+        Args:
+            node: A Node of the Graph
+            node_result: The NodeResult of the node
+
+        Returns:
+            None
+        """
+        if self.is_cached(node):
+            self.step_cache.store(
+                self.flow_name, node.name, self.cache_keys[node.name], node_result
+            )
+        if self.checkpoint is not None:
+            self.checkpoint.store(self.flow_name, node.name, node_result)
+        if self.run_state is not None:
+            self.run_state.store(self.flow_name, node.name, node_result)
+            digest = get_digest((node_result.output, node_result.attributes))
+            recorded_digest = self.run_state.get_digests(self.flow_name).get(node.name)
+            if digest is None or digest != recorded_digest:
+                self.changed.add(node.name)
+            else:
+                self.changed.discard(node.name)
+            self.run_state.record_digest(self.flow_name, node.name, digest)
+
+    def finish_node(self, node):
+        """Method called once a node has finished, whether it was run or restored
+
+        With a run_state, we record the fingerprint of the node. If release_outputs is set, we count down the next nodes of each of its previous nodes and remove
+        the output of a previous node from data_store once all of its next nodes have finished. End nodes
+        have no next nodes, so their output is never removed
+
+        Args:
+            node: A Node of the Graph
+
+        Returns:
+            None
+        """
+        if self.run_state is not None:
+            self.run_state.record(
+                self.flow_name, node.name, self.fingerprints[node.name]
+            )
+        if not self.release_outputs:
+            return
+        with self.data_store_lock:
+            for previous_node_name in self.previous[node.name]:
+                self.consumers[previous_node_name] -= 1
+                previous_node = self.graph.node_map[previous_node_name]
+                if (
+                    self.consumers[previous_node_name] == 0
+                    and not previous_node.pin
+                    and previous_node_name in self.flow_instance.data_store
+                ):
+                    # we use del rather than pop, so a data store that spills to disk does not load the output
+                    del self.flow_instance.data_store[previous_node_name]
+                    logger.debug("Released output of %s", previous_node_name)
@@ -0,0 +1,1154 @@
+# -*- coding: utf-8 -*-
+"""This module contains two main exposed classes
+to uses
+BaseFlow: A base class to build flows off of
+FlowRunner: A class to run any subclass of BaseFlow
+"""
+import asyncio
+from collections.abc import MutableMapping
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import click
+
+from flowrunner.core.base import Graph, GraphOptions
+from flowrunner.core.helpers import DAGGenerator, GraphValidator
+from flowrunner.runner.cache import StepCache
+from flowrunner.runner.checkpoint import RunCheckpoint
+from flowrunner.runner.context import RunContext
+from flowrunner.runner.incremental import get_fingerprints, get_run_state
+from flowrunner.runner.plan import DEFAULT_MAX_WORKERS, FlowPlan
+from flowrunner.runner.process import (
+    NodeResult,
+    get_attributes,
+    get_changed_attributes,
+    run_node_in_process,
+    snapshot_attributes,
+)
+from flowrunner.runner.report import STATUS_RESTORED, call_measured, measure_node
+from flowrunner.runner.scheduler import DependencyScheduler
+from flowrunner.runner.selection import select_nodes
+from flowrunner.runner.store import get_size
+from flowrunner.runner.trace import save_trace
+from flowrunner.runner.transport import SharedMemoryTransport
+from flowrunner.system.logger import logger
+
+# name of the class attribute that stores the compiled (fingerprint, graph) of a Flow class
+GRAPH_CACHE_ATTRIBUTE = "_flowrunner_graph"
+
+
+@dataclass
+class BaseFlow:
+    """BaseFlow is the base class on which all flows are
+    derived from
+
+    These are not meant to be used directly, but subclass/parent class for any Flow
+
+    Attrs:
+        data_store: A dict that is meant to be used to store data by method name and output eg. {'dataframe1': DataFrame}.
+            Any MutableMapping can be used, eg. a SpillableDataStore to keep outputs within a memory budget.
+        param_store: A dict that stores parameter values eg. {'snapshot_date': '2023-01-01}.
+
+    """
+
+    data_store: MutableMapping = field(
+        default_factory=lambda: {}
+    )  # a way to store any data and output from methods if any
+    param_store: dict = field(
+        default_factory=lambda: {}
+    )  # a way to store any input params to the Flow
+
+    def __post_init__(self):
+        """Post init to add attributes like levels
+
+        Args:
+            None
+
+        Returns:
+            None: But we
+        """
+        graph = FlowRunner()._get_details(self)
+        self.graph = graph
+
+    def validate(self, terminal_output: bool = True):
+        """Method to validate a flow
+
+        We use the FlowRunner class to run the validation checks.
+
+        Args:
+            flow_instance: An instance of the Flow class
+            terminal_ouput: An optional bool value of whether to display the terminal output
+               for validate we choose to show the output, defaults to True
+        Returns:
+            None
+        """
+        FlowRunner().validate(flow_instance=self, terminal_output=terminal_output)
+
+    def validate_with_error(self, terminal_output: bool = True):
+        """Method to validate a flow with an error
+
+        We use the FlowRunner class to run the validation checks.
+        Args:
+            flow_instance: An instance of the Flow class
+            terminal_ouput: An optional bool value of whether to display the terminal output
+               for validate we choose to show the output, defaults to True
+        Returns:
+            None
+
+        Raises:
+            InvalidFlowException: If an invalid flow is detected
+        """
+        FlowRunner().validate_with_error(
+            flow_instance=self, terminal_output=terminal_output
+        )
+
+    def run(
+        self,
+        max_workers: int = None,
+        executor: str = "thread",
+        cache=False,
+        checkpoint=False,
+        resume=None,
+        release_outputs: bool = False,
+        shared_memory=False,
+        trace: str = None,
+        profile_steps: bool = False,
+        targets: list = None,
+        from_steps: list = None,
+        incremental=False,
+    ):
+        """Method to run a flow
+
+        We first run a validation check with raise error and do not show the output. Then
+        we use the FlowRunner class to run it
+
+        Args:
+            max_workers: An optional int value of the number of workers used to run nodes concurrently,
+                defaults to None which runs each node one after another
+            executor: An optional str value of 'thread' or 'process', the kind of workers to use. See
+                flowrunner.runner.process for what the 'process' executor expects of a Flow
+            cache: An optional bool value or StepCache, True to cache the output of every step, defaults to False
+                which only caches steps with @step(cache=True)
+            checkpoint: An optional bool value or RunCheckpoint, True to checkpoint every completed step so that
+                the run can be resumed if it fails
+            resume: An optional str value of the run id of a failed run to resume, its completed steps are not run again
+            release_outputs: An optional bool value, True to remove the output of a step from data_store once all
+                of its next steps have finished, only outputs of end steps and @step(pin=True) are kept
+            shared_memory: An optional bool value or SharedMemoryTransport, True to pass large numpy arrays and
+                DataFrames to and from worker processes through shared memory, only with the 'process' executor
+            trace: An optional str value of a JSON file to write a Chrome trace of the run to, see
+                flowrunner.runner.trace
+            profile_steps: An optional bool value, True to profile every step, not only the steps with
+                @step(profile=True). The profiles are in the 'profiles' of the RunReport, see flowrunner.runner.profiler
+            targets: An optional list of str values of the steps to run, with the steps before them whose output is
+                not already in data_store, see flowrunner.runner.selection
+            from_steps: An optional list of str values of the steps to run again along with every step after them
+            incremental: An optional bool value, str value of a directory or RunState, True to only run the steps
+                that changed since the last run of the Flow in this process and the steps after them, a directory
+                to keep the state of the last run in, see flowrunner.runner.incremental
+        Returns:
+            run_report: A RunReport with the timings and resource usage of each step, see flowrunner.runner.report
+
+        Raises:
+            InvalidFlowException: If an invalid flow is detected
+            ValueError: If a target or from step is not a step of the Flow
+        """
+        FlowRunner().validate_with_error(
+            flow_instance=self, terminal_output=False
+        )  # we run this in case of an invalid flow
+        return FlowRunner().run(
+            flow_instance=self,
+            max_workers=max_workers,
+            executor=executor,
+            cache=cache,
+            checkpoint=checkpoint,
+            resume=resume,
+            release_outputs=release_outputs,
+            shared_memory=shared_memory,
+            trace=trace,
+            profile_steps=profile_steps,
+            targets=targets,
+            from_steps=from_steps,
+            incremental=incremental,
+        )
+
+    async def arun(
+        self,
+        max_workers: int = None,
+        cache=False,
+        checkpoint=False,
+        resume=None,
+        release_outputs: bool = False,
+        trace: str = None,
+        profile_steps: bool = False,
+        targets: list = None,
+        from_steps: list = None,
+        incremental=False,
+    ):
+        """Method to run a flow on the running event loop
+
+        We first run a validation check with raise error and do not show the output. Then
+        we use the FlowRunner class to run it. This is meant for flows with 'async def' steps, eg. in a notebook
+        you can use 'await flow.arun()'
+
+        Args:
+            max_workers: An optional int value of the maximum number of steps running at the same time,
+                defaults to None which does not limit it
+            cache: An optional bool value or StepCache, True to cache the output of every step, defaults to False
+                which only caches steps with @step(cache=True)
+            checkpoint: An optional bool value or RunCheckpoint, True to checkpoint every completed step
+            resume: An optional str value of the run id of a failed run to resume
+            release_outputs: An optional bool value, True to remove outputs from data_store once they are not needed
+            trace: An optional str value of a JSON file to write a Chrome trace of the run to
+            profile_steps: An optional bool value, True to profile every step
+            targets: An optional list of str values of the steps to run, see BaseFlow.run
+            from_steps: An optional list of str values of the steps to run again with every step after them
+            incremental: An optional bool value, str value of a directory or RunState, see BaseFlow.run
+        Returns:
+            run_report: A RunReport with the timings and resource usage of each step
+
+        Raises:
+            InvalidFlowException: If an invalid flow is detected
+            ValueError: If a target or from step is not a step of the Flow
+        """
+        FlowRunner().validate_with_error(flow_instance=self, terminal_output=False)
+        return await FlowRunner().arun(
+            flow_instance=self,
+            max_workers=max_workers,
+            cache=cache,
+            checkpoint=checkpoint,
+            resume=resume,
+            release_outputs=release_outputs,
+            trace=trace,
+            profile_steps=profile_steps,
+            targets=targets,
+            from_steps=from_steps,
+            incremental=incremental,
+        )
+
+    def show(self):
+        """Method to show the levels and order of iteration of the Flow
+
+        We first run a validation check without raising an error and do not show the output. Then
+        we use the FlowRunner class to run it
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        FlowRunner().validate(flow_instance=self, terminal_output=False)
+        FlowRunner().show(flow_instance=self)
+
+    def plan(self, run_report=None, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Method to show how long the Flow takes with 1 to max_workers workers, without running it
+
+        We first run a validation check without raising an error and do not show the output. Then
+        we use the FlowRunner class to plan it
+
+        Args:
+            run_report: An optional RunReport returned by BaseFlow.run, to take the duration of each step from.
+                Without one every step takes 1
+            max_workers: An int value of the largest number of workers to simulate, defaults to 8
+
+        Returns:
+            flow_plan: A FlowPlan with the work, span, width and simulated makespans of the Flow
+        """
+        FlowRunner().validate(flow_instance=self, terminal_output=False)
+        return FlowRunner().plan(
+            flow_instance=self, run_report=run_report, max_workers=max_workers
+        )
+
+    def display(self, description: bool = True, run_report=None, renderer: str = "svg"):
+        """Method to show html output of the flowchart
+
+        Args:
+            description: An optional bool argument which can turn off/on description. Defaults to True
+            run_report: An optional RunReport returned by BaseFlow.run, to show the duration of each step
+            renderer: An optional str value of 'svg' to draw the flowchart without network access or 'mermaid' to
+                fetch it from https://mermaid.ink, defaults to 'svg'
+
+        Returns:
+            None: displays an html flowchart of the Flow
+
+        """
+        return DAGGenerator().display(
+            flow_instance=self,
+            description=description,
+            run_report=run_report,
+            renderer=renderer,
+        )
+
+    def dag(
+        self,
+        save_file: bool = False,
+        path: str = None,
+        description: bool = True,
+        run_report=None,
+        renderer: str = "mermaid",
+    ):
+        """Method to generate html flowchart for Flow
+
+        We first run a validation check without raising an error and do not show the output. Then
+        we use the FlowRunner class to run it
+
+        Args:
+            save_file: Optional Bool value to save file or not
+            path: Optional path to provide to save file, if path is provided, save_file is True implicitly
+            run_report: An optional RunReport returned by BaseFlow.run, each step is labeled with its duration and
+                colored by its share of the total time and the critical path is highlighted
+            renderer: An optional str value of 'mermaid' to lay out the flowchart in the browser or 'svg' to embed
+                an SVG drawn in Python, defaults to 'mermaid'
+
+        Returns:
+            content: HTMl data in the form of string
+        """
+        return DAGGenerator().dag(
+            flow_instance=self,
+            save_file=save_file,
+            path=path,
+            description=description,
+            run_report=run_report,
+            renderer=renderer,
+        )
+
+
+@dataclass
+class FlowRunner:
+    """FlowRunner class is used to run all subclasses of BaseFlow class.
+
+    We use class methods to run each of the flows
+    """
+
+    @classmethod
+    def _get_fingerprint(cls, base_flow) -> tuple:
+        """Private class method to get a fingerprint of the steps of a Flow class
+
+        The fingerprint changes whenever a step is added, removed, replaced or its 'next' is changed,
+        which is when the compiled Graph of the class has to be built again
+
+        Args:
+            base_flow: A subclass of BaseFlow
+
+        Returns:
+            fingerprint: A tuple of (method name, method, next) for each step of the class
+        """
+        return tuple(
+            (name_func, func, repr(func.next))
+            for name_func, func in base_flow.__dict__.items()
+            if callable(func) and hasattr(func, "is_step")
+        )
+
+    @classmethod
+    def _get_details(cls, flow_instance):
+        """Private class method to get details of a flow
+
+        The Graph is built once for each Flow class and reused by all of its instances, it is only built
+        again if the steps of the class change. We store it on the class itself, we look it up in the
+        class __dict__ so that a subclass of a Flow does not pick up the Graph of its parent
+
+        Args:
+            flow_instance: An instance of the Flow class
+
+        Returns:
+            graph: A Graph object of the Flow
+
+        Raises:
+            InvalidFlowException: If an invalid flow is detected
+        """
+        base_flow = flow_instance.__class__
+        fingerprint = cls._get_fingerprint(base_flow)
+        cached = base_flow.__dict__.get(GRAPH_CACHE_ATTRIBUTE)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        graph_options = GraphOptions(base_flow)
+        graph = Graph(graph_options=graph_options)
+        setattr(base_flow, GRAPH_CACHE_ATTRIBUTE, (fingerprint, graph))
+        return graph
+
+    @classmethod
+    def validate(cls, flow_instance, terminal_output: bool = False):
+        """Class method to validate a Flow
+
+        We use the GraphValidator to do the heavy lifting for this part
+
+        Args:
+            flow_instance: An instance of the Flow class
+            terminal_output: An optional bool value to show output in terminal, defaults to False
+        Returns:
+            None
+
+        """
+        logger.debug("Validating flow for %s", flow_instance)
+        graph = cls._get_details(flow_instance=flow_instance)
+        graph_validator = GraphValidator(graph)
+        graph_validator.run_validations(terminal_output=terminal_output)
+
+    @classmethod
+    def validate_with_error(cls, flow_instance, terminal_output: bool = False):
+        """Class method to validate a Flow with an error
+
+        We use the GraphValidator to do the heavy lifting for this part. We raise an error
+        if validation check fails
+
+        Args:
+            flow_instance: An instance of the Flow class
+            terminal_output: An optional bool value to show output in terminal, defaults to False
+
+        Returns:
+            None
+
+        Raises:
+            InvalidFlow: Raised if ANY of the validation checks are failed
+        """
+        logger.debug("Validating flow for %s", flow_instance)
+        logger.warning(
+            "Validation will raise InvalidFlowException if invalid Flow found"
+        )
+        graph = cls._get_details(flow_instance=flow_instance)
+        graph_validator = GraphValidator(graph)
+        graph_validator.run_validations_raise_error(terminal_output=terminal_output)
+
+    @classmethod
+    def _get_run_context(
+        cls,
+        flow_instance,
+        graph,
+        cache=False,
+        checkpoint=False,
+        resume=None,
+        release_outputs: bool = False,
+        profile_steps: bool = False,
+        rerun: set = None,
+        run_state=None,
+        fingerprints: dict = None,
+        dirty: list = None,
+    ) -> RunContext:
+        """Private class method to create the RunContext of a run
+
+        Args:
+            flow_instance: An instance of the Flow class
+            graph: The Graph of the Flow
+            cache: A bool value or StepCache. False caches only the steps with @step(cache=True) in the default
+                StepCache, True caches every step in the default StepCache and a StepCache caches every step in it
+            checkpoint: A bool value or RunCheckpoint. True checkpoints every completed node in a new run directory
+            resume: An optional str value of a run id or RunCheckpoint of a previous run to resume, the completed
+                nodes of that run are restored and the new ones are checkpointed in the same run directory
+            release_outputs: A bool value, True to remove outputs from data_store once all their next nodes finished
+            profile_steps: A bool value, True to profile every node
+            rerun: An optional set of str values of the nodes to run even if their result can be restored
+            run_state: An optional RunState of an incremental run
+            fingerprints: An optional dict of {node.name: fingerprint} of the nodes of an incremental run
+            dirty: An optional list of str values of the nodes of an incremental run that changed since the last run
+
+        Returns:
+            run_context: A RunContext for the run
+
+        Raises:
+            ValueError: If there are no checkpoints for the run to resume
+        """
+        step_cache = cache if isinstance(cache, StepCache) else StepCache()
+
+        run_checkpoint = None
+        if resume is not None:
+            run_checkpoint = (
+                resume
+                if isinstance(resume, RunCheckpoint)
+                else RunCheckpoint(run_id=resume)
+            )
+            if not run_checkpoint.exists():
+                raise ValueError(
+                    f"No checkpoints found for run '{run_checkpoint.run_id}' in {run_checkpoint.directory}"
+                )
+            logger.info("Resuming run %s", run_checkpoint.run_id)
+        elif checkpoint:
+            run_checkpoint = (
+                checkpoint if isinstance(checkpoint, RunCheckpoint) else RunCheckpoint()
+            )
+            logger.info(
+                "Checkpointing run %s in %s",
+                run_checkpoint.run_id,
+                run_checkpoint.run_directory,
+            )
+
+        return RunContext(
+            flow_instance=flow_instance,
+            graph=graph,
+            step_cache=step_cache,
+            cache_all=cache is not False,
+            checkpoint=run_checkpoint,
+            release_outputs=release_outputs,
+            profile_all=profile_steps,
+            rerun=rerun,
+            run_state=run_state,
+            fingerprints=fingerprints,
+            dirty=dirty,
+        )
+
+    @classmethod
+    def _run_node(cls, run_context: RunContext, node):
+        """Private class method to run a single node of a Flow
+
+        We call the method and store its output in BaseFlow.data_store. The write is done under
+        a lock so that nodes running in different threads do not write at the same time. If the
+        result of the node can be restored, eg. from the cache, we do not call the method. Either way
+        the node is measured in the RunReport of the run.
+
+        Args:
+            run_context: The RunContext of the run
+            node: The Node to be run
+
+        Returns:
+            None
+        """
+        with run_context.measure(node) as node_report:
+            if run_context.restore_node_result(node):
+                node_report.status = STATUS_RESTORED
+            else:
+                flow_instance = run_context.flow_instance
+                # only the attributes of a result that is stored are collected, see RunContext.keeps_result
+                snapshot = (
+                    snapshot_attributes(flow_instance)
+                    if run_context.keeps_result(node)
+                    else None
+                )
+                with run_context.profile(node):
+                    output = node.function_reference(
+                        flow_instance
+                    )  # store the output of the method
+                with run_context.data_store_lock:
+                    flow_instance.data_store[
+                        node.name
+                    ] = output  # we add it to the instance data_store = {'function_name_1': df}
+                node_report.output_size = get_size(output)
+                node_result = NodeResult(
+                    name=node.name,
+                    output=output,
+                    attributes=(
+                        get_changed_attributes(flow_instance, snapshot)
+                        if snapshot is not None
+                        else {}
+                    ),
+                )
+                run_context.store_node_result(node, node_result)
+        run_context.finish_node(node)
+
+    @classmethod
+    def _submit_node_to_process(cls, executor, run_context: RunContext, node):
+        """Private class method to submit a single node of a Flow to a process pool
+
+        We ship only the data_store entries of the nodes upstream of this node along with
+        the param_store and the attributes set so far on the instance. With a SharedMemoryTransport,
+        large entries are published in shared memory once and only their handles are shipped
+
+        Args:
+            executor: An instance of ProcessPoolExecutor
+            run_context: The RunContext of the run
+            node: The Node to be run
+
+        Returns:
+            future: A Future of a NodeResult, or of None if the result of the node was restored
+        """
+        with measure_node(node.name) as node_report:
+            restored = run_context.restore_node_result(node)
+        if restored:
+            node_report.status = STATUS_RESTORED
+            run_context.report.add(node_report)
+            future = Future()
+            future.set_result(None)
+            return future
+        flow_instance = run_context.flow_instance
+        transport = run_context.transport
+        upstream_data = {
+            node_name: flow_instance.data_store[node_name]
+            for node_name in run_context.graph.get_upstream([node.name])
+            if node_name in flow_instance.data_store
+        }
+        if transport is not None:
+            upstream_data = {
+                node_name: transport.publish(node_name, value)
+                for node_name, value in upstream_data.items()
+            }
+        return executor.submit(
+            run_node_in_process,
+            flow_instance.__class__,
+            node.name,
+            get_attributes(flow_instance),
+            flow_instance.param_store,
+            upstream_data,
+            None if transport is None else transport.min_size,
+            run_context.is_profiled(node),
+        )
+
+    @classmethod
+    def _merge_node_result(cls, run_context: RunContext, node, future):
+        """Private class method to merge the result of a node run in a worker process
+
+        Args:
+            run_context: The RunContext of the run
+            node: The Node that was run
+            future: A done Future of a NodeResult
+
+        Returns:
+            None
+        """
+        node_result = future.result()
+        # None if the result was restored, there is nothing to merge
+        if node_result is not None:
+            if run_context.transport is not None:
+                node_result.output = run_context.transport.adopt(
+                    node.name, node_result.output
+                )
+            run_context.apply_node_result(node_result)
+            run_context.store_node_result(node, node_result)
+            run_context.report.add(node_result.report)  # measured in the worker
+            if node_result.profile is not None:
+                run_context.report.profiles[node.name] = node_result.profile
+        run_context.finish_node(node)
+
+    @classmethod
+    def run(
+        cls,
+        flow_instance,
+        max_workers: int = None,
+        executor: str = "thread",
+        cache=False,
+        checkpoint=False,
+        resume=None,
+        release_outputs: bool = False,
+        shared_memory=False,
+        trace: str = None,
+        profile_steps: bool = False,
+        targets: list = None,
+        from_steps: list = None,
+        incremental=False,
+    ):
+        """Class method to run a Flow
+
+        This method actually runs the flow and each method in order of iteration. We also do a validation
+        check before we run it(without terminal output, just notification we are running it).
+        During the run we iterate of Graph using the Graph.levels attribute, which is a list
+            [
+                [node1, node2], # first level
+                [node3, node4]  # second level
+            ]
+
+        We also store the output of a function in that instance of the Flow, inside the attribute BaseFlow.data_store.
+
+        eg. {
+                'method_1': 7,
+                'method_2': 8
+            }
+
+        If max_workers is more than 1, the nodes are run in a thread pool by the DependencyScheduler, which
+        starts each node as soon as all the nodes that have it in their 'next' are finished, rather than waiting
+        for the whole level. Steps that run concurrently share the same instance, so they should not update the
+        same attribute on 'self'. When a step is cached, checkpointed or run incrementally, the attributes it set
+        are stored with its output. They are found by comparing the instance before and after the step, so with
+        threads, a step running at the same time should not set attributes on 'self' at all, or they can be stored
+        with the wrong step.
+
+        If executor is 'process', each node is run in a worker process instead, which helps with CPU bound steps
+        that hold the GIL. The output and the attributes set by the step are merged back into flow_instance, see
+        flowrunner.runner.process for the serialization contract.
+
+        If the Flow has any 'async def' steps and executor is 'thread', we run it with FlowRunner.arun on a new
+        event loop.
+
+        Steps decorated with @step(cache=True), or every step if cache is set, are stored in a StepCache and
+        reused on the next run if the step, the param_store and the steps before it have not changed.
+
+        With checkpoint, the result of every completed node is stored in a run directory. If the run fails,
+        it can be resumed with resume=<run id>, which restores the completed nodes instead of running them again.
+
+        With release_outputs, we keep a count of the next nodes of each node that have not finished and remove its
+        output from data_store once the count drops to 0, so intermediate outputs do not stay in memory for the whole
+        run. Only the outputs of end nodes and steps with @step(pin=True) are kept. A step can then only read the
+        data_store entries of the steps that have it in their 'next'.
+
+        With shared_memory and the 'process' executor, large numpy arrays and DataFrames are published once in
+        shared memory and mapped read-only by the workers instead of being pickled for every worker, see
+        flowrunner.runner.transport.
+
+        Steps decorated with @step(profile=True), or every step if profile_steps is set, are profiled while they
+        run, in whichever thread or process runs them, see flowrunner.runner.profiler.
+
+        With targets or from_steps, only the nodes returned by select_nodes are run, see flowrunner.runner.selection.
+        The nodes before them whose output is already in data_store are not run again.
+
+        With incremental, we get the fingerprint of each node from its source and the param_store keys it reads and
+        only run the nodes whose fingerprint changed since the last run and the nodes after them. The other nodes
+        are reused from data_store or restored from the RunState of the last run, see flowrunner.runner.incremental.
+        The output of every node that is run is hashed, and a node after a changed node is restored rather than run
+        if the outputs of the nodes before it have the same digest as in the last run (early cutoff).
+
+        Args:
+            flow_instance: An instance of the Flow class
+            max_workers: An optional int value of the number of workers to use, defaults to None which runs
+                each node one after another for 'thread' and uses the number of CPUs for 'process'
+            executor: An optional str value of 'thread' or 'process', defaults to 'thread'
+            cache: An optional bool value or StepCache, True to cache every step in the default StepCache or a StepCache
+                to cache every step in, defaults to False which only caches steps with @step(cache=True)
+            checkpoint: An optional bool value or RunCheckpoint, True to checkpoint every completed node in a new
+                run directory, defaults to False
+            resume: An optional str value of the run id, or RunCheckpoint, of a previous run to resume
+            release_outputs: An optional bool value, True to remove outputs from data_store once they are not needed,
+                defaults to False
+            shared_memory: An optional bool value or SharedMemoryTransport, True to use a SharedMemoryTransport with
+                the default min_size, defaults to False
+            trace: An optional str value of a JSON file to write a Chrome trace of the run to, it is written even
+                if the run fails, defaults to None
+            profile_steps: An optional bool value, True to profile every step, defaults to False which only profiles
+                steps with @step(profile=True)
+            targets: An optional list of str values of the steps to run, with the steps before them whose output is
+                not in data_store, defaults to None which runs every step
+            from_steps: An optional list of str values of the steps to run again along with every step after them,
+                up to the targets if there are any, defaults to None
+            incremental: An optional bool value, str value of a directory or RunState, True to keep the state of
+                the last run in memory or a directory to keep it in, defaults to False
+
+        Returns:
+            run_report: A RunReport with the timings and resource usage of each node
+
+        Raises:
+            InvalidFlow: Raised if ANY of the validation checks are failed
+            ValueError: If max_workers is less than 1, executor is not 'thread' or 'process', shared_memory is
+                used without the 'process' executor, there are no checkpoints for the run to resume or a target or
+                from step is not a step of the Flow
+            RuntimeError: If the Flow has 'async def' steps and an event loop is already running, use FlowRunner.arun
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if executor not in ("thread", "process"):
+            raise ValueError(
+                f"executor can only be 'thread' or 'process', got '{executor}'"
+            )
+        if shared_memory is not False and executor != "process":
+            raise ValueError("shared_memory can only be used with executor='process'")
+        logger.debug("Running flow for %s", flow_instance)
+        graph = cls._get_details(flow_instance=flow_instance)
+
+        if executor != "process" and any(node.is_async for node in graph.nodes):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:  # no running event loop, so we can start one
+                return asyncio.run(
+                    cls.arun(
+                        flow_instance=flow_instance,
+                        max_workers=max_workers,
+                        cache=cache,
+                        checkpoint=checkpoint,
+                        resume=resume,
+                        release_outputs=release_outputs,
+                        trace=trace,
+                        profile_steps=profile_steps,
+                        targets=targets,
+                        from_steps=from_steps,
+                        incremental=incremental,
+                    )
+                )
+            raise RuntimeError(
+                "Flow has 'async def' steps and an event loop is already running, use 'await flow.arun()' instead"
+            )
+
+        run_state = get_run_state(incremental)
+        fingerprints, dirty = cls._get_dirty(flow_instance, graph, run_state)
+        node_names = cls._select_nodes(flow_instance, graph, targets, from_steps, dirty)
+
+        run_context = cls._get_run_context(
+            flow_instance,
+            graph,
+            cache=cache,
+            checkpoint=checkpoint,
+            resume=resume,
+            release_outputs=release_outputs,
+            profile_steps=profile_steps,
+            rerun=cls._get_rerun(graph, from_steps),
+            run_state=run_state,
+            fingerprints=fingerprints,
+            dirty=dirty,
+        )
+
+        try:
+            cls._run_graph(
+                run_context,
+                node_names=node_names,
+                max_workers=max_workers,
+                executor=executor,
+                shared_memory=shared_memory,
+            )
+        finally:
+            cls._finish_report(run_context, trace)
+        return run_context.report
+
+    @classmethod
+    def _get_dirty(cls, flow_instance, graph, run_state=None) -> tuple:
+        """Private class method to get the nodes of an incremental run that changed since the last run
+
+        Args:
+            flow_instance: An instance of the Flow class
+            graph: The Graph of the Flow
+            run_state: An optional RunState of an incremental run
+
+        Returns:
+            A tuple of (dict of {node.name: fingerprint}, list of str values of the names of the nodes whose
+                fingerprint changed), or (None, None) without a run_state
+        """
+        if run_state is None:
+            return None, None
+        flow_name = flow_instance.__class__.__name__
+        fingerprints = get_fingerprints(graph, flow_instance)
+        dirty = run_state.get_changed(flow_name, fingerprints)
+        logger.info(
+            "%s of %s steps of %s changed since the last run: %s",
+            len(dirty),
+            len(fingerprints),
+            flow_name,
+            dirty,
+        )
+        return fingerprints, dirty
+
+    @classmethod
+    def _select_nodes(
+        cls,
+        flow_instance,
+        graph,
+        targets: list = None,
+        from_steps: list = None,
+        dirty: list = None,
+    ):
+        """Private class method to get the names of the nodes to run for the targets and from_steps of a run
+
+        Args:
+            flow_instance: An instance of the Flow class
+            graph: The Graph of the Flow
+            targets: An optional list of str values of the steps to run
+            from_steps: An optional list of str values of the steps to run again with every step after them
+            dirty: An optional list of str values of the steps that changed since the last run, for an
+                incremental run
+
+        Returns:
+            node_names: A set of str values of node names, or None to run every node
+        """
+        if not targets and not from_steps and dirty is None:
+            return None
+        return select_nodes(
+            graph,
+            targets=targets,
+            from_steps=from_steps,
+            available=set(flow_instance.data_store),
+            dirty=dirty,
+        )
+
+    @classmethod
+    def _get_rerun(cls, graph, from_steps: list = None):
+        """Private class method to get the names of the from_steps of a run and of every node after them
+
+        These are run even if they are cached or checkpointed, since they are asked to run again
+
+        Args:
+            graph: The Graph of the Flow
+            from_steps: An optional list of str values of step names
+
+        Returns:
+            rerun: A set of str values of node names, or None if there are no from_steps
+        """
+        if not from_steps:
+            return None
+        return set(from_steps) | graph.get_downstream(from_steps)
+
+    @classmethod
+    def _run_graph(
+        cls,
+        run_context: RunContext,
+        node_names: set = None,
+        max_workers: int = None,
+        executor: str = "thread",
+        shared_memory=False,
+    ):
+        """Private class method to run every node of a Graph with the given executor
+
+        Args:
+            run_context: The RunContext of the run
+            node_names: An optional set of str values of the nodes to run, defaults to None which runs every node
+            max_workers: An optional int value of the number of workers, see FlowRunner.run
+            executor: A str value of 'thread' or 'process'
+            shared_memory: A bool value or SharedMemoryTransport, see FlowRunner.run
+
+        Returns:
+            None
+        """
+        graph = run_context.graph
+        flow_instance = run_context.flow_instance
+        if executor == "process":
+            if shared_memory is not False:
+                run_context.transport = (
+                    shared_memory
+                    if isinstance(shared_memory, SharedMemoryTransport)
+                    else SharedMemoryTransport()
+                )
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as process_executor:
+                    DependencyScheduler(graph, node_names).run(
+                        submit=lambda node: cls._submit_node_to_process(
+                            process_executor, run_context, node
+                        ),
+                        on_complete=lambda node, future: cls._merge_node_result(
+                            run_context, node, future
+                        ),
+                    )
+            finally:
+                if run_context.transport is not None:
+                    run_context.transport.close(flow_instance.data_store)
+            return
+
+        if max_workers is None or max_workers == 1:
+            # we iterate through the functions level wise and we store the
+            # output into a datastore
+            for level in graph.levels:
+                for node in level:
+                    if node_names is None or node.name in node_names:
+                        cls._run_node(run_context, node)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="flowrunner"
+        ) as thread_executor:
+            DependencyScheduler(graph, node_names).run(
+                submit=lambda node: thread_executor.submit(
+                    cls._run_node, run_context, node
+                )
+            )
+
+    @classmethod
+    async def _arun_node(cls, run_context: RunContext, node):
+        """Private class method to run a single node of a Flow on the event loop
+
+        'async def' steps are awaited, other steps are run in the default executor of the loop so that
+        they do not block the steps that are awaiting.
+
+        Args:
+            run_context: The RunContext of the run
+            node: The Node to be run
+
+        Returns:
+            None
+        """
+        # the CPU time of the event loop thread is shared by every step, so we only measure it in the executor
+        with run_context.measure(node, cpu=False) as node_report:
+            if run_context.restore_node_result(node):
+                node_report.status = STATUS_RESTORED
+            else:
+                flow_instance = run_context.flow_instance
+                # only the attributes of a result that is stored are collected, see RunContext.keeps_result
+                snapshot = (
+                    snapshot_attributes(flow_instance)
+                    if run_context.keeps_result(node)
+                    else None
+                )
+                if node.is_async:
+                    # the step is only on the stack of the event loop thread while it runs, not while it awaits
+                    with run_context.profile(node):
+                        output = await node.function_reference(flow_instance)
+                else:
+                    loop = asyncio.get_running_loop()
+                    output = await loop.run_in_executor(
+                        None,
+                        cls._call_profiled,
+                        run_context,
+                        node,
+                        node_report,
+                    )
+                # we write from the event loop thread, so there is no need for a lock
+                flow_instance.data_store[node.name] = output
+                node_report.output_size = get_size(output)
+                node_result = NodeResult(
+                    name=node.name,
+                    output=output,
+                    attributes=(
+                        get_changed_attributes(flow_instance, snapshot)
+                        if snapshot is not None
+                        else {}
+                    ),
+                )
+                run_context.store_node_result(node, node_result)
+        run_context.finish_node(node)
+
+    @classmethod
+    def _call_profiled(cls, run_context: RunContext, node, node_report):
+        """Private class method to call the function of a node in an executor thread, measured and profiled in it
+
+        Args:
+            run_context: The RunContext of the run
+            node: The Node to be run
+            node_report: The NodeReport of the node
+
+        Returns:
+            output: The return value of the function
+        """
+        with run_context.profile(node):
+            return call_measured(
+                node_report, node.function_reference, run_context.flow_instance
+            )
+
+    @classmethod
+    async def arun(
+        cls,
+        flow_instance,
+        max_workers: int = None,
+        cache=False,
+        checkpoint=False,
+        resume=None,
+        release_outputs: bool = False,
+        trace: str = None,
+        profile_steps: bool = False,
+        targets: list = None,
+        from_steps: list = None,
+        incremental=False,
+    ):
+        """Class method to run a Flow on the running event loop
+
+        We use DependencyScheduler.arun to start each node as soon as all the nodes that have it in their 'next'
+        are finished. All the nodes that are ready at the same time are awaited together, so 'async def' steps that
+        wait on I/O overlap with each other.
+
+        Args:
+            flow_instance: An instance of the Flow class
+            max_workers: An optional int value of the maximum number of steps running at the same time,
+                defaults to None which does not limit it
+            cache: An optional bool value or StepCache, see FlowRunner.run
+            checkpoint: An optional bool value or RunCheckpoint, see FlowRunner.run
+            resume: An optional str value of the run id, or RunCheckpoint, of a previous run to resume
+            release_outputs: An optional bool value, see FlowRunner.run
+            trace: An optional str value of a JSON file to write a Chrome trace of the run to, see FlowRunner.run
+            profile_steps: An optional bool value, see FlowRunner.run
+            targets: An optional list of str values of the steps to run, see FlowRunner.run
+            from_steps: An optional list of str values of the steps to run again, see FlowRunner.run
+            incremental: An optional bool value, str value of a directory or RunState, see FlowRunner.run
+
+        Returns:
+            run_report: A RunReport with the timings and resource usage of each node
+
+        Raises:
+            ValueError: If max_workers is less than 1, there are no checkpoints for the run to resume or a target or
+                from step is not a step of the Flow
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        logger.debug("Running flow asynchronously for %s", flow_instance)
+        graph = cls._get_details(flow_instance=flow_instance)
+        run_state = get_run_state(incremental)
+        fingerprints, dirty = cls._get_dirty(flow_instance, graph, run_state)
+        node_names = cls._select_nodes(flow_instance, graph, targets, from_steps, dirty)
+        run_context = cls._get_run_context(
+            flow_instance,
+            graph,
+            cache=cache,
+            checkpoint=checkpoint,
+            resume=resume,
+            release_outputs=release_outputs,
+            profile_steps=profile_steps,
+            rerun=cls._get_rerun(graph, from_steps),
+            run_state=run_state,
+            fingerprints=fingerprints,
+            dirty=dirty,
+        )
+        semaphore = asyncio.Semaphore(max_workers) if max_workers else None
+
+        async def run_node(node):
+            if semaphore is None:
+                await cls._arun_node(run_context, node)
+                return
+            async with semaphore:
+                await cls._arun_node(run_context, node)
+
+        try:
+            await DependencyScheduler(graph, node_names).arun(run_node)
+        finally:
+            cls._finish_report(run_context, trace)
+        return run_context.report
+
+    @classmethod
+    def _finish_report(cls, run_context: RunContext, trace: str = None):
+        """Private class method to finish the RunReport of a run, write its trace and save its RunState
+
+        Args:
+            run_context: The RunContext of the run
+            trace: An optional str value of a JSON file to write a Chrome trace of the run to
+
+        Returns:
+            None
+        """
+        run_context.report.finish()
+        if trace:
+            save_trace(
+                [run_context.report],
+                trace,
+                param_stores=[run_context.flow_instance.param_store],
+            )
+            logger.info("Trace of the run written to %s", trace)
+        if run_context.run_state is not None:
+            run_context.run_state.save(
+                run_context.flow_name, flow_instance=run_context.flow_instance
+            )
+
+    @classmethod
+    def show(cls, flow_instance):
+        """Class method to show a Flow
+
+        This method we show the order of iteration by going over the levels in the Graph.levels attribute. This DOES NOT
+        run the actual method but just uses the 'docstring' and '__name__' to show the Flow.
+
+        Args:
+            flow_instance: An instance of the Flow class
+
+        Returns:
+            None
+        """
+        logger.debug("Show flow for %s", flow_instance)
+        graph = cls._get_details(flow_instance=flow_instance)
+        # iterate through graph levels
+        for level in graph.levels:
+            # iterate through each node in the list
+            for node in level:
+                click.secho(f"{node.name}\n", fg="green")  # echo the node
+                docstring = (
+                    node.docstring or "?"
+                )  # echo the docstring if docstring is None then echo "?"
+                click.secho(docstring, fg="bright_red")
+                next_callables = ", ".join(node.next)
+                if (
+                    next_callables
+                ):  # incase its end, we check if there is a next, if not we don't print 'Next='
+                    click.secho(f"   Next={next_callables}\n\n", fg="blue")
+
+    @classmethod
+    def plan(
+        cls, flow_instance, run_report=None, max_workers: int = DEFAULT_MAX_WORKERS
+    ):
+        """Class method to show how long a Flow takes with 1 to max_workers workers
+
+        Like show, this DOES NOT run the steps. The work, span and width of the Graph are computed from the duration
+        of each step in run_report, and a run on 1 to max_workers workers is simulated under each scheduling policy,
+        see flowrunner.runner.plan.
+
+        Args:
+            flow_instance: An instance of the Flow class
+            run_report: An optional RunReport of a run of the Flow, defaults to None where every step takes 1
+            max_workers: An int value of the largest number of workers to simulate, defaults to 8
+
+        Returns:
+            flow_plan: A FlowPlan
+        """
+        logger.debug("Plan flow for %s", flow_instance)
+        graph = cls._get_details(flow_instance=flow_instance)
+        flow_plan = FlowPlan.from_graph(
+            graph,
+            flow_instance.__class__.__name__,
+            run_report=run_report,
+            max_workers=max_workers,
+        )
+        flow_plan.show()
+        return flow_plan
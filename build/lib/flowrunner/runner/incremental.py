@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""Module for running only the steps of a Flow that changed since its last run
+
+RunState: A class recording the fingerprint, the result and the output digest of each step of the last run of a Flow
+get_fingerprints: A function to get the fingerprint of each node of a Flow
+get_run_state: A function to get the RunState for the 'incremental' option of a run
+
+The fingerprint of a step is the hash of its source code and of the values of the param_store keys it reads. With
+flow.run(incremental=True), the steps whose fingerprint changed since the last run of the Flow in this process, and
+every step after them, are run. The other steps are reused from data_store or, for a new instance, run again: the
+RunState of the process only keeps fingerprints and digests, never outputs, so it does not keep alive outputs
+released with release_outputs or spilled by a SpillableDataStore. With flow.run(incremental='<directory>') the
+results of the steps are also kept in that directory, so they are restored in a new instance or process, eg. with
+'python -m flowrunner run --incremental flow.py'.
+
+Early cutoff: the digest of the output and attributes of every step that is run is recorded, see
+flowrunner.runner.digest. A step after a changed step that did not change itself is not run again if none of its
+previous steps has an output with a different digest than in the last run, its result is restored instead. So when
+a changed step returns the same data, the steps after it are not run again.
+
+The keys a step reads are found in its source like for the cache keys of StepCache, see
+flowrunner.runner.cache.get_param_keys.
+"""
+import hashlib
+import json
+import os
+import weakref
+from dataclasses import dataclass
+from itertools import chain
+from typing import Optional
+
+from flowrunner.runner.cache import (
+    get_param_hashes,
+    get_source_hash,
+    read_pickle,
+    write_pickle,
+)
+from flowrunner.runner.process import NodeResult
+from flowrunner.system.logger import logger
+
+DEFAULT_STATE_DIRECTORY = os.path.join(".flowrunner", "state")
+STATE_FILENAME = "fingerprints.json"
+DIGESTS_FILENAME = "digests.json"
+RESULT_FILE_EXTENSION = ".pkl"
+
+
+def get_fingerprints(graph, flow_instance) -> dict:
+    """Function to get the fingerprint of each node of a Flow
+
+    Unlike the cache keys of StepCache, a fingerprint does not depend on the steps before the node. A node is run
+    again when a step before it changed because it is after a changed step, not because its fingerprint changed.
+
+    Args:
+        graph: The Graph of the Flow
+        flow_instance: An instance of the Flow class
+
+    Returns:
+        fingerprints: A dict of {node.name: fingerprint}
+    """
+    param_hashes = get_param_hashes(graph, flow_instance.param_store)
+    fingerprints = {}
+    for node in chain(*graph.levels):
+        content = "\n".join(
+            [
+                node.name,
+                get_source_hash(node.function_reference),
+                param_hashes[node.name],
+            ]
+        )
+        fingerprints[node.name] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+@dataclass
+class RunState:
+    """A class recording the fingerprint, the result and the output digest of each step of the last run of a Flow
+
+    With a directory, they are stored in '<directory>/<flow name>/fingerprints.json',
+    '<directory>/<flow name>/digests.json' and '<directory>/<flow name>/<node name>.pkl'. Without a directory, only
+    the fingerprints and digests are kept in memory, and the results are the outputs still in data_store of the Flow
+    instance of the last run, which is only referenced weakly.
+
+    Attributes:
+        directory: An optional str value of the directory to keep the state in, defaults to None which keeps it
+            in memory
+    """
+
+    directory: str = None
+
+    def __post_init__(self):
+        """Post init to create the fingerprints, digests and results kept in memory"""
+        self._fingerprints = {}  # {flow name: {node name: fingerprint}}
+        self._digests = {}  # {flow name: {node name: digest}}
+        # {flow name: Flow instance of the last run}, only without a directory
+        self._instances = weakref.WeakValueDictionary()
+
+    def _get_path(self, flow_name: str, file_name: str) -> str:
+        """Private method to get the path of a file of the state of a Flow"""
+        return os.path.join(self.directory, flow_name, file_name)
+
+    def _get_recorded(self, recorded: dict, flow_name: str, file_name: str) -> dict:
+        """Private method to get the fingerprints or digests of a Flow, read from the directory the first time"""
+        if flow_name not in recorded:
+            content = {}
+            if self.directory is not None:
+                try:
+                    with open(
+                        self._get_path(flow_name, file_name), encoding="utf-8"
+                    ) as json_file:
+                        content = json.load(json_file)
+                except FileNotFoundError:
+                    pass
+                except ValueError:
+                    logger.warning(
+                        "Ignoring invalid %s of %s in %s",
+                        file_name,
+                        flow_name,
+                        self.directory,
+                    )
+            recorded[flow_name] = content
+        return recorded[flow_name]
+
+    def get_fingerprints(self, flow_name: str) -> dict:
+        """Method to get the fingerprints recorded for the steps of a Flow
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+
+        Returns:
+            fingerprints: A dict of {node name: fingerprint}, which is updated as the steps finish
+        """
+        return self._get_recorded(self._fingerprints, flow_name, STATE_FILENAME)
+
+    def get_digests(self, flow_name: str) -> dict:
+        """Method to get the output digests recorded for the steps of a Flow
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+
+        Returns:
+            digests: A dict of {node name: digest}, which is updated as the steps are run
+        """
+        return self._get_recorded(self._digests, flow_name, DIGESTS_FILENAME)
+
+    def get_changed(self, flow_name: str, fingerprints: dict) -> list:
+        """Method to get the nodes whose fingerprint is not the one recorded, or that have none recorded
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            fingerprints: A dict returned by get_fingerprints
+
+        Returns:
+            changed: A list of str values of node names
+        """
+        recorded = self.get_fingerprints(flow_name)
+        return [
+            node_name
+            for node_name, fingerprint in fingerprints.items()
+            if recorded.get(node_name) != fingerprint
+        ]
+
+    def record(self, flow_name: str, node_name: str, fingerprint: str):
+        """Method to record the fingerprint of a node once it has finished
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            fingerprint: A str value of the fingerprint of the node
+
+        Returns:
+            None
+        """
+        self.get_fingerprints(flow_name)[node_name] = fingerprint
+
+    def record_digest(self, flow_name: str, node_name: str, digest: Optional[str]):
+        """Method to record the digest of the output of a node once it has run
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            digest: An optional str value returned by get_digest
+
+        Returns:
+            None
+        """
+        self.get_digests(flow_name)[node_name] = digest
+
+    def forget(self, flow_name: str, node_names):
+        """Method to remove the fingerprint of nodes that may be run again
+
+        If the run fails before a node has finished, it is then still run next time. Their results and digests
+        are kept for early cutoff, the runner only restores them for nodes whose inputs did not change.
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_names: A collection of str values of node names
+
+        Returns:
+            None
+        """
+        fingerprints = self.get_fingerprints(flow_name)
+        for node_name in node_names:
+            fingerprints.pop(node_name, None)
+
+    def load(
+        self, flow_name: str, node_name: str, flow_instance=None
+    ) -> Optional[NodeResult]:
+        """Method to load the result of a node of the last run
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            flow_instance: An optional instance of the Flow class being run, without a directory the output is
+                only taken from its data_store if it is the instance of the last run
+
+        Returns:
+            node_result: A NodeResult, or None if there is none
+        """
+        if self.directory is None:
+            if (
+                flow_instance is None
+                or self._instances.get(flow_name) is not flow_instance
+                or node_name not in flow_instance.data_store
+            ):
+                return None
+            return NodeResult(
+                name=node_name, output=flow_instance.data_store[node_name]
+            )
+        return read_pickle(
+            self._get_path(flow_name, f"{node_name}{RESULT_FILE_EXTENSION}")
+        )
+
+    def store(self, flow_name: str, node_name: str, node_result: NodeResult):
+        """Method to store the result of a node, only with a directory
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            node_result: The NodeResult of the node
+
+        Returns:
+            None
+        """
+        if self.directory is None:
+            return
+        write_pickle(
+            self._get_path(flow_name, f"{node_name}{RESULT_FILE_EXTENSION}"),
+            node_result,
+        )
+
+    def save(self, flow_name: str, flow_instance=None):
+        """Method to write the fingerprints and digests of a Flow to the directory, if there is one
+
+        Without a directory, we keep a weak reference to the Flow instance instead, so the next run of the same
+        instance can reuse the outputs still in its data_store.
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            flow_instance: An optional instance of the Flow class that was run
+
+        Returns:
+            None
+        """
+        if self.directory is None:
+            if flow_instance is not None:
+                self._instances[flow_name] = flow_instance
+            return
+        os.makedirs(os.path.join(self.directory, flow_name), exist_ok=True)
+        for file_name, content in (
+            (STATE_FILENAME, self.get_fingerprints(flow_name)),
+            (DIGESTS_FILENAME, self.get_digests(flow_name)),
+        ):
+            with open(
+                self._get_path(flow_name, file_name), mode="w", encoding="utf-8"
+            ) as json_file:
+                json.dump(content, json_file, indent=4, sort_keys=True)
+
+    def clear(self, flow_name: str = None):
+        """Method to forget everything recorded in memory, so every step runs in the next run
+
+        Args:
+            flow_name: An optional str value of the name of the Flow class, defaults to None which clears every Flow
+
+        Returns:
+            None
+        """
+        for recorded in (self._fingerprints, self._digests, self._instances):
+            if flow_name is None:
+                recorded.clear()
+            else:
+                recorded.pop(flow_name, None)
+
+
+# used by every run with incremental=True in this process, it only holds fingerprints and digests
+_PROCESS_RUN_STATE = RunState()
+
+
+def get_run_state(incremental) -> Optional[RunState]:
+    """Function to get the RunState for the 'incremental' option of a run
+
+    Args:
+        incremental: A bool value, str value of a directory or RunState
+
+    Returns:
+        run_state: The RunState kept in memory for this process if incremental is True, a RunState kept in the
+            directory if it is a str, incremental itself if it is a RunState or None if it is False
+    """
+    if isinstance(incremental, RunState):
+        return incremental
+    if isinstance(incremental, str):
+        return RunState(directory=incremental)
+    if incremental:
+        return _PROCESS_RUN_STATE
+    return None
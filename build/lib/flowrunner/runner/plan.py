@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""Module for planning how many workers a Flow needs, without running it
+
+FlowPlan: A class containing the work, span, width and simulated makespans of a Flow
+get_durations: A function to get the duration of each step from a RunReport, or 1 per step without one
+simulate: A function to simulate a run of a Flow on a number of workers with a scheduling policy
+
+What is computed:
+- work: the time all the steps take one after another, i.e the makespan with 1 worker
+- span: the time the critical path takes, no number of workers makes the Flow faster than this
+- width: the number of steps in the widest level of Graph.levels
+- parallelism: work / span, the average number of steps that can run at the same time
+- makespan: the simulated time the Flow takes with 1 to max_workers workers under each policy
+
+Scheduling policies:
+- levels: the steps of each level run on the workers and a level starts once the previous one has finished
+- fifo: a step starts as soon as the steps before it have finished, in the order they became ready. This is
+  what FlowRunner.run does with max_workers, see flowrunner.runner.scheduler
+- critical_path: like fifo, but the ready step with the longest path to an end step starts first
+
+The simulation has no overhead for starting a step or passing outputs between workers, so it is a lower bound of
+the actual makespan, mostly with the 'process' executor.
+"""
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import chain, count
+
+import click
+
+from flowrunner.runner.report import RunReport
+from flowrunner.system.formatting import format_duration
+
+POLICIES = ("levels", "fifo", "critical_path")
+DEFAULT_MAX_WORKERS = 8
+
+
+def get_durations(graph, run_report: RunReport = None) -> tuple:
+    """Function to get the duration of each step from a RunReport, or 1 per step without one
+
+    Steps that are not in the RunReport, eg. steps added since it was written, take the mean duration of the
+    steps that are.
+
+    Args:
+        graph: The Graph of the Flow
+        run_report: An optional RunReport of a run of the Flow
+
+    Returns:
+        A tuple of (dict of {node.name: duration}, list of str values of the names of the steps without a duration)
+    """
+    node_names = [node.name for node in chain(*graph.levels)]
+    if run_report is None:
+        return {node_name: 1.0 for node_name in node_names}, []
+    durations = {}
+    for node_name in node_names:
+        node_report = run_report.get_node(node_name)
+        if node_report is not None and node_report.wall_time is not None:
+            durations[node_name] = node_report.wall_time
+    missing = [node_name for node_name in node_names if node_name not in durations]
+    mean_duration = sum(durations.values()) / len(durations) if durations else 1.0
+    for node_name in missing:
+        durations[node_name] = mean_duration
+    return durations, missing
+
+
+def _get_bottom_levels(graph, durations: dict) -> dict:
+    """Private function to get the length of the longest path from each node to an end node, including the node"""
+    bottom_levels = {}
+    for node in reversed(list(chain(*graph.levels))):
+        bottom_levels[node.name] = durations[node.name] + max(
+            (bottom_levels[next_node] for next_node in node.next), default=0
+        )
+    return bottom_levels
+
+
+def _simulate_levels(graph, durations: dict, workers: int) -> float:
+    """Private function to simulate the levels policy, each level is list scheduled on the workers"""
+    makespan = 0.0
+    for level in graph.levels:
+        # a heap of the times the workers are free, from the start of the level
+        free_times = [0.0] * workers
+        for node in level:
+            heapq.heappush(free_times, heapq.heappop(free_times) + durations[node.name])
+        makespan += max(free_times)
+    return makespan
+
+
+def simulate(graph, durations: dict, workers: int, policy: str = "fifo") -> float:
+    """Function to simulate a run of a Flow on a number of workers with a scheduling policy
+
+    Args:
+        graph: The Graph of the Flow
+        durations: A dict of {node.name: duration} with a duration for every node in Graph.levels
+        workers: An int value of the number of workers
+        policy: A str value of 'levels', 'fifo' or 'critical_path', defaults to 'fifo'
+
+    Returns:
+        makespan: A float value of the time from the start of the first step to the end of the last one
+
+    Raises:
+        ValueError: If workers is less than 1 or policy is not one of POLICIES
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if policy not in POLICIES:
+        raise ValueError(f"policy can only be one of {POLICIES}, got '{policy}'")
+    if policy == "levels":
+        return _simulate_levels(graph, durations, workers)
+
+    nodes = list(chain(*graph.levels))
+    in_degrees = {node.name: 0 for node in nodes}
+    for node in nodes:
+        for next_node in node.next:
+            in_degrees[next_node] += 1
+    order = count()  # ties are broken by the order the nodes became ready
+    if policy == "fifo":
+        ready = deque(node for node in nodes if in_degrees[node.name] == 0)
+        push, pop = ready.append, ready.popleft
+    else:
+        bottom_levels = _get_bottom_levels(graph, durations)
+        ready = []
+
+        def push(node):
+            heapq.heappush(ready, (-bottom_levels[node.name], next(order), node))
+
+        def pop():
+            return heapq.heappop(ready)[-1]
+
+        for node in nodes:
+            if in_degrees[node.name] == 0:
+                push(node)
+
+    current_time = 0.0
+    running = []  # a heap of (end time, order, node)
+    while ready or running:
+        while ready and len(running) < workers:
+            node = pop()
+            heapq.heappush(
+                running, (current_time + durations[node.name], next(order), node)
+            )
+        current_time, _, node = heapq.heappop(running)
+        for next_node in node.next:
+            in_degrees[next_node] -= 1
+            if in_degrees[next_node] == 0:
+                push(graph.node_map[next_node])
+    return current_time
+
+
+@dataclass
+class FlowPlan:
+    """A class containing the work, span, width and simulated makespans of a Flow
+
+    Attributes:
+        flow_name: A str value of the name of the Flow class
+        durations: A dict of {node.name: duration}, seconds from a RunReport or 1 per step without one
+        timed: A bool value, True if the durations are seconds from a RunReport
+        missing: A list of str values of the names of the steps that were not in the RunReport
+        work: A float value of the sum of the durations
+        span: A float value of the duration of the critical path
+        critical_path: A list of str values of the names of the steps on the critical path
+        width: An int value of the number of steps in the widest level
+        makespans: A dict of {policy: list of float values of the makespan with 1 to max_workers workers}
+    """
+
+    flow_name: str
+    durations: dict
+    timed: bool = False
+    missing: list = field(default_factory=lambda: [])
+    work: float = 0.0
+    span: float = 0.0
+    critical_path: list = field(default_factory=lambda: [])
+    width: int = 0
+    makespans: dict = field(default_factory=lambda: {})
+
+    @classmethod
+    def from_graph(
+        cls,
+        graph,
+        flow_name: str,
+        run_report: RunReport = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """Class method to plan a Flow from its Graph
+
+        Args:
+            graph: The Graph of the Flow
+            flow_name: A str value of the name of the Flow class
+            run_report: An optional RunReport of a run of the Flow to take the durations of the steps from
+            max_workers: An int value of the largest number of workers to simulate, defaults to 8
+
+        Returns:
+            flow_plan: A FlowPlan
+
+        Raises:
+            ValueError: If max_workers is less than 1
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        durations, missing = get_durations(graph, run_report)
+        critical_path = graph.get_critical_path(durations)
+        return cls(
+            flow_name=flow_name,
+            durations=durations,
+            timed=run_report is not None,
+            missing=missing,
+            work=sum(durations.values()),
+            span=sum(durations[node_name] for node_name in critical_path),
+            critical_path=critical_path,
+            width=max((len(level) for level in graph.levels), default=0),
+            makespans={
+                policy: [
+                    simulate(graph, durations, workers, policy)
+                    for workers in range(1, max_workers + 1)
+                ]
+                for policy in POLICIES
+            },
+        )
+
+    @property
+    def parallelism(self) -> float:
+        """The average number of steps that can run at the same time, work / span"""
+        return self.work / self.span if self.span else 0.0
+
+    def get_enough_workers(self, policy: str) -> int:
+        """Method to get the smallest number of workers after which more workers do not make the Flow faster
+
+        Args:
+            policy: A str value of one of POLICIES
+
+        Returns:
+            workers: An int value of the number of workers, at most max_workers
+        """
+        makespans = self.makespans[policy]
+        fastest = min(makespans)
+        return next(
+            workers
+            for workers, makespan in enumerate(makespans, start=1)
+            if makespan <= fastest * (1 + 1e-9)
+        )
+
+    def _format(self, value: float) -> str:
+        """Private method to format a duration in seconds, or in steps without a RunReport"""
+        return format_duration(value) if self.timed else f"{value:g} steps"
+
+    def show(self):
+        """Method to print the plan, in the style of FlowRunner.show
+
+        Returns:
+            None
+        """
+        click.secho(f"{self.flow_name}\n", fg="green")
+        click.secho(f"{'Work':<14}{self._format(self.work):>12}", fg="blue", nl=False)
+        click.secho(f"   {len(self.durations)} steps one after another")
+        click.secho(f"{'Span':<14}{self._format(self.span):>12}", fg="blue", nl=False)
+        click.secho(f"   {' -> '.join(self.critical_path)}")
+        click.secho(f"{'Width':<14}{self.width:>12}", fg="blue", nl=False)
+        click.secho("   steps in the widest level")
+        click.secho(
+            f"{'Parallelism':<14}{self.parallelism:>12.2f}", fg="blue", nl=False
+        )
+        click.secho("   work / span")
+        if self.missing:
+            click.secho(
+                f"\nNo duration in the report for {', '.join(self.missing)}, using the mean duration",
+                fg="bright_red",
+            )
+
+        click.secho(
+            f"\n{'Workers':<9}" + "".join(f"{policy:>15}" for policy in self.makespans),
+            fg="green",
+        )
+        for index in range(len(next(iter(self.makespans.values()), []))):
+            click.secho(
+                f"{index + 1:<9}"
+                + "".join(
+                    f"{self._format(makespans[index]):>15}"
+                    for makespans in self.makespans.values()
+                ),
+                fg="blue",
+            )
+        for policy in self.makespans:
+            workers = self.get_enough_workers(policy)
+            click.secho(
+                f"   {policy}: {self._format(min(self.makespans[policy]))} with {workers} workers, "
+                f"more workers are not faster",
+            )
+        click.secho("")
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Module for running the nodes of a Flow in worker processes
+
+NodeResult: A class containing the output of a node and the attributes it set on the Flow instance
+
+Serialization contract for the process backend:
+- The Flow class must be importable by the worker, i.e defined at module level. With the default 'fork'
+  start method on Linux, classes in a file run through the cli are available as well
+- Each node gets a fresh instance of the Flow class in the worker. We ship the param_store, the instance
+  attributes set by earlier steps and only the data_store entries of the nodes upstream of it
+- All of the above, the return value of the step and any attribute it sets on 'self' have to be picklable
+- Only attributes that are newly set or re-assigned on 'self' are sent back and merged into the parent
+  instance. Changing an existing object in place (eg. 'self.df.insert(...)') is not seen by the parent,
+  so assign the result instead (eg. 'self.df = df')
+- 'async def' steps are run to completion on a new event loop in the worker
+- With shared memory (see flowrunner.runner.transport), large numpy arrays and DataFrames are mapped from
+  shared memory instead of being pickled. Steps get them read-only, so they have to copy before changing them
+"""
+import asyncio
+import inspect
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Type
+
+from flowrunner.runner.profiler import StepProfile, profile_node
+from flowrunner.runner.report import NodeReport, measure_node
+from flowrunner.runner.store import get_size
+from flowrunner.runner.transport import attach, close_segments, publish
+
+# attributes of BaseFlow that are managed by the runner and never shipped as step state
+RESERVED_ATTRIBUTES = ("data_store", "param_store", "graph")
+
+
+@dataclass
+class NodeResult:
+    """A class containing the output of a node and the attributes it set on the Flow instance
+
+    Attributes:
+        name: A str value of the name of the node
+        output: The return value of the node, stored in BaseFlow.data_store
+        attributes: A dict of {attribute_name: value} of the attributes set or re-assigned on 'self'
+        report: An optional NodeReport, set when the node was run in a worker process
+        profile: An optional StepProfile, set when the node was profiled in a worker process
+    """
+
+    name: str
+    output: object = None
+    attributes: dict = field(default_factory=lambda: {})
+    report: NodeReport = None
+    profile: StepProfile = None
+
+
+def get_attributes(flow_instance) -> dict:
+    """Function to get the attributes set on a Flow instance by its steps
+
+    Args:
+        flow_instance: An instance of the Flow class
+
+    Returns:
+        attributes: A dict of {attribute_name: value} without the attributes managed by the runner
+    """
+    return {
+        name: value
+        for name, value in vars(flow_instance).items()
+        if name not in RESERVED_ATTRIBUTES
+    }
+
+
+def snapshot_attributes(flow_instance) -> dict:
+    """Function to take a snapshot of the attributes of a Flow instance
+
+    We only keep a reference to each value, which is enough to find out which attributes
+    were set or re-assigned later on with get_changed_attributes
+
+    Args:
+        flow_instance: An instance of the Flow class
+
+    Returns:
+        snapshot: A dict of {attribute_name: value}
+    """
+    return get_attributes(flow_instance)
+
+
+def get_changed_attributes(flow_instance, snapshot: dict) -> dict:
+    """Function to get the attributes that were set or re-assigned since a snapshot
+
+    Args:
+        flow_instance: An instance of the Flow class
+        snapshot: A dict returned by snapshot_attributes
+
+    Returns:
+        attributes: A dict of {attribute_name: value} of the changed attributes
+    """
+    return {
+        name: value
+        for name, value in get_attributes(flow_instance).items()
+        if name not in snapshot or snapshot[name] is not value
+    }
+
+
+def run_node_in_process(
+    flow_class: Type,
+    node_name: str,
+    attributes: dict,
+    param_store: dict,
+    upstream_data: dict,
+    min_shared_size: int = None,
+    profile: bool = False,
+) -> NodeResult:
+    """Function to run a single node of a Flow, meant to be called in a worker process
+
+    We build a fresh instance of the Flow class from the shipped state, run the method and send back
+    its output and the attributes it changed.
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        node_name: A str value of the name of the node to run
+        attributes: A dict of the attributes set on the parent instance by earlier steps
+        param_store: The param_store of the parent instance
+        upstream_data: A dict of the data_store entries of the nodes upstream of this node, entries in shared
+            memory are handles that are mapped before the node runs
+        min_shared_size: An optional int value, if given an output of at least this many bytes is sent back
+            through shared memory
+        profile: A bool value, True to profile the node
+
+    Returns:
+        node_result: A NodeResult with the output and changed attributes of the node, its NodeReport and
+            its StepProfile if it was profiled
+    """
+    segments = []
+    data_store = {}
+    for upstream_name, value in upstream_data.items():
+        data_store[upstream_name], segment = attach(value)
+        segments.append(segment)
+
+    flow_instance = flow_class(data_store=data_store, param_store=param_store)
+    vars(flow_instance).update(attributes)
+    snapshot = snapshot_attributes(flow_instance)
+    function = getattr(flow_class, node_name)
+    with measure_node(node_name) as node_report:
+        profiler = profile_node(node_name, function) if profile else nullcontext()
+        with profiler as step_profile:
+            output = function(flow_instance)
+            if inspect.isawaitable(output):
+                output = asyncio.run(output)
+        node_report.output_size = get_size(output)
+    node_result = NodeResult(
+        name=node_name,
+        output=output,
+        attributes=get_changed_attributes(flow_instance, snapshot),
+        report=node_report,
+        profile=step_profile,
+    )
+
+    if min_shared_size is not None:
+        # the parent process takes over the segment of the output, so we only close it here
+        node_result.output, output_segment = publish(output, min_shared_size)
+        segments.append(output_segment)
+    del data_store, flow_instance, output, snapshot
+    close_segments(segments)
+    return node_result
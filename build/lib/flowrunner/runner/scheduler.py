@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Module for scheduling the nodes of a Graph
+
+DependencyScheduler: A class that starts each Node as soon as all of its predecessors have finished
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from itertools import chain
+from typing import Awaitable, Callable
+
+from flowrunner.core.base import Graph
+from flowrunner.system.logger import logger
+
+
+@dataclass
+class DependencyScheduler:
+    """A class that starts each Node as soon as all of its predecessors have finished
+
+    Instead of treating each entry in Graph.levels as a barrier, we keep a count of unfinished
+    predecessors (in-degree) for each Node using the 'next' edges. When a Node finishes we decrement
+    the count of each of its next nodes and any node whose count drops to 0 is put in the ready queue.
+
+    Attributes:
+        graph: An instance of Graph class to be scheduled
+        node_names: An optional set of str values of the names of the nodes to run, defaults to None which runs
+            every node. The other nodes are treated as already finished, see flowrunner.runner.selection
+    """
+
+    graph: Graph
+    node_names: set = None
+
+    def get_in_degrees(self) -> dict:
+        """Method to count the number of predecessors of each node
+
+        Only the nodes in Graph.levels are counted, so nodes not reachable from a start node are left out. With
+        node_names, only those nodes and the edges between them are counted.
+
+        Returns:
+            in_degrees: A dict of {node.name: number of predecessors}
+        """
+        nodes = [
+            node
+            for node in chain(*self.graph.levels)
+            if self.node_names is None or node.name in self.node_names
+        ]
+        in_degrees = {node.name: 0 for node in nodes}
+        for node in nodes:
+            for next_node in node.next:
+                if next_node in in_degrees:
+                    in_degrees[next_node] += 1
+        return in_degrees
+
+    def run(
+        self,
+        submit: Callable[[object], Future],
+        on_complete: Callable[[object, Future], None] = None,
+    ):
+        """Method to run all the nodes of the graph in dependency order
+
+        Args:
+            submit: A callable that takes a Node and returns a Future, usually a partial of Executor.submit
+            on_complete: An optional callable that is called with the Node and its Future once it is done,
+                this is called in the scheduling thread, so it can safely update shared state
+
+        Returns:
+            None
+
+        Raises:
+            Any exception raised by a node. We stop scheduling new nodes at the first failure
+        """
+        in_degrees = self.get_in_degrees()
+        # the start nodes are ready from the beginning, we keep the order of Graph.levels
+        ready = deque(
+            node for node in chain(*self.graph.levels) if in_degrees.get(node.name) == 0
+        )
+        running = {}  # Future: Node
+
+        while ready or running:
+            while ready:
+                node = ready.popleft()
+                logger.debug("Submitting node %s", node.name)
+                running[submit(node)] = node
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                future.result()  # re-raise the exception of a failed node, if any
+                if on_complete:
+                    on_complete(node, future)
+                for next_node in node.next:
+                    if next_node not in in_degrees:
+                        continue
+                    in_degrees[next_node] -= 1
+                    if in_degrees[next_node] == 0:
+                        ready.append(self.graph.node_map[next_node])
+
+    async def arun(self, run_node: Callable[[object], Awaitable]):
+        """Method to run all the nodes of the graph in dependency order on the running event loop
+
+        Each node is wrapped in an asyncio Task, so all the nodes that are ready at the same time are
+        awaited together.
+
+        Args:
+            run_node: A coroutine function that takes a Node and runs it
+
+        Returns:
+            None
+
+        Raises:
+            Any exception raised by a node. We cancel the nodes still running at the first failure
+        """
+        in_degrees = self.get_in_degrees()
+        ready = deque(
+            node for node in chain(*self.graph.levels) if in_degrees.get(node.name) == 0
+        )
+        running = {}  # Task: Node
+
+        try:
+            while ready or running:
+                while ready:
+                    node = ready.popleft()
+                    logger.debug("Starting node %s", node.name)
+                    running[asyncio.ensure_future(run_node(node))] = node
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    node = running.pop(task)
+                    task.result()  # re-raise the exception of a failed node, if any
+                    for next_node in node.next:
+                        if next_node not in in_degrees:
+                            continue
+                        in_degrees[next_node] -= 1
+                        if in_degrees[next_node] == 0:
+                            ready.append(self.graph.node_map[next_node])
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Module for running only some of the steps of a Flow
+
+select_nodes: A function to get the smallest set of nodes to run to get the output of the target steps
+
+A partial run is given targets, the steps whose output we want, and from_steps, the steps to run again along with
+every step after them. The targets and the from_steps and their next steps up to the targets always run. Every other
+step the targets read from, directly or through other steps, only runs if its output is not already in data_store,
+so the steps before a step that is reused are not run either. Eg. while changing one step of a long Flow:
+
+    flow.run()  # once, every output is now in flow.data_store
+    flow.run(targets=["append_data"])  # only runs append_data
+    flow.run(from_steps=["append_data"])  # runs append_data and every step after it
+
+Selected steps can still be restored from the cache or from the checkpoint of the run being resumed, like in a full
+run, except for the from_steps and the steps after them which are always run again. This is what makes from_steps
+useful from the cli, where data_store starts empty: 'flowrunner run --cache --from append_data flow.py'.
+"""
+from flowrunner.core.base import Graph
+from flowrunner.system.logger import logger
+
+
+def _check_node_names(graph: Graph, node_names: list, argument: str):
+    """Private function to check that every name is the name of a node of the Graph
+
+    Raises:
+        ValueError: If a name is not the name of a node
+    """
+    unknown = [node_name for node_name in node_names if node_name not in graph.node_map]
+    if unknown:
+        raise ValueError(
+            f"{argument} has steps that are not in the Flow: {unknown}, the steps are {list(graph.node_map)}"
+        )
+
+
+def select_nodes(
+    graph: Graph,
+    targets: list = None,
+    from_steps: list = None,
+    available=(),
+    dirty: list = None,
+) -> set:
+    """Function to get the smallest set of nodes to run to get the output of the target steps
+
+    We follow the 'next' edges backwards from the targets, or the end nodes, and from the nodes that have
+    to run. A node is only selected if it has to run or its output is not available, and then the nodes
+    before it are visited too.
+
+    Args:
+        graph: The Graph of the Flow
+        targets: An optional list of str values of the steps whose output we want, defaults to None which
+            targets every step
+        from_steps: An optional list of str values of the steps that are run again with every step after them
+        available: A collection of str values of the steps whose output is already in data_store
+        dirty: An optional list of str values of the steps that changed since the last run, see
+            flowrunner.runner.incremental. They are run with every step after them and the targets are then only
+            run if they are after a dirty step or their output is not available
+
+    Returns:
+        node_names: A set of str values of the names of the nodes to run
+
+    Raises:
+        ValueError: If a target or from step is not a step of the Flow, or a from step does not come before
+            any target
+    """
+    reachable = {node.name for level in graph.levels for node in level}
+    targets = list(targets) if targets else []
+    from_steps = list(from_steps) if from_steps else []
+    _check_node_names(graph, targets, "targets")
+    _check_node_names(graph, from_steps, "from_steps")
+
+    if targets:
+        needed = set(targets) | graph.get_upstream(targets)
+    else:
+        needed = reachable
+    not_needed = [node_name for node_name in from_steps if node_name not in needed]
+    if not_needed:
+        raise ValueError(
+            f"from_steps {not_needed} do not come before any of the targets {targets}"
+        )
+
+    if dirty is None:
+        rerun = set(targets) if targets or from_steps else set(needed)
+    else:
+        dirty = [node_name for node_name in dirty if node_name in needed]
+        rerun = (set(dirty) | graph.get_downstream(dirty)) & needed
+    if from_steps:
+        rerun |= (set(from_steps) | graph.get_downstream(from_steps)) & needed
+    wanted = targets or [
+        node.name for node in graph.nodes if node.name in needed and not node.next
+    ]
+
+    previous = graph.get_previous()
+    node_names = set()
+    to_visit = list(rerun) + wanted
+    while to_visit:
+        node_name = to_visit.pop()
+        if node_name in node_names or (
+            node_name not in rerun and node_name in available
+        ):
+            continue
+        node_names.add(node_name)
+        to_visit.extend(previous[node_name])
+    node_names &= reachable
+    logger.info(
+        "Running %s of %s steps, reusing the outputs of %s",
+        len(node_names),
+        len(reachable),
+        sorted((needed - node_names) & set(available)),
+    )
+    return node_names
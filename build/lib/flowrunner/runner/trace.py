@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Module for exporting runs as a Chrome trace, to be opened in Perfetto (https://ui.perfetto.dev) or chrome://tracing
+
+get_trace_events: A function to convert a RunReport into a list of trace events
+save_trace: A function to write the trace of one or more runs to a JSON file
+to_json_safe: A function to convert a value, eg. a param_store, to something json.dumps accepts
+
+The trace is in the Chrome Trace Event Format. Each worker thread or process gets its own track and each node is
+a slice on the track of the worker that ran it, so idle workers, stragglers and the gaps between nodes are visible.
+Each run also gets a slice on a separate track of the main process spanning the whole run.
+"""
+import json
+import os
+
+from flowrunner.runner.report import RunReport
+
+RUN_THREAD_ID = 0  # the track of the slices of whole runs
+
+
+def to_json_safe(value):
+    """Function to convert a value to something json.dumps accepts, unknown objects are converted with repr"""
+    return json.loads(json.dumps(value, default=repr))
+
+
+def _to_microseconds(seconds: float, origin: float) -> float:
+    """Private function to convert seconds since the epoch to microseconds since origin"""
+    return round((seconds - origin) * 1_000_000, 3)
+
+
+def get_trace_events(
+    run_report: RunReport,
+    param_store: dict = None,
+    origin: float = None,
+    thread_ids: dict = None,
+) -> list:
+    """Function to convert a RunReport into a list of trace events
+
+    Args:
+        run_report: A RunReport
+        param_store: An optional dict of the param_store of the Flow, added to the arguments of every slice
+        origin: An optional float value of seconds since the epoch of time 0 in the trace, defaults to the start of
+            the run
+        thread_ids: An optional dict of {(process id, thread name): thread id}, to keep the same track for a worker
+            across several runs. New workers are added to it
+
+    Returns:
+        events: A list of dicts of trace events
+    """
+    origin = run_report.start_time if origin is None else origin
+    thread_ids = {} if thread_ids is None else thread_ids
+    params = to_json_safe(param_store or {})
+    main_process_id = os.getpid()
+    events = [
+        {
+            "name": run_report.flow_name,
+            "cat": "run",
+            "ph": "X",
+            "pid": main_process_id,
+            "tid": RUN_THREAD_ID,
+            "ts": _to_microseconds(run_report.start_time, origin),
+            "dur": _to_microseconds(
+                run_report.end_time or run_report.start_time, run_report.start_time
+            ),
+            "args": {"param_store": params},
+        }
+    ]
+    for node_report in run_report.nodes:
+        worker = (node_report.process_id, node_report.thread_name)
+        if worker not in thread_ids:
+            # thread ids only have to be unique, we number them in the order the workers are seen
+            thread_ids[worker] = len(thread_ids) + 1
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": node_report.process_id,
+                    "tid": thread_ids[worker],
+                    "args": {"name": node_report.thread_name},
+                }
+            )
+        events.append(
+            {
+                "name": node_report.name,
+                "cat": f"{run_report.flow_name},{node_report.status}",
+                "ph": "X",
+                "pid": node_report.process_id,
+                "tid": thread_ids[worker],
+                "ts": _to_microseconds(node_report.start_time, origin),
+                "dur": _to_microseconds(node_report.end_time, node_report.start_time),
+                "args": {
+                    "flow": run_report.flow_name,
+                    "status": node_report.status,
+                    "output_size": node_report.output_size,
+                    "cpu_time": node_report.cpu_time,
+                    "peak_rss_delta": node_report.peak_rss_delta,
+                    "param_store": params,
+                },
+            }
+        )
+    return events
+
+
+def save_trace(run_reports: list, path: str, param_stores: list = None):
+    """Function to write the trace of one or more runs to a JSON file
+
+    The runs share the same time axis, starting at the start of the first run.
+
+    Args:
+        run_reports: A list of RunReport
+        path: A str value of the path of the file
+        param_stores: An optional list of the param_store of the Flow of each run
+
+    Returns:
+        None
+    """
+    param_stores = param_stores or [None] * len(run_reports)
+    origin = min((run_report.start_time for run_report in run_reports), default=0)
+    thread_ids = {}
+    events = []
+    for run_report, param_store in zip(run_reports, param_stores):
+        events.extend(
+            get_trace_events(
+                run_report,
+                param_store=param_store,
+                origin=origin,
+                thread_ids=thread_ids,
+            )
+        )
+    main_process_id = os.getpid()
+    process_ids = {event["pid"] for event in events}
+    events.extend(
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": process_id,
+            "args": {
+                "name": "flowrunner"
+                if process_id == main_process_id
+                else f"worker {process_id}"
+            },
+        }
+        for process_id in sorted(process_ids)
+    )
+    events.append(
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": main_process_id,
+            "tid": RUN_THREAD_ID,
+            "args": {"name": "runs"},
+        }
+    )
+    with open(path, mode="w", encoding="utf-8") as json_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, json_file, indent=4)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Module for formatting values shown to the user
+
+format_duration: A function to format a duration eg. '1.25s' or '3.2ms'
+"""
+from typing import Optional
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Function to format a duration eg. '1.25s' or '3.2ms'
+
+    Args:
+        seconds: A float value of seconds or None
+
+    Returns:
+        A str value of the duration, '-' if seconds is None
+    """
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds:.2f}s"
@@ -20,22 +20,58 @@ Commands:
   show      Command to show the order of iteration of a Flow
   validate  Command to validate a Flow
   directory Command to visualize a directory
+  cache     Commands to manage the cache of step outputs
 """
-import inspect
 import os
-from pydoc import importfile
+import sys
+import time
 
 import click
-from cookiecutter.main import cookiecutter
 
-from flowrunner import BaseFlow
-from flowrunner.system.logger import logger
+from flowrunner.core.helpers import DEFAULT_RENDERER, RENDERERS, DAGGenerator
+from flowrunner.core.manifest import (
+    DAGManifest,
+    get_file_hash,
+    get_render_hash,
+    save_index,
+)
+from flowrunner.runner.batch import (
+    STATUS_PASSED,
+    find_flow_files,
+    process_files,
+    show_results,
+)
+from flowrunner.runner.cache import DEFAULT_CACHE_DIRECTORY, StepCache
+from flowrunner.runner.checkpoint import RunCheckpoint
+from flowrunner.runner.incremental import DEFAULT_STATE_DIRECTORY
+from flowrunner.runner.plan import DEFAULT_MAX_WORKERS
+from flowrunner.runner.profiler import save_profiles, show_profiles
+from flowrunner.runner.report import load_reports, save_reports
+from flowrunner.runner.store import SpillableDataStore, parse_size
+from flowrunner.runner.trace import save_trace, to_json_safe
+from flowrunner.system.logger import LOG_PROFILES, configure_logging, logger
 
 PROJECT_TEMPLATES_PATH = "../flowrunner/flowrunner/core/templates"  # the path to the cookie cutter version of this project
 
 
 @click.group()
-def cli():
+@click.option(
+    "--log-profile",
+    type=click.Choice(list(LOG_PROFILES)),
+    default=None,
+    help="Logging profile: 'development' (colored, DEBUG), 'production' (plain text, WARNING) or 'json' (INFO)",
+)
+@click.option(
+    "--log-level",
+    default=None,
+    help="Level to log at eg. INFO, defaults to the level of the profile",
+)
+@click.option(
+    "--log-file",
+    default=None,
+    help="File to append the log messages to instead of the terminal",
+)
+def cli(log_profile: str = None, log_level: str = None, log_file: str = None):
     """Welcome to flowRunner! 🚀
 
     flowRunner is a lightweight package to organize and represent Data Engineering/Science workflows. Its designed to be
@@ -46,156 +82,728 @@ def cli():
     - Simple decorators to convert methods to Flow methods
     - Command Line Interface for running Flows
     """
+    if log_profile or log_level or log_file:
+        configure_logging(
+            log_profile or "development", level=log_level, filename=log_file
+        )
+
+
+jobs_option = click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files processed at once in worker processes",
+)
+
+
+def _process_flows(action, filepaths: tuple, jobs: int = 1, **options) -> list:
+    """Function to call an action on every Flow of the files, directories and glob patterns given to a command
+
+    A summary table of the status and duration of each Flow is printed if there is more than one file.
+
+    Args:
+        action: A function taking a Flow class and the options as keyword arguments
+        filepaths: A tuple of str values of files, directories searched recursively or glob patterns
+        jobs: An int value of the number of files processed at once in worker processes
+        options: Keyword arguments of the action
+
+    Returns:
+        results: A list of FlowResult, see flowrunner.runner.batch
+    """
+    start_time = time.perf_counter()
+    try:
+        files = find_flow_files(filepaths)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="FILEPATHS")
+    results = process_files(action, files, jobs=jobs, **options)
+    if len(files) > 1:
+        show_results(results, wall_time=time.perf_counter() - start_time)
+    return results
+
+
+def _exit_on_failure(results: list):
+    """Function to exit with 1 if any Flow failed or any file could not be imported"""
+    if any(flow_result.status != STATUS_PASSED for flow_result in results):
+        sys.exit(1)
+
+
+def _validate_flow(flow_class):
+    """Function to validate a Flow, raises InvalidFlowException if it is invalid"""
+    flow_class().validate_with_error()
 
 
 @cli.command()
-@click.argument("filepath")
-def validate(filepath: str):
+@jobs_option
+@click.argument("filepaths", nargs=-1, required=True)
+def validate(filepaths: tuple, jobs: int = 1):
     """Command to validate a Flow
 
     Examples:
         python -m flowrunner validate /my_path/to/flow_file.py
+        python -m flowrunner validate --jobs 8 /my_path/to/flows/
+        python -m flowrunner validate "/my_path/to/flows/**/*_flow.py"
 
     Args:
-        filepath: A string value of python file containing a Flow i.e subclass of BaseFlow
+        filepaths: String values of python files containing a Flow i.e subclass of BaseFlow, directories
+            searched recursively for them or glob patterns
+        jobs: An int value of the number of files validated at once in worker processes
 
     Returns:
-        Output regarding the validation of the flow
+        Output regarding the validation of the flow, exits with 1 if any Flow is invalid
     """
-    flow_list = _read_python_file(filepath)
-    for flow_class in flow_list:
-        flow_class().validate()
+    _exit_on_failure(_process_flows(_validate_flow, filepaths, jobs=jobs))
+
+
+def _show_flow(flow_class):
+    """Function to show the order of iteration of a Flow"""
+    logger.info("Checking flow %s", flow_class.__name__)
+    flow_class().show()
 
 
 @cli.command()
-@click.argument("filepath")
-def show(filepath: str):
+@jobs_option
+@click.argument("filepaths", nargs=-1, required=True)
+def show(filepaths: tuple, jobs: int = 1):
     """Command to show the order of iteration of a Flow
 
     Examples:
         python -m flowrunner show /my_path/to/flow_file.py
+        python -m flowrunner show /my_path/to/flows/
 
     Args:
-        filepath: A string value of python file containing a Flow i.e subclass of BaseFlow
+        filepaths: String values of python files containing a Flow i.e subclass of BaseFlow, directories
+            searched recursively for them or glob patterns
+        jobs: An int value of the number of files processed at once in worker processes
 
     Returns:
         Shows the order of iteration and explaination of Flow
     """
-    flow_list = _read_python_file(filepath)
-    for flow_class in flow_list:
-        logger.info("Checking flow %s", flow_class.__name__)
-        flow_class().show()
+    _exit_on_failure(_process_flows(_show_flow, filepaths, jobs=jobs))
+
+
+def _plan_flow(
+    flow_class,
+    run_reports: dict = None,
+    report: str = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+):
+    """Function to show how long a Flow takes with 1 to max_workers workers
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        run_reports: An optional dict of {flow name: RunReport} to take the duration of each step from
+        report: An optional string value of the JSON file run_reports were read from
+        max_workers: An int value of the largest number of workers to simulate
+    """
+    run_reports = run_reports or {}
+    logger.info("Planning flow %s", flow_class.__name__)
+    if report and flow_class.__name__ not in run_reports:
+        logger.warning(
+            "No run of flow %s in %s, every step takes 1", flow_class.__name__, report
+        )
+    flow_class().plan(
+        run_report=run_reports.get(flow_class.__name__), max_workers=max_workers
+    )
 
 
 @cli.command()
-@click.argument("filepath")
-def run(filepath: str):
-    """Command to run a Flow
+@click.option(
+    "--report",
+    default=None,
+    help="Path of a JSON run report written by 'run --report', to take the duration of each step from",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_WORKERS,
+    show_default=True,
+    help="Largest number of workers to simulate",
+)
+@jobs_option
+@click.argument("filepaths", nargs=-1, required=True)
+def plan(
+    filepaths: tuple,
+    report: str = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    jobs: int = 1,
+):
+    """Command to show how long a Flow takes with 1 to max_workers workers, without running it
 
     Examples:
-        python -m flowrunner run /my_path/to/flow_file.py
+        python -m flowrunner plan /my_path/to/flow_file.py
+        python -m flowrunner plan --report report.json --max-workers 16 /my_path/to/flow_file.py
 
     Args:
-        filepath: A string value of python file containing a Flow i.e subclass of BaseFlow
+        filepaths: String values of python files containing a Flow i.e subclass of BaseFlow, directories
+            searched recursively for them or glob patterns
+        report: An optional string value of a JSON run report, without one every step takes 1
+        max_workers: An int value of the largest number of workers to simulate
+        jobs: An int value of the number of files processed at once in worker processes
 
     Returns:
-        Runs the Flow
+        Shows the work, span and width of the Flow and its simulated makespan under each scheduling policy
     """
-    flow_list = _read_python_file(filepath)
-    for flow_class in flow_list:
-        logger.info("Running flow %s", flow_class.__name__)
-        flow_class().run()
+    run_reports = load_reports(report) if report else {}
+    results = _process_flows(
+        _plan_flow,
+        filepaths,
+        jobs=jobs,
+        run_reports=run_reports,
+        report=report,
+        max_workers=max_workers,
+    )
+    _exit_on_failure(results)
+
+
+def _run_flow(
+    flow_class,
+    memory_budget: int = None,
+    profile: bool = False,
+    profile_dir: str = "profiles",
+    top: int = 10,
+    trace: bool = False,
+    **run_options,
+) -> tuple:
+    """Function to run a Flow
 
+    Args:
+        flow_class: A subclass of BaseFlow
+        memory_budget: An optional int value of the maximum bytes of outputs held in memory
+        profile: A bool value to print the RunReport
+        profile_dir: A str value of the directory to write the collapsed stacks of the profiled steps to
+        top: An int value of the number of hottest functions to print for each profiled step
+        trace: A bool value to return the param_store of the Flow, for the trace
+        run_options: Keyword arguments of BaseFlow.run
+
+    Returns:
+        A tuple of (RunReport, param_store converted to JSON types or None if trace is False)
+    """
+    logger.info("Running flow %s", flow_class.__name__)
+    data_store = SpillableDataStore(memory_budget) if memory_budget else {}
+    flow_instance = flow_class(data_store=data_store)
+    run_report = flow_instance.run(**run_options)
+    if profile:
+        run_report.show()
+    if run_report.profiles:
+        show_profiles(run_report, top=top)
+        save_profiles(run_report, profile_dir)
+        click.secho(
+            f"Profiles of {flow_class.__name__} written to {profile_dir}", fg="green"
+        )
+    return run_report, to_json_safe(flow_instance.param_store) if trace else None
+
+
+@cli.command()
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of workers used to run independent steps concurrently",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="Run steps in threads or in worker processes",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Cache the output of every step, not only the steps with @step(cache=True)",
+)
+@click.option(
+    "--checkpoint",
+    is_flag=True,
+    default=False,
+    help="Checkpoint every completed step so that the run can be resumed",
+)
+@click.option("--resume", default=None, help="Run id of a failed run to resume")
+@click.option(
+    "--release-outputs",
+    is_flag=True,
+    default=False,
+    help="Remove the output of a step from data_store once all of its next steps have finished",
+)
+@click.option(
+    "--shared-memory",
+    is_flag=True,
+    default=False,
+    help="Pass large arrays and DataFrames to worker processes through shared memory, with --executor process",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print how long each step took and the resources it used",
+)
+@click.option(
+    "--profile-steps",
+    is_flag=True,
+    default=False,
+    help="Profile every step, not only the steps with @step(profile=True)",
+)
+@click.option(
+    "--profile-dir",
+    default="profiles",
+    show_default=True,
+    help="Directory to write the collapsed stacks of the profiled steps to",
+)
+@click.option(
+    "--top",
+    default=10,
+    show_default=True,
+    help="Number of functions to print for each profiled step",
+)
+@click.option(
+    "--report", default=None, help="Path of a JSON file to write the run report to"
+)
+@click.option(
+    "--trace",
+    default=None,
+    help="Path of a JSON file to write a Chrome trace of the run to, open it in https://ui.perfetto.dev",
+)
+@click.option(
+    "--memory-budget",
+    default=None,
+    help="Maximum size of step outputs held in memory eg. 512MB, older outputs are spilled to disk",
+)
+@click.option(
+    "--target",
+    "targets",
+    multiple=True,
+    help="Only run this step and the steps before it that are not cached, can be given more than once",
+)
+@click.option(
+    "--from",
+    "from_steps",
+    multiple=True,
+    help="Run this step and every step after it again even if they are cached, can be given more than once",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Only run the steps that changed since the last incremental run and the steps after them",
+)
+@click.option(
+    "--state-dir",
+    default=DEFAULT_STATE_DIRECTORY,
+    show_default=True,
+    help="Directory to keep the state of the last incremental run in",
+)
+@jobs_option
+@click.argument("filepaths", nargs=-1, required=True)
+def run(
+    filepaths: tuple,
+    workers: int = None,
+    executor: str = "thread",
+    cache: bool = False,
+    checkpoint: bool = False,
+    resume: str = None,
+    release_outputs: bool = False,
+    shared_memory: bool = False,
+    profile: bool = False,
+    profile_steps: bool = False,
+    profile_dir: str = "profiles",
+    top: int = 10,
+    report: str = None,
+    trace: str = None,
+    memory_budget: str = None,
+    targets: tuple = (),
+    from_steps: tuple = (),
+    incremental: bool = False,
+    state_dir: str = DEFAULT_STATE_DIRECTORY,
+    jobs: int = 1,
+):
+    """Command to run a Flow
 
-def _read_python_file(file_path: str) -> BaseFlow:
-    """Function to read Python file from path
-    An internal function that is used to read a file from a string value.
+    Examples:
+        python -m flowrunner run /my_path/to/flow_file.py
+        python -m flowrunner run --workers 4 /my_path/to/flow_file.py
+        python -m flowrunner run --workers 4 --executor process /my_path/to/flow_file.py
+        python -m flowrunner run --cache /my_path/to/flow_file.py
+        python -m flowrunner run --checkpoint /my_path/to/flow_file.py
+        python -m flowrunner run --resume 20230603-101500-1a2b3c4d /my_path/to/flow_file.py
+        python -m flowrunner run --workers 4 --executor process --shared-memory /my_path/to/flow_file.py
+        python -m flowrunner run --profile --report report.json /my_path/to/flow_file.py
+        python -m flowrunner run --workers 4 --trace trace.json /my_path/to/flow_file.py
+        python -m flowrunner run --profile-steps --top 5 /my_path/to/flow_file.py
+        python -m flowrunner run --memory-budget 2GB /my_path/to/flow_file.py
+        python -m flowrunner run --jobs 4 --report report.json /my_path/to/flows/
+        python -m flowrunner run --cache --target append_data /my_path/to/flow_file.py
+        python -m flowrunner run --cache --from append_data /my_path/to/flow_file.py
+        python -m flowrunner run --incremental /my_path/to/flow_file.py
 
     Args:
-        file_path: A string value of file path
+        filepaths: String values of python files containing a Flow i.e subclass of BaseFlow, directories
+            searched recursively for them or glob patterns
+        workers: An optional int value of number of workers to run independent steps concurrently
+        executor: An optional str value of 'thread' or 'process', the kind of workers to use
+        cache: An optional bool value to cache the output of every step
+        checkpoint: An optional bool value to checkpoint every completed step
+        resume: An optional string value of the run id of a failed run to resume
+        release_outputs: An optional bool value to remove outputs from data_store once they are not needed
+        shared_memory: An optional bool value to pass large outputs to worker processes through shared memory
+        profile: An optional bool value to print the RunReport of each Flow
+        profile_steps: An optional bool value to profile every step
+        profile_dir: A str value of the directory to write the collapsed stacks of the profiled steps to, one file
+            per step and one per Flow
+        top: An int value of the number of hottest functions to print for each profiled step
+        report: An optional string value of a JSON file to write the RunReport of each Flow to
+        trace: An optional string value of a JSON file to write a Chrome trace of all the Flows to
+        memory_budget: An optional str value of the maximum size of outputs held in memory eg. '512MB'
+        targets: String values of the steps to run with the steps before them that cannot be restored
+        from_steps: String values of the steps to run again along with every step after them
+        incremental: An optional bool value to only run the steps that changed since the last incremental run
+        state_dir: A str value of the directory to keep the state of the last incremental run in
+        jobs: An int value of the number of files run at once in worker processes
 
     Returns:
-        flows: A list value of all subclasses of BaseFlow except for BaseFlow itself
+        Runs the Flow, exits with 1 if any Flow failed
     """
-    module = importfile(
-        file_path
-    )  # importfile is the best way to handle importing a module from a string
-    module_elements_dict = vars(
-        module
-    )  # get module elements in dict eg. {'BaseFlow': <class 'flowrunner.runner.flow.BaseFlow'>, 'ExampleFlow': <class 'testing.ExampleFlow'>} # pylint: disable=line-too-long
-    # iterate over all and check if subclass of BaseFlow unless its __name__ is BaseFlow itself
-    # flows = [] # a list to store all the subclass of BaseFlow
-    flows = [
-        element
-        for element in module_elements_dict.values()  # iterate over all the elements in the file
-        if inspect.isclass(
-            element
-        )  # check if the element we are iterating over is a class
-        and issubclass(element, BaseFlow)  # check if subclass of BaseFlow
-        and element.__name__
-        != BaseFlow.__name__  # we make sure we pick only the subclass of BaseFlow and not BaseFlow itself
+    if shared_memory and executor != "process":
+        raise click.BadParameter(
+            "can only be used with --executor process", param_hint="--shared-memory"
+        )
+    if memory_budget:
+        try:
+            memory_budget = parse_size(memory_budget)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="--memory-budget")
+    # all the flows share the run id, each one has its own directory in the run
+    run_checkpoint = None
+    if resume:
+        run_checkpoint = RunCheckpoint(run_id=resume)
+    elif checkpoint:
+        run_checkpoint = RunCheckpoint()
+        click.secho(f"Run id: {run_checkpoint.run_id}", fg="green")
+
+    results = _process_flows(
+        _run_flow,
+        filepaths,
+        jobs=jobs,
+        memory_budget=memory_budget,
+        profile=profile,
+        profile_dir=profile_dir,
+        top=top,
+        trace=bool(trace),
+        max_workers=workers,
+        executor=executor,
+        cache=cache,
+        checkpoint=run_checkpoint or False,
+        resume=run_checkpoint if resume else None,
+        release_outputs=release_outputs,
+        shared_memory=shared_memory,
+        profile_steps=profile_steps,
+        targets=list(targets) or None,
+        from_steps=list(from_steps) or None,
+        incremental=state_dir if incremental else False,
+    )
+    run_reports = [flow_result.value[0] for flow_result in results if flow_result.value]
+    param_stores = [
+        flow_result.value[1] for flow_result in results if flow_result.value
     ]
-    flow_names = [flow.__name__ for flow in flows]
-    logger.info("Found Flows: %s", flow_names)
-    return flows
+    if report:
+        save_reports(run_reports, report)
+        click.secho(f"Run report written to {report}", fg="green")
+    if trace:
+        save_trace(run_reports, trace, param_stores=param_stores)
+        click.secho(f"Trace written to {trace}", fg="green")
+    _exit_on_failure(results)
+
+
+renderer_option = click.option(
+    "--renderer",
+    type=click.Choice(list(RENDERERS)),
+    default=DEFAULT_RENDERER,
+    show_default=True,
+    help="Lay out the DAG in Python as an SVG which opens without network access, or with mermaid js in the browser",
+)
+
+
+def _display_flow(
+    flow_class,
+    path: str = None,
+    description: bool = True,
+    run_reports: dict = None,
+    report: str = None,
+    renderer: str = DEFAULT_RENDERER,
+):
+    """Function to save the DAG of a Flow
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        path: A string value of path to save flow in. Defaults to current directory
+        description: A bool value for descriptive or non descriptive dag
+        run_reports: An optional dict of {flow name: RunReport} to show the duration of each step
+        report: An optional string value of the JSON file run_reports were read from
+        renderer: A str value of 'mermaid' or 'svg'
+    """
+    run_reports = run_reports or {}
+    logger.info("Creating Flow DAG for flow %s", flow_class.__name__)
+    if report and flow_class.__name__ not in run_reports:
+        logger.warning("No run of flow %s in %s", flow_class.__name__, report)
+    flow_class().dag(
+        save_file=True,
+        path=path,
+        description=description,
+        run_report=run_reports.get(flow_class.__name__),
+        renderer=renderer,
+    )  # we keep save file as True, assumption being if we are running through cli then we are going to save
 
 
 @cli.command()
 @click.option("--path")
 @click.option("--description", default=True)
-@click.argument("filepath")
-def display(filepath: str, path: str = None, description: bool = True):
+@click.option(
+    "--report",
+    default=None,
+    help="Path of a JSON run report written by 'run --report', to show the duration of each step",
+)
+@renderer_option
+@jobs_option
+@click.argument("filepaths", nargs=-1, required=True)
+def display(
+    filepaths: tuple,
+    path: str = None,
+    description: bool = True,
+    report: str = None,
+    renderer: str = DEFAULT_RENDERER,
+    jobs: int = 1,
+):
     """Command to visualize a Flow as Directed Acyclical Graph
 
     Examples:
         python -m flowrunner display /my_path/to/flow_file.py
+        python -m flowrunner display --report report.json /my_path/to/flow_file.py
+        python -m flowrunner display --jobs 4 "/my_path/to/flows/**/*.py"
+        python -m flowrunner display --renderer mermaid /my_path/to/flow_file.py
 
     Args:
+        filepaths: String values of python files containing a Flow i.e subclass of BaseFlow, directories
+            searched recursively for them or glob patterns
         path: A string value of path to save flow in. Defaults to current directory
         description: Optional argument for descriptive or non descriptive dag, default is descriptive
+        report: An optional string value of a JSON run report, each step is labeled with its duration, colored
+            by its share of the total time and the critical path is highlighted
+        renderer: A str value of 'mermaid' or 'svg', the DAG is laid out in the browser or in Python
+        jobs: An int value of the number of files processed at once in worker processes
 
     Returns:
         Displays the flows
     """
-    # if we pass only a single filepath as input then we visualize that filepath
-    flow_list = _read_python_file(filepath)
-    for flow_class in flow_list:
+    run_reports = load_reports(report) if report else {}
+    results = _process_flows(
+        _display_flow,
+        filepaths,
+        jobs=jobs,
+        path=path,
+        description=description,
+        run_reports=run_reports,
+        report=report,
+        renderer=renderer,
+    )
+    _exit_on_failure(results)
+
+
+def _render_flow(
+    flow_class,
+    path: str,
+    description: bool = True,
+    renderer: str = DEFAULT_RENDERER,
+    graph_hashes: dict = None,
+) -> dict:
+    """Function to save the DAG of a Flow, unless it has the graph hash in graph_hashes and its file exists
+
+    Args:
+        flow_class: A subclass of BaseFlow
+        path: A string value of the directory to save the DAG in, ending with a separator
+        description: A bool value for descriptive or non descriptive dag
+        renderer: A str value of 'mermaid' or 'svg'
+        graph_hashes: An optional dict of {Flow name: graph hash} of the DAGs rendered before
+
+    Returns:
+        A dict of the 'graph_hash', 'html', 'steps' and 'description' of the Flow for the DAGManifest, and
+        'rendered', True if the DAG was saved
+    """
+    flow_instance = flow_class()
+    graph_hash = DAGGenerator.get_graph_hash(flow_instance, description=description)
+    html = DAGGenerator.get_dag_filename(flow_class.__name__)
+    rendered = (graph_hashes or {}).get(
+        flow_class.__name__
+    ) != graph_hash or not os.path.exists(os.path.join(path, html))
+    if rendered:
         logger.info("Creating Flow DAG for flow %s", flow_class.__name__)
-        flow_class().dag(
-            save_file=True, path=path, description=description
-        )  # we keep save file as True, assumption being if we are running through cli then we are going to save
+        flow_instance.dag(
+            save_file=True, path=path, description=description, renderer=renderer
+        )
+    else:
+        logger.debug("Flow DAG for flow %s is up to date", flow_class.__name__)
+    docstring = (flow_class.__doc__ or "").strip()
+    return {
+        "graph_hash": graph_hash,
+        "html": html,
+        "steps": len(flow_instance.graph.nodes),
+        "description": docstring.splitlines()[0] if docstring else None,
+        "rendered": rendered,
+    }
 
 
 @cli.command()
 @click.option("--path")
 @click.option("--description", default=True)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Render the DAG of every Flow, not only of the Flows which changed",
+)
+@renderer_option
+@jobs_option
 @click.argument("directory")
-def display_dir(directory: str, path: str = None, description: bool = True):
+def display_dir(
+    directory: str,
+    path: str = None,
+    description: bool = True,
+    force: bool = False,
+    renderer: str = DEFAULT_RENDERER,
+    jobs: int = 1,
+):
     """Command to visualize a directory of Flows as Directed Acyclical Graph
 
+    The DAGs are rendered incrementally: a manifest of the hashes of the files and of the DAGs is kept in path, a
+    file is only imported if it changed and a DAG only rendered if its steps, their 'next' or docstrings changed.
+    An index.html linking every DAG is written in path.
+
     Examples:
-        python -m flowrunner display_dir /my_path/to/flow_file.py
+        python -m flowrunner display_dir /my_path/to/flows/
+        python -m flowrunner display_dir --jobs 4 --path docs/flows/ /my_path/to/flows/
 
     Args:
         path: A string value of path to save flow in. Defaults to current directory
         description: Optional argument for descriptive or non descriptive dag, default is descriptive
-        directory: A string value of directory to check for flows
+        force: A bool value to render every DAG
+        renderer: A str value of 'mermaid' or 'svg', the DAGs are laid out in the browser or in Python
+        directory: A string value of directory to check recursively for flows
+        jobs: An int value of the number of files processed at once in worker processes
 
     Returns:
         Displays the flows
     """
-    flow_list = []  # list of flows to store all files
-    # then we susbtitute that value as filepath
-    for filepath in os.listdir(directory):
-        # check if the file is python file otherwise ignore otherwise
-        # sometimes other files can get in the way and cause errors
-        if filepath.endswith(".py"):
-            flow_list = _read_python_file(os.path.join(directory, filepath))
-            for flow_class in flow_list:
-                logger.info("Creating Flow DAG for flow %s", flow_class.__name__)
-                flow_class().dag(
-                    save_file=True, path=path, description=description
-                )  # we keep save file as True, assumption being if we are running through cli then we are going to save
+    path = os.path.join(path or ".", "")  # the DAG is saved to path + file name
+    manifest = DAGManifest.load(path, get_render_hash(description, renderer))
+    try:
+        files = find_flow_files([directory])
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="DIRECTORY")
+    source_hashes = {filepath: get_file_hash(filepath) for filepath in files}
+    for filepath in set(manifest.files) - set(files):
+        logger.info("Removing DAGs of %s", filepath)
+        manifest.remove(filepath)
+    changed_files = [
+        filepath
+        for filepath in files
+        if force or not manifest.is_unchanged(filepath, source_hashes[filepath])
+    ]
+
+    results = process_files(
+        _render_flow,
+        changed_files,
+        jobs=jobs,
+        path=path,
+        description=description,
+        renderer=renderer,
+        graph_hashes={} if force else manifest.get_graph_hashes(),
+    )
+    rendered = sum(
+        flow_result.value.pop("rendered")
+        for flow_result in results
+        if flow_result.value
+    )
+    for filepath in changed_files:
+        file_results = [
+            flow_result for flow_result in results if flow_result.filepath == filepath
+        ]
+        manifest.update(
+            filepath,
+            source_hashes[filepath],
+            {
+                flow_result.flow_name: flow_result.value
+                for flow_result in file_results
+                if flow_result.status == STATUS_PASSED
+            },
+            complete=all(
+                flow_result.status == STATUS_PASSED for flow_result in file_results
+            ),
+        )
+    manifest.save()
+    index_path = save_index(manifest)
+    if len(changed_files) > 1:
+        show_results(results)
+    click.secho(
+        f"Rendered {rendered} of {len(manifest.flows)} DAGs, {len(files) - len(changed_files)} unchanged files "
+        f"skipped. Index written to {index_path}",
+        fg="green",
+    )
+    _exit_on_failure(results)
+
+
+@cli.group()
+def cache():
+    """Commands to manage the cache of step outputs"""
+
+
+@cache.command()
+@click.option("--directory", default=DEFAULT_CACHE_DIRECTORY)
+def stats(directory: str):
+    """Command to show the number and size of entries in the step cache
+
+    Examples:
+        python -m flowrunner cache stats
+
+    Args:
+        directory: A string value of the cache directory, defaults to .flowrunner/cache
+
+    Returns:
+        Shows the total and per step entries and size of the cache
+    """
+    cache_stats = StepCache(directory=directory).get_stats()
+    click.secho(f"{directory}\n", fg="green")
+    for step_name, step_stats in sorted(cache_stats["steps"].items()):
+        click.secho(
+            f"   {step_name}: {step_stats['entries']} entries, {step_stats['size']} bytes",
+            fg="blue",
+        )
+    click.secho(
+        f"\nTotal: {cache_stats['entries']} entries, {cache_stats['size']} bytes",
+        fg="bright_red",
+    )
+
+
+@cache.command()
+@click.option("--directory", default=DEFAULT_CACHE_DIRECTORY)
+@click.option("--flow", "flow_name", default=None, help="Only clear this Flow class")
+@click.option("--step", "step_name", default=None, help="Only clear this step")
+def clear(directory: str, flow_name: str = None, step_name: str = None):
+    """Command to remove entries from the step cache
+
+    Examples:
+        python -m flowrunner cache clear
+        python -m flowrunner cache clear --flow ExamplePandas --step append_data
+
+    Args:
+        directory: A string value of the cache directory, defaults to .flowrunner/cache
+        flow_name: An optional string value, only remove the entries of this Flow class
+        step_name: An optional string value, only remove the entries of this step
+
+    Returns:
+        Removes the entries and shows how many were removed
+    """
+    removed = StepCache(directory=directory).clear(
+        flow_name=flow_name, node_name=step_name
+    )
+    click.secho(f"Removed {removed} entries from {directory}", fg="green")
 
 
 @cli.command()
@@ -209,6 +817,11 @@ def init(output_dir="."):
     Returns:
         Displays the flows
     """
+    # cookiecutter is only needed here, importing it with the cli would slow down every other command
+    from cookiecutter.main import (  # pylint: disable=import-outside-toplevel
+        cookiecutter,
+    )
+
     # Create a cookie cutter project
     cookiecutter(PROJECT_TEMPLATES_PATH, output_dir=output_dir)
 
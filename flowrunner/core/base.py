@@ -22,6 +22,10 @@ class Node:
         function_reference: The actual function or callable
         next: None by default, list value of what is next node, assigned in __post_init__
         docstring: Docstring of method assigned in __post_init__
+        is_async: A bool value, True if the function is an 'async def' function, assigned in __post_init__
+        cache: A bool value, True if the output of the function is cached with @step(cache=True), assigned in __post_init__
+        pin: A bool value, True if the output of the function is kept with @step(pin=True), assigned in __post_init__
+        profile: A bool value, True if the function is profiled with @step(profile=True), assigned in __post_init__
     """
 
     name: str
@@ -40,6 +44,10 @@ class Node:
         """
         # store the __doc__ as attribute docstring
         self.docstring = self.function_reference.__doc__
+        self.is_async = getattr(self.function_reference, "is_async", False)
+        self.cache = getattr(self.function_reference, "cache", False)
+        self.pin = getattr(self.function_reference, "pin", False)
+        self.profile = getattr(self.function_reference, "profile", False)
         # if next has value
         if self.function_reference.next:
             if isinstance(self.function_reference.next, list):
@@ -219,6 +227,8 @@ class Graph:
         nodes: A list of all the nodes start + middle_nodes + end
         node_map: A dict of {node.name: node} for reference for later
         levels: A list containing the iteration order for methods from start -> middle_nodes -> end
+        validation_results: None until the Graph is validated, then a list of (test_result, output_message) tuples
+            stored by GraphValidator so that the checks are not run again
     """
 
     graph_options: GraphOptions
@@ -249,51 +259,171 @@ class Graph:
         self.nodes = self.start + self.middle_nodes + self.end
         self.node_map = {node.name: node for node in self.nodes}
         self.levels = []
+        self.validation_results = None
         self._arrange_graph()
 
     def _arrange_graph(self):
         """Method to arrange the Nodes in the Graph into the order of iteration
 
-        We assume that start will be the root node, after that we iterate over the next of each
-        node and append them to each level.
+        We assume that start will be the root node. We find all the nodes reachable from the start nodes
+        and count the number of predecessors (in-degree) of each of them. Then we take nodes in topological
+        order (Kahn's algorithm), a node is only taken once all of its predecessors are, and place it one
+        level below the deepest of its predecessors. This means each node is placed exactly once, at the
+        length of the longest path to it, even when it can be reached by paths of different lengths.
+
+        This runs in O(V+E) and nodes in the same level keep the order they are defined in the class.
 
         Raises:
-            CyclicFlowException: In case the flow is cycle, for example if we visit a node we have already visited
+            CyclicFlowException: In case the flow is cycle, for example if a node points to a node before it
         """
         # TODO: Maybe in the future there may be a need to add 'end' node or a later node in 'middle_nodes' to the 'next' of 'start'. Need to add
         # check to remove any function in end and mentioned in middle nodes
-        # create temp_node = start
-        temp_level = self.start
-
-        self.levels.append(temp_level)  # add temp level to 'self.levels'
-
-        # we need to a check for an cyclic dag, one which points at a previous level
-        checked_nodes = []
-
-        # while loop for when temp_level is not empty
-        while temp_level:
-            next_level = []
-            # iterate through temp node
-            # find the next of each
-            for node in temp_level:
-                # we iterate through the list of 'node.next' and
-                # using the 'self.node_map' we find the Node
-                next = [self.node_map[next_node] for next_node in node.next]
-                # add the next to the list
-                next_level += next
-                if (
-                    node in checked_nodes
-                ):  # we make sure that if we have visited this node then we shouldn't check it again
-                    logger.error("node=%s is cyclic", node)
-                    raise CyclicFlowException(f"DAG is cyclic due to node={node}")
-
-                checked_nodes.append(node)
-            next_level = list(
-                set(next_level)
-            )  # we make sure the nodes in the level are unique
-            if not next_level:  # once we reach the end with no next then we stop
-                break
-            self.levels.append(
-                next_level
-            )  # append the level to the main level as a 2d array
-            temp_level = next_level  # then the next level becomes the temp_level to continue the loop
+        # find all the nodes reachable from the start nodes
+        reachable = set(self.start)
+        to_visit = list(self.start)
+        while to_visit:
+            node = to_visit.pop()
+            for next_node_name in node.next:
+                next_node = self.node_map[next_node_name]
+                if next_node not in reachable:
+                    reachable.add(next_node)
+                    to_visit.append(next_node)
+
+        # count the predecessors of each reachable node
+        in_degrees = {node: 0 for node in reachable}
+        for node in reachable:
+            for next_node_name in node.next:
+                in_degrees[self.node_map[next_node_name]] += 1
+
+        depths = {node: 0 for node in reachable}
+        ready = [
+            node for node in self.nodes if node in reachable and in_degrees[node] == 0
+        ]
+        arranged = []  # nodes in topological order
+        while ready:
+            node = ready.pop()
+            arranged.append(node)
+            for next_node_name in node.next:
+                next_node = self.node_map[next_node_name]
+                depths[next_node] = max(depths[next_node], depths[node] + 1)
+                in_degrees[next_node] -= 1
+                if in_degrees[next_node] == 0:
+                    ready.append(next_node)
+
+        # if we could not take all the nodes, the ones left are waiting on each other
+        if len(arranged) != len(reachable):
+            cyclic_node = next(
+                node
+                for node in self.nodes
+                if node in reachable and in_degrees[node] > 0
+            )
+            logger.error("node=%s is cyclic", cyclic_node)
+            raise CyclicFlowException(f"DAG is cyclic due to node={cyclic_node}")
+
+        # group the nodes by depth, we go over self.nodes so each level keeps the order of definition
+        self.levels = [[] for _ in range(max(depths.values(), default=-1) + 1)]
+        for node in self.nodes:
+            if node in depths:
+                self.levels[depths[node]].append(node)
+
+    def get_previous(self) -> dict:
+        """Method to get the previous nodes of each node, i.e the nodes that have it in their 'next'
+
+        Returns:
+            previous: A dict of {node.name: list of str values of previous node names}
+        """
+        previous = {node.name: [] for node in self.nodes}
+        for node in self.nodes:
+            for next_node in node.next:
+                previous[next_node].append(node.name)
+        return previous
+
+    def get_upstream(self, node_names: list) -> set:
+        """Method to get the names of all the nodes that come before the given nodes
+
+        We follow the 'next' edges backwards from each of the given nodes, so the result contains
+        every node whose output can be read by them. The given nodes themselves are not included
+        unless they come before another given node.
+
+        Args:
+            node_names: A list of str values of node names
+
+        Returns:
+            upstream: A set of str values of node names
+        """
+        previous = self.get_previous()
+        upstream = set()
+        to_visit = [
+            previous_node
+            for node_name in node_names
+            for previous_node in previous[node_name]
+        ]
+        while to_visit:
+            node_name = to_visit.pop()
+            if node_name not in upstream:
+                upstream.add(node_name)
+                to_visit.extend(previous[node_name])
+        return upstream
+
+    def get_downstream(self, node_names: list) -> set:
+        """Method to get the names of all the nodes that come after the given nodes
+
+        We follow the 'next' edges from each of the given nodes, so the result contains every node
+        that can read their output. The given nodes themselves are not included unless they come
+        after another given node.
+
+        Args:
+            node_names: A list of str values of node names
+
+        Returns:
+            downstream: A set of str values of node names
+        """
+        downstream = set()
+        to_visit = [
+            next_node
+            for node_name in node_names
+            for next_node in self.node_map[node_name].next
+        ]
+        while to_visit:
+            node_name = to_visit.pop()
+            if node_name not in downstream:
+                downstream.add(node_name)
+                to_visit.extend(self.node_map[node_name].next)
+        return downstream
+
+    def get_critical_path(self, durations: dict) -> list:
+        """Method to get the critical path of the Graph, i.e the path through the 'next' edges that takes the longest
+
+        We go through Graph.levels, which is in topological order, and for each node keep the longest time it
+        takes to finish it including the nodes before it. The critical path is followed back from the node that
+        finishes last. Shortening any other node does not make the whole Flow finish sooner.
+
+        Args:
+            durations: A dict of {node.name: seconds}, nodes that are missing take 0 seconds
+
+        Returns:
+            critical_path: A list of str values of node names, from a start node to an end node
+        """
+        previous = self.get_previous()
+        finish_times = {}
+        slowest_previous = {}
+        for level in self.levels:
+            for node in level:
+                slowest = max(
+                    (name for name in previous[node.name] if name in finish_times),
+                    key=finish_times.get,
+                    default=None,
+                )
+                slowest_previous[node.name] = slowest
+                finish_times[node.name] = durations.get(node.name, 0) + (
+                    finish_times[slowest] if slowest is not None else 0
+                )
+        if not finish_times:
+            return []
+
+        node_name = max(finish_times, key=finish_times.get)
+        critical_path = []
+        while node_name is not None:
+            critical_path.append(node_name)
+            node_name = slowest_previous[node_name]
+        return critical_path[::-1]
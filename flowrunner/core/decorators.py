@@ -1,17 +1,42 @@
 # -*- coding: utf-8 -*-
 """Module for decorators"""
+import inspect
 from functools import update_wrapper, wraps
 from typing import Callable, List, Union
 
 
-def step(function: Callable = None, next: Union[List, str] = None):
+def step(
+    function: Callable = None,
+    next: Union[List, str] = None,
+    cache: bool = False,
+    pin: bool = False,
+    profile: bool = False,
+):
     """This decorator indicates a step in the function
-    We add a 3 attributes to it is_step, name, next"""
+    We add a 7 attributes to it is_step, name, next, is_async, cache, pin, profile
+
+    'async def' functions are wrapped with a coroutine function, so that the runner
+    can await them. With cache=True the output of the step is stored in the step cache
+    and reused when the step, its parameters and its upstream steps have not changed.
+    With pin=True the output of the step is kept in data_store when the runner releases outputs.
+    With profile=True the call stacks of the step are sampled every time it runs"""
 
     def _step(f):
         f.is_step = True
         f.name = f.__name__
         f.next = next
+        f.is_async = inspect.iscoroutinefunction(f)
+        f.cache = cache
+        f.pin = pin
+        f.profile = profile
+
+        if f.is_async:
+
+            @wraps(f)
+            async def async_wrapper(*args, **kwargs):
+                return await f(*args, **kwargs)
+
+            return async_wrapper
 
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -45,10 +70,21 @@ class Step:
     and have a next
     """
 
-    def __init__(self, func: Callable, next: Union[str, list, None] = None):
+    def __init__(
+        self,
+        func: Callable,
+        next: Union[str, list, None] = None,
+        cache: bool = False,
+        pin: bool = False,
+        profile: bool = False,
+    ):
         func.is_step = True
         func.next = next
         func.name = func.__name__
+        func.is_async = inspect.iscoroutinefunction(func)
+        func.cache = cache
+        func.pin = pin
+        func.profile = profile
         self.func = func
         update_wrapper(self, func)
 
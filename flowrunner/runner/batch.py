@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""Module for processing many files of Flows at once, used by the cli
+
+FlowResult: A class containing the status and duration of a single Flow
+find_flow_files: A function to expand files, directories and glob patterns into a list of Python files
+read_flow_file: A function to import a Python file and get the Flows in it
+process_files: A function to call an action on every Flow of every file, in worker processes with jobs > 1
+show_results: A function to print a summary table of the FlowResults
+
+Files are independent of each other, so with jobs > 1 each file is imported and processed in a worker process.
+What a worker prints is captured and printed by the main process once the file is done, so the output of different
+files is not interleaved. An exception raised by a Flow, or by importing its file, fails that Flow but not the others.
+"""
+import glob
+import inspect
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pydoc import importfile
+from typing import Any
+
+import click
+
+from flowrunner.runner.flow import BaseFlow
+from flowrunner.system.logger import logger
+
+STATUS_PASSED = "passed"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"  # the file could not be imported
+
+
+@dataclass
+class FlowResult:
+    """A class containing the status and duration of a single Flow
+
+    Attributes:
+        filepath: A str value of the file of the Flow
+        flow_name: A str value of the name of the Flow class, None if the file could not be imported
+        status: A str value of 'passed', 'failed' or 'error' if the file could not be imported
+        duration: A float value of seconds the action took
+        error: An optional str value of the exception raised
+        value: The value returned by the action eg. a RunReport
+    """
+
+    filepath: str
+    flow_name: str = None
+    status: str = STATUS_PASSED
+    duration: float = 0.0
+    error: str = None
+    value: Any = None
+
+
+class _CapturedOutput(io.StringIO):
+    """A StringIO reporting whether the terminal of the main process is a tty, so that click keeps the colors"""
+
+    def __init__(self, isatty: bool):
+        """Init with the isatty value of the terminal the output will be printed to"""
+        super().__init__()
+        self._isatty = isatty
+
+    def isatty(self) -> bool:
+        """Method returning whether the terminal of the main process is a tty"""
+        return self._isatty
+
+
+def _format_error(error: Exception) -> str:
+    """Private function to format an exception for the summary table eg. 'KeyError: 'a''"""
+    return f"{type(error).__name__}: {error}"
+
+
+def find_flow_files(paths: list) -> list:
+    """Function to expand files, directories and glob patterns into a list of Python files
+
+    Directories are searched recursively for '.py' files. Hidden directories are skipped, like by glob.
+
+    Args:
+        paths: A list of str values of files, directories or glob patterns eg. 'flows/**/*_flow.py'
+
+    Returns:
+        filepaths: A list of str values of the Python files, in the order of paths and sorted for each path, each
+            file only once
+
+    Raises:
+        ValueError: If a path does not exist or matches no Python file
+    """
+    filepaths = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(
+                glob.glob(os.path.join(glob.escape(path), "**", "*.py"), recursive=True)
+            )
+        elif glob.has_magic(path):
+            matches = sorted(
+                match
+                for match in glob.glob(path, recursive=True)
+                if match.endswith(".py") and os.path.isfile(match)
+            )
+        elif os.path.isfile(path):
+            matches = [path]
+        else:
+            raise ValueError(f"No such file or directory: '{path}'")
+        if not matches:
+            raise ValueError(f"No Python files found in '{path}'")
+        filepaths.extend(match for match in matches if match not in filepaths)
+    return filepaths
+
+
+def read_flow_file(file_path: str) -> list:
+    """Function to read Python file from path
+
+    Args:
+        file_path: A string value of file path
+
+    Returns:
+        flows: A list value of all subclasses of BaseFlow except for BaseFlow itself
+    """
+    module = importfile(
+        file_path
+    )  # importfile is the best way to handle importing a module from a string
+    module_elements_dict = vars(
+        module
+    )  # get module elements in dict eg. {'BaseFlow': <class 'flowrunner.runner.flow.BaseFlow'>, 'ExampleFlow': <class 'testing.ExampleFlow'>} # pylint: disable=line-too-long
+    # iterate over all and check if subclass of BaseFlow unless its __name__ is BaseFlow itself
+    flows = [
+        element
+        for element in module_elements_dict.values()  # iterate over all the elements in the file
+        if inspect.isclass(
+            element
+        )  # check if the element we are iterating over is a class
+        and issubclass(element, BaseFlow)  # check if subclass of BaseFlow
+        and element.__name__
+        != BaseFlow.__name__  # we make sure we pick only the subclass of BaseFlow and not BaseFlow itself
+    ]
+    flow_names = [flow.__name__ for flow in flows]
+    logger.info("Found Flows: %s", flow_names)
+    return flows
+
+
+def _process_file(action, filepath: str, options: dict) -> list:
+    """Private function to call an action on every Flow of a file
+
+    Args:
+        action: A callable taking a Flow class and the options as keyword arguments
+        filepath: A str value of the Python file
+        options: A dict of keyword arguments of the action
+
+    Returns:
+        results: A list of FlowResult, one per Flow of the file
+    """
+    start_time = time.perf_counter()
+    try:
+        flow_list = read_flow_file(filepath)
+    except Exception as error:  # pylint: disable=broad-except
+        logger.exception("Could not import %s", filepath)
+        return [
+            FlowResult(
+                filepath=filepath,
+                status=STATUS_ERROR,
+                duration=time.perf_counter() - start_time,
+                error=_format_error(error),
+            )
+        ]
+
+    results = []
+    for flow_class in flow_list:
+        flow_result = FlowResult(filepath=filepath, flow_name=flow_class.__name__)
+        start_time = time.perf_counter()
+        try:
+            flow_result.value = action(flow_class, **options)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.exception("Flow %s in %s failed", flow_class.__name__, filepath)
+            flow_result.status = STATUS_FAILED
+            flow_result.error = _format_error(error)
+        flow_result.duration = time.perf_counter() - start_time
+        results.append(flow_result)
+    return results
+
+
+def _process_file_captured(action, filepath: str, options: dict, isatty: bool) -> tuple:
+    """Private function run by a worker process, to process a file while capturing what it prints
+
+    Returns:
+        A tuple of (list of FlowResult, str value of the output)
+    """
+    output = _CapturedOutput(isatty)
+    with redirect_stdout(output):
+        results = _process_file(action, filepath, options)
+    return results, output.getvalue()
+
+
+def process_files(action, filepaths: list, jobs: int = 1, **options) -> list:
+    """Function to call an action on every Flow of every file
+
+    Args:
+        action: A callable taking a Flow class and the options as keyword arguments, it has to be defined at the top
+            level of a module to be sent to worker processes
+        filepaths: A list of str values of Python files
+        jobs: An int value of the number of files processed at once in worker processes, with 1 the files are
+            processed one after another in the current process
+        options: Keyword arguments of the action, they have to be picklable with jobs > 1
+
+    Returns:
+        results: A list of FlowResult, in the order of filepaths
+
+    Raises:
+        ValueError: If jobs is lower than 1
+    """
+    if jobs < 1:
+        raise ValueError(f"jobs has to be at least 1, got {jobs}")
+    if jobs == 1 or len(filepaths) <= 1:
+        return [
+            flow_result
+            for filepath in filepaths
+            for flow_result in _process_file(action, filepath, options)
+        ]
+
+    results = {}
+    isatty = sys.stdout.isatty()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(filepaths))) as executor:
+        futures = {
+            executor.submit(
+                _process_file_captured, action, filepath, options, isatty
+            ): filepath
+            for filepath in filepaths
+        }
+        for future in as_completed(futures):
+            filepath = futures[future]
+            try:
+                results[filepath], output = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                # the worker died or the result could not be pickled
+                logger.error("Could not process %s: %r", filepath, error)
+                results[filepath] = [
+                    FlowResult(
+                        filepath=filepath,
+                        status=STATUS_ERROR,
+                        error=_format_error(error),
+                    )
+                ]
+                output = ""
+            click.echo(output, nl=False)
+    return [flow_result for filepath in filepaths for flow_result in results[filepath]]
+
+
+def show_results(results: list, wall_time: float = None):
+    """Function to print a summary table of the FlowResults, one line per Flow
+
+    Args:
+        results: A list of FlowResult
+        wall_time: An optional float value of seconds all the files took, defaults to the sum of the durations
+
+    Returns:
+        None
+    """
+    width = max((len(flow_result.filepath) for flow_result in results), default=0)
+    click.secho(
+        f"\n{'File':<{width}}  {'Flow':<30} {'Status':<8} {'Duration':>10}", fg="green"
+    )
+    for flow_result in results:
+        click.secho(
+            f"{flow_result.filepath:<{width}}  {flow_result.flow_name or '-':<30} "
+            f"{flow_result.status:<8} {flow_result.duration:>9.3f}s",
+            fg="blue" if flow_result.status == STATUS_PASSED else "bright_red",
+        )
+        if flow_result.error:
+            click.secho(f"   {flow_result.error}", fg="bright_red")
+    failed = sum(flow_result.status != STATUS_PASSED for flow_result in results)
+    if wall_time is None:
+        wall_time = sum(flow_result.duration for flow_result in results)
+    click.secho(
+        f"\n{len(results) - failed} passed, {failed} failed in {wall_time:.3f}s\n",
+        fg="bright_red" if failed else "green",
+    )
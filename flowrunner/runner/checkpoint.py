@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Module for checkpointing the nodes of a run so that a failed run can be resumed
+
+RunCheckpoint: A class for storing the result of each completed node of a run in a local run directory
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from flowrunner.runner.cache import read_pickle, write_pickle
+from flowrunner.runner.process import NodeResult
+from flowrunner.system.logger import logger
+
+DEFAULT_RUN_DIRECTORY = os.path.join(".flowrunner", "runs")
+CHECKPOINT_FILE_EXTENSION = ".pkl"
+
+
+def create_run_id() -> str:
+    """Function to create a new run id
+
+    Returns:
+        run_id: A str value of the current time and a random suffix eg. '20230603-101500-1a2b3c4d'
+    """
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class RunCheckpoint:
+    """A class for storing the result of each completed node of a run in a local run directory
+
+    Each completed node is stored as a pickled NodeResult, i.e its output and the attributes it set on 'self',
+    in '<directory>/<run_id>/<flow name>/<node name>.pkl'. When a run is resumed with the same run_id, the
+    completed nodes are restored from these files instead of being run again.
+
+    Attributes:
+        run_id: A str value of the id of the run, a new one is created if not given
+        directory: A str value of the directory of all runs, defaults to '.flowrunner/runs'
+    """
+
+    run_id: str = None
+    directory: str = DEFAULT_RUN_DIRECTORY
+
+    def __post_init__(self):
+        """Post init to create a run id if not given"""
+        if self.run_id is None:
+            self.run_id = create_run_id()
+
+    @property
+    def run_directory(self) -> str:
+        """The directory of this run"""
+        return os.path.join(self.directory, self.run_id)
+
+    def _get_path(self, flow_name: str, node_name: str) -> str:
+        """Private method to get the path of the checkpoint of a node"""
+        return os.path.join(
+            self.run_directory, flow_name, f"{node_name}{CHECKPOINT_FILE_EXTENSION}"
+        )
+
+    def exists(self) -> bool:
+        """Method to check if there are checkpoints for this run
+
+        Returns:
+            A bool value, True if the run directory exists
+        """
+        return os.path.isdir(self.run_directory)
+
+    def load(self, flow_name: str, node_name: str) -> Optional[NodeResult]:
+        """Method to load the checkpoint of a node
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+
+        Returns:
+            node_result: A NodeResult if the node was completed in this run, otherwise None
+        """
+        node_result = read_pickle(self._get_path(flow_name, node_name))
+        if node_result is not None:
+            logger.debug(
+                "Restored %s.%s from run %s", flow_name, node_name, self.run_id
+            )
+        return node_result
+
+    def store(self, flow_name: str, node_name: str, node_result: NodeResult):
+        """Method to store the checkpoint of a completed node
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+            node_name: A str value of the name of the node
+            node_result: The NodeResult of the node
+
+        Returns:
+            None
+        """
+        if write_pickle(self._get_path(flow_name, node_name), node_result):
+            logger.debug(
+                "Checkpointed %s.%s in run %s", flow_name, node_name, self.run_id
+            )
+
+    def get_completed(self, flow_name: str) -> list:
+        """Method to get the names of the nodes completed in this run
+
+        Args:
+            flow_name: A str value of the name of the Flow class
+
+        Returns:
+            completed: A sorted list of str values of node names
+        """
+        flow_directory = os.path.join(self.run_directory, flow_name)
+        if not os.path.isdir(flow_directory):
+            return []
+        return sorted(
+            file_name[: -len(CHECKPOINT_FILE_EXTENSION)]
+            for file_name in os.listdir(flow_directory)
+            if file_name.endswith(CHECKPOINT_FILE_EXTENSION)
+        )
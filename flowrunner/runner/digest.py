@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Module for hashing the outputs of steps
+
+get_digest: A function to get a digest of a value that only depends on its content
+
+The digest is the same in every process and run, so it can be compared with the digest of the last run:
+- pandas DataFrames and Series: the column names, dtypes, index names and pandas.util.hash_pandas_object of the rows,
+  which hashes the values of each column without pickling them. Columns of values pandas cannot hash, eg. lists, are
+  pickled instead
+- numpy arrays: the dtype, the shape and the bytes of the array
+- str, bytes, int, float, bool and None: their type and value
+- lists, tuples, dicts and sets: their type and the digests of their items, the items of dicts and sets are sorted by
+  their digest so that their order does not matter
+- anything else: its pickle with protocol 4
+
+A value that cannot be hashed this way, eg. an object that cannot be pickled, has no digest and is always taken to
+have changed.
+"""
+import hashlib
+import pickle
+from typing import Optional
+
+from flowrunner.system.logger import logger
+
+DIGEST_SIZE = 16  # bytes, the hex digest is twice as long
+SCALAR_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+
+def _is_pandas(value, type_name: str) -> bool:
+    """Private function to check if a value is a pandas DataFrame or Series without importing pandas"""
+    return type(value).__name__ == type_name and type(value).__module__.startswith(
+        "pandas"
+    )
+
+
+def _is_ndarray(value) -> bool:
+    """Private function to check if a value is a numpy array without importing numpy"""
+    return type(value).__name__ == "ndarray" and type(value).__module__ == "numpy"
+
+
+def _hash_pandas(hasher, value):
+    """Private function to add a DataFrame or Series to a hasher
+
+    Raises:
+        TypeError: If a column has values that pandas cannot hash, eg. lists
+    """
+    from pandas.util import (  # pylint: disable=import-outside-toplevel
+        hash_pandas_object,
+    )
+
+    row_hashes = hash_pandas_object(value, index=True).to_numpy()
+    if _is_pandas(value, "DataFrame"):
+        header = (list(value.columns), [str(dtype) for dtype in value.dtypes])
+    else:
+        header = (value.name, str(value.dtype))
+    hasher.update(
+        repr((type(value).__name__, header, list(value.index.names))).encode("utf-8")
+    )
+    hasher.update(row_hashes.tobytes())
+
+
+def _hash_pickle(hasher, value):
+    """Private function to add the pickle of a value to a hasher
+
+    Raises:
+        pickle.PicklingError: If the value cannot be pickled
+    """
+    value_type = type(value)
+    hasher.update(
+        f"pickle:{value_type.__module__}.{value_type.__qualname__};".encode("utf-8")
+    )
+    hasher.update(pickle.dumps(value, protocol=4))
+
+
+def _update(hasher, value):
+    """Private function to add a value to a hasher
+
+    Raises:
+        TypeError: If the value cannot be hashed
+        pickle.PicklingError: If the value has to be pickled and cannot be
+    """
+    value_type = type(value)
+    if value_type in SCALAR_TYPES:
+        hasher.update(f"{value_type.__name__}:{value!r};".encode("utf-8"))
+    elif _is_pandas(value, "DataFrame") or _is_pandas(value, "Series"):
+        try:
+            _hash_pandas(hasher, value)
+        except TypeError:
+            _hash_pickle(hasher, value)
+    elif _is_ndarray(value) and value.dtype != object:
+        hasher.update(f"ndarray:{value.dtype.str}:{value.shape};".encode("utf-8"))
+        hasher.update(value.tobytes())  # in C order whatever the layout of the array
+    elif value_type in (list, tuple):
+        hasher.update(f"{value_type.__name__}:{len(value)};".encode("utf-8"))
+        for item in value:
+            _update(hasher, item)
+    elif value_type in (dict, set, frozenset):
+        items = value.items() if value_type is dict else value
+        digests = sorted(_get_digest(item) for item in items)
+        hasher.update(f"{value_type.__name__}:{len(digests)};".encode("utf-8"))
+        for digest in digests:
+            hasher.update(digest.encode("utf-8"))
+    else:
+        _hash_pickle(hasher, value)
+
+
+def _get_digest(value) -> str:
+    """Private function to get the digest of a value, raising if it cannot be hashed"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    _update(hasher, value)
+    return hasher.hexdigest()
+
+
+def get_digest(value) -> Optional[str]:
+    """Function to get a digest of a value that only depends on its content
+
+    Args:
+        value: Any object, eg. the output of a step
+
+    Returns:
+        digest: A str value of the hex digest, or None if the value cannot be hashed
+    """
+    try:
+        return _get_digest(value)
+    except (pickle.PicklingError, TypeError, AttributeError, ValueError) as error:
+        logger.debug("Could not hash %s: %s", type(value).__name__, error)
+        return None
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Module for profiling the steps of a Flow, each node on its own
+
+StepProfile: A class containing the sampled call stacks of a single node
+profile_node: A context manager to sample the call stacks of a step while it runs in the current thread
+
+While a profiled node runs, a sampler thread reads the call stack of the thread running it every interval and keeps
+only the frames from the step function down, so the runner, imports and other steps running at the same time are
+not mixed in. Each stack is weighted by the microseconds since the previous sample, which makes it a wall clock
+profile: a step waiting on I/O or sleeping shows the time in the line that waits. 'async def' steps are only sampled
+while they are running on the event loop, not while they are awaiting.
+
+The stacks are written in the collapsed stack format ('step;function;function microseconds' per line), one file per
+node and one for the whole Flow, which can be opened with https://www.speedscope.app or flamegraph.pl.
+"""
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import click
+
+DEFAULT_INTERVAL = 0.001  # seconds between samples
+
+
+@dataclass
+class StepProfile:
+    """A class containing the sampled call stacks of a single node
+
+    Attributes:
+        name: A str value of the name of the node
+        interval: A float value of the seconds between samples
+        stacks: A dict of {collapsed stack: microseconds}, a collapsed stack is the frames from the step function to
+            the sampled frame joined by ';'
+    """
+
+    name: str
+    interval: float = DEFAULT_INTERVAL
+    stacks: dict = field(default_factory=lambda: defaultdict(int), repr=False)
+
+    @property
+    def total_time(self) -> float:
+        """Seconds sampled in the node"""
+        return sum(self.stacks.values()) / 1_000_000
+
+    def get_hot_functions(self, top: int = 10) -> list:
+        """Method to get the functions the node spent the most time in
+
+        Args:
+            top: An int value of the number of functions to return
+
+        Returns:
+            hot_functions: A list of tuples of (function, self seconds, total seconds), by self seconds. Self time is
+                spent in the function itself, total time also includes the functions it called
+        """
+        self_times = defaultdict(int)
+        total_times = defaultdict(int)
+        for stack, microseconds in self.stacks.items():
+            frames = stack.split(";")
+            self_times[frames[-1]] += microseconds
+            # a recursive function is only counted once per stack
+            for frame in set(frames):
+                total_times[frame] += microseconds
+        hot_functions = sorted(self_times, key=self_times.get, reverse=True)[:top]
+        return [
+            (
+                function,
+                self_times[function] / 1_000_000,
+                total_times[function] / 1_000_000,
+            )
+            for function in hot_functions
+        ]
+
+    def to_collapsed(self, prefix: str = None) -> str:
+        """Method to convert the stacks to the collapsed stack format
+
+        Args:
+            prefix: An optional str value added as the root frame of every stack eg. the name of the Flow
+
+        Returns:
+            A str value with one 'frame;frame microseconds' line per stack
+        """
+        return "".join(
+            f"{prefix};{stack} {microseconds}\n"
+            if prefix
+            else f"{stack} {microseconds}\n"
+            for stack, microseconds in sorted(self.stacks.items())
+        )
+
+    def show(self, top: int = 10):
+        """Method to print the functions the node spent the most time in
+
+        Args:
+            top: An int value of the number of functions to print
+
+        Returns:
+            None
+        """
+        click.secho(f"{self.name}\n", fg="green")
+        total_time = self.total_time
+        for function, self_time, function_total_time in self.get_hot_functions(top):
+            share = self_time / total_time * 100 if total_time else 0
+            click.secho(
+                f"   {self_time:>8.3f}s {share:>5.1f}%   total={function_total_time:.3f}s   {function}",
+                fg="blue",
+            )
+        click.secho(f"\n   Sampled: {total_time:.3f}s\n\n", fg="bright_red")
+
+
+def _get_frame_label(code) -> str:
+    """Private function to get the label of a frame in a collapsed stack eg. 'load (flow.py:12)'"""
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _get_collapsed_stack(frame, step_code) -> str:
+    """Private function to get the collapsed stack of a frame, from the outermost call of the step function down
+
+    Args:
+        frame: The innermost frame of a thread
+        step_code: The code object of the step function
+
+    Returns:
+        A str value of the collapsed stack, or None if the step function is not on the stack
+    """
+    frames = []
+    step_position = None
+    while frame is not None:
+        frames.append(frame.f_code)
+        if frame.f_code is step_code:
+            # we keep going, a recursive step has to start at its outermost call
+            step_position = len(frames)
+        frame = frame.f_back
+    if step_position is None:
+        return None
+    return ";".join(_get_frame_label(code) for code in reversed(frames[:step_position]))
+
+
+def _sample(
+    step_profile: StepProfile, step_code, thread_id: int, stopped: threading.Event
+):
+    """Private function run by the sampler thread until stopped is set"""
+    last_sample = time.perf_counter()
+    while not stopped.wait(step_profile.interval):
+        frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+        now = time.perf_counter()
+        if frame is not None:
+            stack = _get_collapsed_stack(frame, step_code)
+            if stack is not None:
+                step_profile.stacks[stack] += int((now - last_sample) * 1_000_000)
+        del frame
+        last_sample = now
+
+
+@contextmanager
+def profile_node(name: str, function, interval: float = DEFAULT_INTERVAL):
+    """Context manager to sample the call stacks of a step while it runs in the current thread
+
+    Args:
+        name: A str value of the name of the node
+        function: The step function, the one decorated with @step is unwrapped to find the frames of the step
+        interval: A float value of the seconds between samples
+
+    Yields:
+        step_profile: A StepProfile, filled in while the block runs
+    """
+    step_profile = StepProfile(name=name, interval=interval)
+    stopped = threading.Event()
+    sampler = threading.Thread(
+        target=_sample,
+        args=(
+            step_profile,
+            inspect.unwrap(function).__code__,
+            threading.get_ident(),
+            stopped,
+        ),
+        name=f"flowrunner-profiler-{name}",
+        daemon=True,
+    )
+    sampler.start()
+    try:
+        yield step_profile
+    finally:
+        stopped.set()
+        sampler.join()
+
+
+def _get_profiles(run_report) -> list:
+    """Private function to get the profiles of a run in the order the nodes started"""
+    return [
+        run_report.profiles[node_report.name]
+        for node_report in run_report.nodes
+        if node_report.name in run_report.profiles
+    ]
+
+
+def save_profiles(run_report, directory: str) -> list:
+    """Function to write the profiles of a run in the collapsed stack format
+
+    We write '<directory>/<flow name>.folded' with the stacks of every node under the name of the Flow, and
+    '<directory>/<flow name>/<node name>.folded' for each node.
+
+    Args:
+        run_report: A RunReport with profiles
+        directory: A str value of the directory to write to
+
+    Returns:
+        paths: A list of str values of the files written
+    """
+    flow_directory = os.path.join(directory, run_report.flow_name)
+    os.makedirs(flow_directory, exist_ok=True)
+    paths = []
+    flow_path = os.path.join(directory, f"{run_report.flow_name}.folded")
+    with open(flow_path, mode="w", encoding="utf-8") as flow_file:
+        for step_profile in _get_profiles(run_report):
+            flow_file.write(step_profile.to_collapsed(prefix=run_report.flow_name))
+            node_path = os.path.join(flow_directory, f"{step_profile.name}.folded")
+            with open(node_path, mode="w", encoding="utf-8") as node_file:
+                node_file.write(step_profile.to_collapsed())
+            paths.append(node_path)
+    paths.append(flow_path)
+    return paths
+
+
+def show_profiles(run_report, top: int = 10):
+    """Function to print the functions each profiled node of a run spent the most time in
+
+    Args:
+        run_report: A RunReport with profiles
+        top: An int value of the number of functions to print for each node
+
+    Returns:
+        None
+    """
+    for step_profile in _get_profiles(run_report):
+        step_profile.show(top)
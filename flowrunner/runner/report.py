@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""Module for recording how long each node of a run took and the resources it used
+
+NodeReport: A class containing the timings and resource usage of a single node
+RunReport: A class containing the NodeReport of every node of a run, returned by BaseFlow.run
+
+What is recorded for each node:
+- wall_time: seconds from the start to the end of the node
+- cpu_time: CPU seconds used by the thread running the node, not recorded for 'async def' steps since they
+  share the event loop thread with every other step
+- peak_rss_delta: bytes the peak resident memory of the process grew by while the node ran. With threads the
+  process is shared, so this is also grown by nodes running at the same time
+- output_size: estimated bytes of the output of the node, see flowrunner.runner.store.get_size. The objects in object
+  columns of DataFrames are not walked, only their pointers are counted, so measuring every step stays cheap
+- start_time and end_time: seconds since the epoch
+- process_id and thread_name: the worker that ran the node
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import click
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+STATUS_COMPLETED = "completed"
+STATUS_RESTORED = "restored"
+STATUS_FAILED = "failed"
+
+
+def get_peak_rss() -> Optional[int]:
+    """Function to get the peak resident memory of the current process
+
+    Returns:
+        peak_rss: An int value of bytes, or None if it cannot be measured on this platform
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def format_size(size: Optional[int]) -> str:
+    """Function to format a number of bytes eg. '1.5 MB'
+
+    Args:
+        size: An int value of bytes or None
+
+    Returns:
+        A str value of the size, '-' if size is None
+    """
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"  # pragma: no cover
+
+
+@dataclass
+class NodeReport:
+    """A class containing the timings and resource usage of a single node
+
+    Attributes:
+        name: A str value of the name of the node
+        status: A str value of 'completed', 'restored' (from a cache or checkpoint) or 'failed'
+        start_time: A float value of seconds since the epoch when the node started
+        end_time: A float value of seconds since the epoch when the node ended
+        wall_time: A float value of seconds the node took
+        cpu_time: An optional float value of CPU seconds used by the node
+        peak_rss_delta: An optional int value of bytes the peak resident memory grew by
+        output_size: An optional int value of the estimated bytes of the output
+        process_id: An int value of the id of the process that ran the node
+        thread_name: A str value of the name of the thread that ran the node
+    """
+
+    name: str
+    status: str = STATUS_COMPLETED
+    start_time: float = None
+    end_time: float = None
+    wall_time: float = None
+    cpu_time: float = None
+    peak_rss_delta: int = None
+    output_size: int = None
+    process_id: int = None
+    thread_name: str = None
+
+
+@contextmanager
+def measure_node(name: str, cpu: bool = True):
+    """Context manager to measure a node, the NodeReport is filled in when the block exits
+
+    If the block raises, the status of the NodeReport is set to 'failed' and the exception is re-raised.
+
+    Args:
+        name: A str value of the name of the node
+        cpu: A bool value, True to measure the CPU time of the current thread
+
+    Yields:
+        node_report: A NodeReport, the block can set its status and output_size
+    """
+    node_report = NodeReport(
+        name=name,
+        start_time=time.time(),
+        process_id=os.getpid(),
+        thread_name=threading.current_thread().name,
+    )
+    start_counter = time.perf_counter()
+    start_cpu_time = time.thread_time()
+    start_peak_rss = get_peak_rss()
+    try:
+        yield node_report
+    except BaseException:
+        node_report.status = STATUS_FAILED
+        raise
+    finally:
+        node_report.wall_time = time.perf_counter() - start_counter
+        node_report.end_time = node_report.start_time + node_report.wall_time
+        if cpu:
+            node_report.cpu_time = time.thread_time() - start_cpu_time
+        if start_peak_rss is not None:
+            node_report.peak_rss_delta = get_peak_rss() - start_peak_rss
+
+
+def call_measured(node_report: NodeReport, function, *args):
+    """Function to call a function and record its CPU time and thread in a NodeReport
+
+    This is used for steps run in a different thread than the one measuring the node, eg. the default executor
+    of an event loop.
+
+    Args:
+        node_report: The NodeReport of the node
+        function: A callable
+        args: The arguments of the callable
+
+    Returns:
+        output: The return value of the function
+    """
+    node_report.thread_name = threading.current_thread().name
+    start_cpu_time = time.thread_time()
+    try:
+        return function(*args)
+    finally:
+        node_report.cpu_time = time.thread_time() - start_cpu_time
+
+
+@dataclass
+class RunReport:
+    """A class containing the NodeReport of every node of a run
+
+    Attributes:
+        flow_name: A str value of the name of the Flow class
+        start_time: A float value of seconds since the epoch when the run started
+        end_time: A float value of seconds since the epoch when the run ended
+        nodes: A list of NodeReport, in the order the nodes started
+        profiles: A dict of {node name: StepProfile} of the profiled nodes, see flowrunner.runner.profiler. They
+            are not part of to_dict, write them with flowrunner.runner.profiler.save_profiles
+    """
+
+    flow_name: str
+    start_time: float = None
+    end_time: float = None
+    nodes: list = field(default_factory=lambda: [], repr=False)
+    profiles: dict = field(default_factory=lambda: {}, repr=False)
+
+    def __post_init__(self):
+        """Post init to set the start time and a lock for adding nodes from different threads"""
+        if self.start_time is None:
+            self.start_time = time.time()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """Method to pickle the report without its lock, eg. to return it from a worker process"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        """Method to unpickle the report with a new lock"""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def wall_time(self) -> Optional[float]:
+        """Seconds from the start to the end of the run"""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def add(self, node_report: NodeReport):
+        """Method to add the NodeReport of a node
+
+        Args:
+            node_report: A NodeReport
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.nodes.append(node_report)
+
+    def finish(self):
+        """Method to set the end time of the run
+
+        Returns:
+            None
+        """
+        self.end_time = time.time()
+        self.nodes.sort(key=lambda node_report: node_report.start_time)
+
+    def get_node(self, name: str) -> Optional[NodeReport]:
+        """Method to get the NodeReport of a node
+
+        Args:
+            name: A str value of the name of the node
+
+        Returns:
+            node_report: The NodeReport of the node, or None if it was not run
+        """
+        return next(
+            (node_report for node_report in self.nodes if node_report.name == name),
+            None,
+        )
+
+    def to_dict(self) -> dict:
+        """Method to convert the report to a dict
+
+        Returns:
+            A dict of the report with a list of dicts for the nodes
+        """
+        return {
+            "flow_name": self.flow_name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "wall_time": self.wall_time,
+            "nodes": [asdict(node_report) for node_report in self.nodes],
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict):
+        """Class method to create a report from a dict returned by to_dict
+
+        Args:
+            content: A dict of the report
+
+        Returns:
+            run_report: A RunReport
+        """
+        return cls(
+            flow_name=content["flow_name"],
+            start_time=content["start_time"],
+            end_time=content["end_time"],
+            nodes=[NodeReport(**node_content) for node_content in content["nodes"]],
+        )
+
+    def to_json(self, path: str = None) -> str:
+        """Method to export the report as JSON
+
+        Args:
+            path: An optional str value of a file to write the JSON to
+
+        Returns:
+            A str value of the JSON
+        """
+        content = json.dumps(self.to_dict(), indent=4)
+        if path:
+            with open(path, mode="w", encoding="utf-8") as json_file:
+                json_file.write(content)
+        return content
+
+    def show(self):
+        """Method to print the report, one line per node in the order they started
+
+        Returns:
+            None
+        """
+        click.secho(f"{self.flow_name}\n", fg="green")
+        for node_report in self.nodes:
+            cpu_time = (
+                "-" if node_report.cpu_time is None else f"{node_report.cpu_time:.3f}s"
+            )
+            click.secho(
+                f"{node_report.name:<30} {node_report.wall_time:>9.3f}s",
+                fg="blue",
+                nl=False,
+            )
+            click.secho(
+                f"   cpu={cpu_time}"
+                f"   rss=+{format_size(node_report.peak_rss_delta)}"
+                f"   output={format_size(node_report.output_size)}"
+                f"   worker={node_report.process_id}/{node_report.thread_name}",
+            )
+            if node_report.status != STATUS_COMPLETED:
+                click.secho(f"   {node_report.status}", fg="bright_red")
+        if self.wall_time is not None:
+            click.secho(f"\nTotal: {self.wall_time:.3f}s\n", fg="green")
+
+
+def save_reports(run_reports: list, path: str):
+    """Function to write the reports of several runs to a JSON file
+
+    Args:
+        run_reports: A list of RunReport
+        path: A str value of the path of the file
+
+    Returns:
+        None
+    """
+    with open(path, mode="w", encoding="utf-8") as json_file:
+        json.dump(
+            [run_report.to_dict() for run_report in run_reports], json_file, indent=4
+        )
+
+
+def load_reports(path: str) -> dict:
+    """Function to read the reports written by save_reports or RunReport.to_json
+
+    Args:
+        path: A str value of the path of the file
+
+    Returns:
+        run_reports: A dict of {flow name: RunReport}
+    """
+    with open(path, encoding="utf-8") as json_file:
+        content = json.load(json_file)
+    if isinstance(content, dict):  # a single report
+        content = [content]
+    return {
+        report_content["flow_name"]: RunReport.from_dict(report_content)
+        for report_content in content
+    }
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Module for data stores that can be used as BaseFlow.data_store
+
+SpillableDataStore: A dict like data store with a memory budget, that spills least recently used outputs to disk
+
+Any MutableMapping can be passed as data_store to a Flow, eg. ExamplePandas(data_store=SpillableDataStore("2GB")).
+"""
+import importlib.util
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import count
+from typing import Union
+
+from flowrunner.system.logger import logger
+
+SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1024,
+    "MB": 1024**2,
+    "GB": 1024**3,
+    "TB": 1024**4,
+}
+
+
+def parse_size(size: Union[int, str]) -> int:
+    """Function to parse a size in bytes
+
+    Args:
+        size: An int value of bytes or a str value with a unit eg. '512MB', '2 GB'
+
+    Returns:
+        size: An int value of bytes
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", size.upper())
+    if not match:
+        raise ValueError(f"Cannot parse size '{size}', expected eg. '512MB' or '2GB'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def get_size(value, deep: bool = False) -> int:
+    """Function to estimate the memory used by a value
+
+    We use the memory usage of pandas DataFrames and Series, the nbytes of numpy arrays and
+    sys.getsizeof for anything else
+
+    Args:
+        value: Any object
+        deep: A bool value, True to add the memory of the objects in object columns of DataFrames and Series,
+            which walks every one of them. Defaults to False where only their pointers are counted
+
+    Returns:
+        size: An int value of bytes
+    """
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):  # DataFrame
+        return int(value.memory_usage(index=True, deep=deep).sum())
+    if hasattr(value, "memory_usage") and hasattr(value, "index"):  # Series
+        return int(value.memory_usage(index=True, deep=deep))
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):  # numpy array
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def _is_dataframe(value) -> bool:
+    """Private function to check if a value is a pandas DataFrame without importing pandas"""
+    return type(value).__name__ == "DataFrame" and type(value).__module__.startswith(
+        "pandas"
+    )
+
+
+def _is_ndarray(value) -> bool:
+    """Private function to check if a value is a numpy array without importing numpy"""
+    return type(value).__name__ == "ndarray" and type(value).__module__ == "numpy"
+
+
+class SpillableDataStore(MutableMapping):
+    """A dict like data store with a memory budget, that spills least recently used outputs to disk
+
+    When the estimated size of the outputs held in memory is more than memory_budget, we move the least recently
+    used outputs to files in a local directory and load them back when they are accessed:
+    - pandas DataFrames are written as parquet if pyarrow is installed and loaded back into memory
+    - numpy arrays are written as .npy and returned memory mapped (copy on write), so they stay on disk
+    - anything else is pickled and loaded back into memory
+
+    The most recently written output always stays in memory, even if it is bigger than the budget.
+
+    Attributes:
+        memory_budget: An int value of the maximum bytes of outputs to hold in memory
+        directory: A str value of the directory for spilled outputs, a temporary directory that is removed
+            with the store by default
+    """
+
+    def __init__(self, memory_budget: Union[int, str], directory: str = None):
+        self.memory_budget = parse_size(memory_budget)
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="flowrunner-spill-")
+            # remove the temporary directory once the store is garbage collected
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, directory, ignore_errors=True
+            )
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._keys = {}  # all the keys, in the order they were first written
+        self._memory = OrderedDict()  # key: value, least recently used first
+        self._sizes = {}  # key: size of the value in memory
+        # sum of self._sizes, kept up to date so spilling does not sum it again
+        self._memory_size = 0
+        self._spilled = {}  # key: (path, file format)
+        self._file_numbers = count()
+
+    @property
+    def memory_size(self) -> int:
+        """The estimated bytes of outputs held in memory"""
+        return self._memory_size
+
+    @property
+    def spilled_keys(self) -> list:
+        """The keys of the outputs spilled to disk"""
+        return list(self._spilled)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._remove_spilled(key)
+            self._keys.setdefault(key, None)
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            self._set_size(key, get_size(value, deep=True))
+            self._spill(keep=key)
+
+    def __getitem__(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if key not in self._spilled:
+                raise KeyError(key)
+            path, file_format = self._spilled[key]
+            if file_format == "npy":
+                import numpy as np  # pylint: disable=import-outside-toplevel
+
+                return np.load(path, mmap_mode="c")
+            value = self._load(path, file_format)
+            # the value is back in memory, so we keep it there until it is spilled again
+            self._remove_spilled(key)
+            self._memory[key] = value
+            self._set_size(key, get_size(value, deep=True))
+            self._spill(keep=key)
+            return value
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._keys:
+                raise KeyError(key)
+            del self._keys[key]
+            self._memory.pop(key, None)
+            self._pop_size(key)
+            self._remove_spilled(key)
+
+    def __contains__(self, key):
+        # we override this so that checking a key does not load a spilled output
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return (
+            f"SpillableDataStore(keys={list(self._keys)}, spilled={self.spilled_keys}, "
+            f"memory_size={self.memory_size}, memory_budget={self.memory_budget})"
+        )
+
+    def _set_size(self, key, size: int):
+        """Private method to set the size of a value in memory and update the total"""
+        self._memory_size += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _pop_size(self, key) -> int:
+        """Private method to remove the size of a value that left memory and update the total"""
+        size = self._sizes.pop(key, 0)
+        self._memory_size -= size
+        return size
+
+    def _spill(self, keep):
+        """Private method to spill least recently used outputs until the store fits in the memory budget
+
+        Args:
+            keep: The key that was just written or read, it is never spilled
+        """
+        while self.memory_size > self.memory_budget:
+            key = next((key for key in self._memory if key != keep), None)
+            if key is None:  # only the key to keep is left
+                return
+            value = self._memory.pop(key)
+            size = self._pop_size(key)
+            self._spilled[key] = self._dump(key, value)
+            logger.debug("Spilled %s (%s bytes) to disk", key, size)
+
+    def _dump(self, key, value) -> tuple:
+        """Private method to write a value to a file in the spill directory
+
+        Args:
+            key: The key of the value
+            value: The value to write
+
+        Returns:
+            A tuple of (path, file format)
+        """
+        file_name = os.path.join(self.directory, str(next(self._file_numbers)))
+        if _is_dataframe(value) and importlib.util.find_spec("pyarrow"):
+            path = f"{file_name}.parquet"
+            try:
+                value.to_parquet(path)
+                return (path, "parquet")
+            except (ValueError, TypeError) as error:
+                # eg. column names that are not str
+                logger.debug("Could not write %s as parquet: %s", key, error)
+        if _is_ndarray(value) and value.dtype != object:
+            import numpy as np  # pylint: disable=import-outside-toplevel
+
+            path = f"{file_name}.npy"
+            np.save(path, value, allow_pickle=False)
+            return (path, "npy")
+        path = f"{file_name}.pkl"
+        with open(path, mode="wb") as spill_file:
+            pickle.dump(value, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        return (path, "pickle")
+
+    def _load(self, path: str, file_format: str):
+        """Private method to load a value from a file in the spill directory"""
+        if file_format == "parquet":
+            import pandas as pd  # pylint: disable=import-outside-toplevel
+
+            return pd.read_parquet(path)
+        with open(path, mode="rb") as spill_file:
+            return pickle.load(spill_file)
+
+    def _remove_spilled(self, key):
+        """Private method to remove the spilled file of a key, if any"""
+        spilled = self._spilled.pop(key, None)
+        if spilled is not None:
+            try:
+                os.remove(spilled[0])
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""Module for passing large step outputs between processes through shared memory
+
+SharedArrayHandle: A class describing a numpy array published in a shared memory segment
+SharedFrameHandle: A class describing a pandas DataFrame published in a shared memory segment
+SharedMemoryTransport: A class that publishes the outputs of a run once and owns their segments
+
+Instead of pickling a large output every time it is shipped to a worker process, it is copied once into a
+multiprocessing.shared_memory segment and only a small handle is pickled. Workers map the segment and get
+read-only numpy arrays or DataFrames backed by it, without copying the data. What can be shared:
+- numpy arrays of a fixed size dtype (bool, numbers, datetime64, timedelta64)
+- DataFrames where every column has such a dtype, the index is pickled along with the handle
+Anything else, and outputs smaller than min_size, are pickled as usual.
+"""
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+
+from flowrunner.system.logger import logger
+
+DEFAULT_MIN_SIZE = 1024**2  # 1 MiB
+SHAREABLE_DTYPE_KINDS = "biufcmM"
+ALIGNMENT = 64  # bytes, the start of each column in a segment is aligned to this
+
+# segments of a worker process that could not be closed yet because arrays of a step still use them
+_open_segments = []
+
+
+@dataclass
+class SharedArrayHandle:
+    """A class describing a numpy array published in a shared memory segment
+
+    Attributes:
+        name: A str value of the name of the shared memory segment
+        shape: A tuple of the shape of the array
+        dtype: A str value of the dtype of the array
+    """
+
+    name: str
+    shape: tuple
+    dtype: str
+
+
+@dataclass
+class SharedFrameHandle:
+    """A class describing a pandas DataFrame published in a shared memory segment
+
+    Each column is stored one after another in the segment, starting at the offsets in the handle.
+
+    Attributes:
+        name: A str value of the name of the shared memory segment
+        length: An int value of the number of rows
+        columns: The columns of the DataFrame, a pandas Index
+        index: The index of the DataFrame, a pandas Index
+        dtypes: A list of str values of the dtype of each column
+        offsets: A list of int values of the offset in bytes of each column
+    """
+
+    name: str
+    length: int
+    columns: object
+    index: object
+    dtypes: list = field(default_factory=lambda: [])
+    offsets: list = field(default_factory=lambda: [])
+
+
+def _is_shareable_array(value) -> bool:
+    """Private function to check if a value is a numpy array that can be shared"""
+    return (
+        type(value).__module__ == "numpy"
+        and type(value).__name__ == "ndarray"
+        and value.dtype.kind in SHAREABLE_DTYPE_KINDS
+    )
+
+
+def _is_shareable_frame(value) -> bool:
+    """Private function to check if a value is a DataFrame where every column can be shared"""
+    if not (
+        type(value).__name__ == "DataFrame"
+        and type(value).__module__.startswith("pandas")
+    ):
+        return False
+    # extension dtypes eg. 'category' or 'string' are not numpy dtypes and have no 'kind' we can share
+    return all(
+        type(dtype).__module__.startswith("numpy")
+        and dtype.kind in SHAREABLE_DTYPE_KINDS
+        for dtype in value.dtypes
+    )
+
+
+def get_shared_size(value) -> int:
+    """Function to get the number of bytes a value takes in shared memory
+
+    Args:
+        value: Any object
+
+    Returns:
+        size: An int value of bytes, 0 if the value cannot be shared
+    """
+    if _is_shareable_array(value):
+        return int(value.nbytes)
+    if _is_shareable_frame(value):
+        return sum(
+            -(-dtype.itemsize * len(value) // ALIGNMENT) * ALIGNMENT
+            for dtype in value.dtypes
+        )
+    return 0
+
+
+def publish(value, min_size: int = DEFAULT_MIN_SIZE):
+    """Function to copy a value into a new shared memory segment
+
+    The caller owns the segment and has to unlink it once it is not needed, see SharedMemoryTransport.
+
+    Args:
+        value: Any object
+        min_size: An int value of the minimum number of bytes for a value to be shared
+
+    Returns:
+        A tuple of (handle, segment) if the value was published, otherwise (value, None)
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    size = get_shared_size(value)
+    if size == 0 or size < min_size:
+        return value, None
+    segment = shared_memory.SharedMemory(create=True, size=size)
+    if _is_shareable_array(value):
+        handle = SharedArrayHandle(
+            name=segment.name, shape=value.shape, dtype=value.dtype.str
+        )
+        np.copyto(np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf), value)
+        return handle, segment
+
+    handle = SharedFrameHandle(
+        name=segment.name, length=len(value), columns=value.columns, index=value.index
+    )
+    offset = 0
+    for position, dtype in enumerate(value.dtypes):
+        handle.dtypes.append(dtype.str)
+        handle.offsets.append(offset)
+        np.copyto(
+            np.ndarray(len(value), dtype=dtype, buffer=segment.buf, offset=offset),
+            value.iloc[:, position].to_numpy(),
+        )
+        offset += -(-dtype.itemsize * len(value) // ALIGNMENT) * ALIGNMENT
+    return handle, segment
+
+
+def attach(handle):
+    """Function to map a published value from its shared memory segment, without copying it
+
+    The returned arrays are read-only. The segment has to stay open as long as they are used.
+
+    Args:
+        handle: A SharedArrayHandle or SharedFrameHandle, any other value is returned as it is
+
+    Returns:
+        A tuple of (value, segment), segment is None if the value was not a handle
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(handle, (SharedArrayHandle, SharedFrameHandle)):
+        return handle, None
+    segment = shared_memory.SharedMemory(name=handle.name)
+    if isinstance(handle, SharedArrayHandle):
+        array = np.ndarray(handle.shape, dtype=handle.dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        return array, segment
+
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    arrays = {}
+    for position, (dtype, offset) in enumerate(zip(handle.dtypes, handle.offsets)):
+        array = np.ndarray(
+            handle.length, dtype=dtype, buffer=segment.buf, offset=offset
+        )
+        array.flags.writeable = False
+        arrays[position] = array
+    frame = pd.DataFrame(arrays, index=handle.index, copy=False)
+    frame.columns = handle.columns
+    return frame, segment
+
+
+def close_segments(segments: list):
+    """Function to close the segments mapped by a worker process
+
+    A segment cannot be closed while arrays backed by it are still alive, eg. if a step kept one in an
+    attribute. We keep those and try again on the next call.
+
+    Args:
+        segments: A list of SharedMemory instances
+
+    Returns:
+        None
+    """
+    pending = _open_segments + [segment for segment in segments if segment is not None]
+    _open_segments.clear()
+    for segment in pending:
+        try:
+            segment.close()
+        except BufferError:
+            _open_segments.append(segment)
+
+
+@dataclass
+class SharedMemoryTransport:
+    """A class that publishes the outputs of a run once and owns their segments
+
+    The runner publishes a data_store entry the first time a worker needs it and reuses the handle for every
+    other worker. Outputs published by workers are adopted: the parent maps them without copying and becomes
+    the owner of their segment. When the run is done, close copies the outputs still in data_store that are
+    backed by a segment into regular memory and unlinks every segment.
+
+    Attributes:
+        min_size: An int value of the minimum number of bytes for an output to be shared, defaults to 1 MiB
+    """
+
+    min_size: int = DEFAULT_MIN_SIZE
+
+    def __post_init__(self):
+        """Post init to start the resource tracker before any worker is started, so that segments created by
+        workers are tracked by the same process and are not removed when a worker exits
+        """
+        resource_tracker.ensure_running()
+        self.segments = {}  # segment name: SharedMemory
+        self.handles = {}  # node name: handle
+        self.mapped = {}  # node name: weak reference to the value backed by a segment
+
+    def publish(self, node_name: str, value):
+        """Method to get what to ship to a worker for a data_store entry
+
+        Args:
+            node_name: A str value of the name of the node
+            value: The output of the node
+
+        Returns:
+            A handle if the value is in shared memory, otherwise the value itself
+        """
+        if node_name in self.handles:
+            return self.handles[node_name]
+        handle, segment = publish(value, self.min_size)
+        if segment is None:
+            return value
+        logger.debug("Published %s in shared memory %s", node_name, segment.name)
+        self.segments[segment.name] = segment
+        self.handles[node_name] = handle
+        return handle
+
+    def adopt(self, node_name: str, output):
+        """Method to map an output published by a worker and take over its segment
+
+        Args:
+            node_name: A str value of the name of the node
+            output: The output sent back by the worker, a handle or any other value
+
+        Returns:
+            value: The output mapped from shared memory, or the output itself if it is not a handle
+        """
+        value, segment = attach(output)
+        if segment is None:
+            return value
+        self.segments[segment.name] = segment
+        self.handles[node_name] = output
+        # a weak reference, so an output released from data_store during the run is not kept alive here
+        self.mapped[node_name] = weakref.ref(value)
+        return value
+
+    def close(self, data_store):
+        """Method to release every segment of the run
+
+        Args:
+            data_store: The data_store of the Flow instance, outputs backed by a segment are replaced by a copy
+
+        Returns:
+            None
+        """
+        for node_name, reference in self.mapped.items():
+            value = reference()
+            if node_name in data_store and data_store[node_name] is value is not None:
+                data_store[node_name] = value.copy()
+            del value
+        self.mapped.clear()
+        self.handles.clear()
+        for segment in self.segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                logger.warning(
+                    "Shared memory %s is still in use, it is freed once it is not",
+                    segment.name,
+                )
+            segment.unlink()
+        self.segments.clear()
@@ -1,14 +1,42 @@
 # -*- coding: utf-8 -*-
 """
 Module for logging
+
+The logger of flowrunner logs everything to the terminal with coloredlogs, which is imported when the first message
+is logged. configure_logging switches it to one of the LOG_PROFILES:
+- development: DEBUG and above, colored, the default
+- production: WARNING and above, plain text
+- json: INFO and above, one JSON object per line
+
+Unless use_queue is False, the messages are put on a queue by a QueueHandler and written to the terminal or file by
+a QueueListener thread, so the threads running steps never wait on I/O. A message is formatted in the listener
+thread too, unless its arguments can change after it is logged, see LazyQueueHandler. Without configure_logging,
+the QueueListener thread is started by the first message, so a process that does not log never starts it. The
+profile can also be set with the FLOWRUNNER_LOG_PROFILE environment variable or
+'python -m flowrunner --log-profile production ...'.
 """
+import atexit
+import json
 import logging
-
-import coloredlogs  # pylint: disable=import-error
+import os
+import queue
+import socket
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_FORMAT = (
     "%(levelname)s | %(message)s | %(asctime)s | %(hostname)s | %(name)s | %(process)d "
 )
+TEXT_LOG_FORMAT = "%(levelname)s | %(message)s | %(asctime)s | %(name)s | %(process)d"
+
+LOG_PROFILES = {
+    "development": {"level": "DEBUG", "formatter": "colored"},
+    "production": {"level": "WARNING", "formatter": "text"},
+    "json": {"level": "INFO", "formatter": "json"},
+}
+LOG_PROFILE_VARIABLE = "FLOWRUNNER_LOG_PROFILE"
+
+# arguments of these types cannot change after a message is logged, so the message can be formatted later
+IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
 
 # Create a logger object.
 logger = logging.getLogger(__name__)
@@ -21,7 +49,228 @@ logger = logging.getLogger(__name__)
 # specific logger object to the install() function. In this case only log
 # messages originating from that logger will show up on the terminal.
 
-coloredlogs.install(fmt=LOG_FORMAT, level="DEBUG", logger=logger)
+_listener = None  # the QueueListener of the current configuration, if it uses a queue
+
+
+class DeferredColoredLogsHandler(logging.Handler):
+    """A handler that switches our logger to coloredlogs on a QueueListener thread when the first message is logged
+
+    Importing coloredlogs takes a while and the thread is only needed once there is something to log, so we only
+    pay for them then rather than on 'import flowrunner'. The message that triggered the switch, and every message
+    after it, are put on the queue.
+    """
+
+    def emit(self, record: logging.LogRecord):
+        """Method to put a LazyQueueHandler in place of this handler and pass the record on to it
+
+        Handler.handle holds the lock of this handler, so only one thread starts the QueueListener
+
+        Args:
+            record: The LogRecord to log
+
+        Returns:
+            None
+        """
+        # another thread may have switched the logger while we waited for the lock
+        if self in logger.handlers:
+            logger.removeHandler(self)
+            _start_listener(_get_handler("colored"))
+        for handler in logger.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """A formatter writing each message as a JSON object on a single line
+
+    The keys are time, level, logger, message, hostname, process and thread, and exception if there is one
+    """
+
+    def __init__(self):
+        """Init to look up the hostname once rather than for every message"""
+        super().__init__()
+        self.hostname = socket.gethostname()
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Method to format a record as JSON
+
+        Args:
+            record: The LogRecord to format
+
+        Returns:
+            A str value of the JSON object
+        """
+        content = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "hostname": self.hostname,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            content["exception"] = self.formatException(record.exc_info)
+        return json.dumps(content, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """A QueueHandler that leaves the formatting of a message to the QueueListener thread
+
+    QueueHandler formats every message in the thread that logs it, which is what we want to keep out of the threads
+    running steps. The queue is only read in this process, so records do not have to be pickled. We still format a
+    message right away if any of its arguments is not a str, number, bool, bytes or None, as it could be changed by
+    the time the listener formats it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Method to prepare a record for the queue
+
+        Args:
+            record: The LogRecord to enqueue
+
+        Returns:
+            record: The same LogRecord, with the message merged with its arguments only if they can change
+        """
+        if record.args and not (
+            isinstance(record.args, tuple)
+            and all(isinstance(arg, IMMUTABLE_TYPES) for arg in record.args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def _get_handler(formatter: str, filename: str = None) -> logging.Handler:
+    """Private function to create the handler writing the messages
+
+    Args:
+        formatter: A str value of 'colored', 'text' or 'json'
+        filename: An optional str value of a file to append the messages to, colored messages are written as text
+
+    Returns:
+        handler: A logging.Handler
+    """
+    if filename:
+        handler = logging.FileHandler(filename, encoding="utf-8")
+    elif formatter == "colored":
+        import coloredlogs  # pylint: disable=import-error,import-outside-toplevel
+
+        handler = coloredlogs.StandardErrorHandler()
+        # like coloredlogs.install, we only use colors if the terminal supports them
+        handler.setFormatter(
+            coloredlogs.ColoredFormatter(fmt=LOG_FORMAT)
+            if coloredlogs.terminal_supports_colors(handler.stream)
+            else logging.Formatter(LOG_FORMAT)
+        )
+        coloredlogs.HostNameFilter.install(handler=handler, fmt=LOG_FORMAT)
+        return handler
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(
+        JsonFormatter() if formatter == "json" else logging.Formatter(TEXT_LOG_FORMAT)
+    )
+    return handler
+
+
+def _write_directly():
+    """Private function to replace the QueueHandler on the logger by the handlers of the QueueListener"""
+    global _listener  # pylint: disable=global-statement
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        logger.addHandler(handler)
+    _listener = None
+
+
+def stop_logging():
+    """Function to write the messages left on the queue and stop the QueueListener thread
+
+    After this the messages are written by the thread that logs them, until configure_logging is called again.
+    It is called when the interpreter exits.
+
+    Returns:
+        None
+    """
+    if _listener is None:
+        return
+    _listener.stop()
+    _write_directly()
+
+
+def _start_listener(handler: logging.Handler):
+    """Private function to write the messages of the logger with a handler from a QueueListener thread
+
+    Args:
+        handler: The logging.Handler writing the messages
+
+    Returns:
+        None
+    """
+    global _listener  # pylint: disable=global-statement
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    logger.addHandler(LazyQueueHandler(log_queue))
+
+
+def configure_logging(
+    profile: str = "development",
+    level: str = None,
+    filename: str = None,
+    use_queue: bool = True,
+):
+    """Function to configure the logger of flowrunner with one of the LOG_PROFILES
+
+    Args:
+        profile: A str value of 'development', 'production' or 'json', defaults to 'development'
+        level: An optional str value of the level to log at eg. 'INFO', defaults to the level of the profile
+        filename: An optional str value of a file to append the messages to instead of the terminal
+        use_queue: A bool value, True to write the messages from a QueueListener thread, defaults to True
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the profile is not one of LOG_PROFILES
+    """
+    if profile not in LOG_PROFILES:
+        raise ValueError(
+            f"profile can only be one of {list(LOG_PROFILES)}, got '{profile}'"
+        )
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    handler = _get_handler(LOG_PROFILES[profile]["formatter"], filename=filename)
+    if use_queue:
+        _start_listener(handler)
+    else:
+        logger.addHandler(handler)
+    logger.setLevel(level or LOG_PROFILES[profile]["level"])
+
+
+def _after_fork_in_child():
+    """Private function to write the messages of a forked worker process in the worker itself
+
+    The QueueListener thread is not copied into a forked process, so a worker would put messages on a queue
+    that nobody reads
+    """
+    if _listener is not None:
+        _write_directly()
+
+
+if hasattr(os, "register_at_fork"):  # not available on Windows, which does not fork
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(stop_logging)
+
+if os.environ.get(LOG_PROFILE_VARIABLE):
+    configure_logging(os.environ[LOG_PROFILE_VARIABLE])
+else:
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(DeferredColoredLogsHandler())
 
 # suppress the py4j logger if its there
 py4jlogger = logging.getLogger("py4j")
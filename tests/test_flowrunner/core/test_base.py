@@ -405,3 +405,87 @@ def test_bad_flows_node_errors(flow, expectation):
         graph_options = GraphOptions(base_flow=flow)
         print(graph_options)
         graph = Graph(graph_options=graph_options)
+
+
+class UnequalPathsFlowExample(BaseFlow):
+    """Non cyclic flow, method_4 can be reached by paths of different lengths"""
+
+    @start
+    @step(next=["method_2", "method_3_a"])
+    def method_1(self):
+        return None
+
+    @step(next=["method_4"])
+    def method_2(self):
+        return None
+
+    @step(next=["method_3_b"])
+    def method_3_a(self):
+        return None
+
+    @step(next=["method_4"])
+    def method_3_b(self):
+        return None
+
+    @end
+    @step
+    def method_4(self):
+        return None
+
+
+def test_graph_longest_path_levels():
+    """Test to make sure a node reachable by paths of different lengths is placed
+    once, at its longest path depth, and the order in each level is the order of definition
+    """
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    assert [[node.name for node in level] for level in graph.levels] == [
+        ["method_1"],
+        ["method_2", "method_3_a"],
+        ["method_3_b"],
+        ["method_4"],
+    ]
+
+
+def test_graph_get_upstream():
+    """Test to check the nodes upstream of a node"""
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    assert graph.get_upstream(["method_3_b"]) == {"method_1", "method_3_a"}
+    assert graph.get_upstream(["method_1"]) == set()
+
+
+@pytest.mark.parametrize(
+    "durations, expected",
+    [
+        (
+            {
+                "method_1": 1,
+                "method_2": 5,
+                "method_3_a": 1,
+                "method_3_b": 1,
+                "method_4": 1,
+            },
+            ["method_1", "method_2", "method_4"],
+        ),
+        (
+            {
+                "method_1": 1,
+                "method_2": 1,
+                "method_3_a": 1,
+                "method_3_b": 1,
+                "method_4": 1,
+            },
+            ["method_1", "method_3_a", "method_3_b", "method_4"],
+        ),
+    ],
+)
+def test_graph_get_critical_path(durations, expected):
+    """Test to check that the critical path is the slowest path through the 'next' edges"""
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    assert graph.get_critical_path(durations) == expected
+
+
+def test_graph_get_downstream():
+    """Test to check the nodes downstream of a node"""
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    assert graph.get_downstream(["method_3_a"]) == {"method_3_b", "method_4"}
+    assert graph.get_downstream(["method_4"]) == set()
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import inspect
+
 import pytest
 
-from flowrunner.core.decorators import Step
+from flowrunner.core.decorators import Step, step
 from flowrunner.runner.flow import BaseFlow
 from tests.test_flowrunner.core.test_base import example_node_flow
 
@@ -48,3 +51,14 @@ class TestDecorators:
     def test_step_class(self, example_decorator_new_step_class):
         """Test to check the new 'Step' class"""
         assert example_decorator_new_step_class.is_step == True
+
+    def test_async_step(self):
+        """Test to check that 'async def' steps stay coroutine functions"""
+
+        @step(next="method_2")
+        async def method_1(self):
+            return 1
+
+        assert method_1.is_async == True
+        assert inspect.iscoroutinefunction(method_1)
+        assert asyncio.run(method_1(None)) == 1
@@ -12,6 +12,7 @@ from flowrunner.core.base import Graph, GraphOptions
 from flowrunner.core.decorators import end, start, step
 from flowrunner.core.helpers import DAGGenerator, GraphValidator
 from flowrunner.runner.flow import BaseFlow
+from flowrunner.runner.report import NodeReport, RunReport
 from flowrunner.system.exceptions import InvalidFlowException
 from tests.test_flowrunner.core.test_base import NonCyclicFlowExample
 from tests.test_flowrunner.runner.test_flow import ExamplePandas
@@ -382,3 +383,62 @@ def test_choose_dag(
         # there is a bug in the FlowRunner class where order between functions at same level is misplaced
     ):
         pytest.approx(actual_line_non_descrip, expected_line_non_descrip)
+
+
+def test_create_timed_dag():
+    """Test to check that a DAG with a RunReport labels, colors and highlights the critical path"""
+    flow_instance = DescriptionExampleFlow()
+    run_report = RunReport(
+        flow_name="DescriptionExampleFlow",
+        start_time=0,
+        end_time=4,
+        nodes=[
+            NodeReport(name="method1", wall_time=1),
+            NodeReport(name="method2", wall_time=2),
+            NodeReport(name="method3", wall_time=0.5),
+            NodeReport(name="method4", wall_time=0.5),
+        ],
+    )
+    mermaid_js_string = DAGGenerator()._create_descriptive_dag(
+        flow_instance, description=False, run_report=run_report
+    )
+
+    assert 'subgraph step-method2 ["method2: 2.00s (50%)"]' in mermaid_js_string
+    assert "style method2 fill:" in mermaid_js_string
+    assert "style step-method2 stroke:#d62728" in mermaid_js_string
+    assert "style step-method3 stroke:#d62728" not in mermaid_js_string
+    assert mermaid_js_string.count("linkStyle") == 2
+
+    content = DAGGenerator().dag(flow_instance=flow_instance, run_report=run_report)
+    assert "critical path: method1 → method2 → method4" in content
+
+
+def test_svg_dag():
+    """Test to check the SVG renderer of the DAG, with a RunReport and saved in the html"""
+    flow_instance = DescriptionExampleFlow()
+    run_report = RunReport(
+        flow_name="DescriptionExampleFlow",
+        start_time=0,
+        end_time=4,
+        nodes=[
+            NodeReport(name="method1", wall_time=1),
+            NodeReport(name="method2", wall_time=2),
+            NodeReport(name="method3", wall_time=0.5),
+            NodeReport(name="method4", wall_time=0.5),
+        ],
+    )
+    svg = DAGGenerator().svg(flow_instance, run_report=run_report)
+    assert svg.startswith("<svg")
+    assert "method2: 2.00s (50%)" in svg
+    assert svg.count('stroke="#d62728" stroke-width="3"') == 5  # 3 steps and 2 edges
+
+    # svg is the default renderer
+    content = DAGGenerator().dag(flow_instance=flow_instance)
+    assert "<svg" in content
+    assert "mermaid.esm.min.mjs" not in content
+    content = DAGGenerator().dag(flow_instance=flow_instance, renderer="mermaid")
+    assert "mermaid.esm.min.mjs" in content
+
+    with pytest.raises(ValueError):
+        DAGGenerator().dag(flow_instance=flow_instance, renderer="graphviz")
+    DAGGenerator().display(flow_instance, renderer="svg")
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Module for flowrunner.core.manifest module"""
+import os
+
+from flowrunner.core.manifest import (
+    INDEX_FILENAME,
+    DAGManifest,
+    get_file_hash,
+    get_render_hash,
+    save_index,
+)
+
+
+def _flow_entry(graph_hash: str, html: str) -> dict:
+    """Function to create the entry of a Flow in a manifest"""
+    return {
+        "graph_hash": graph_hash,
+        "html": html,
+        "steps": 4,
+        "description": "<Example> flow",
+    }
+
+
+def test_manifest_save_and_load(tmp_path):
+    """Test to check that a manifest is only loaded for the same render hash"""
+    manifest = DAGManifest(path=str(tmp_path), render_hash=get_render_hash())
+    manifest.update(
+        "flows/example.py",
+        "abc",
+        {"ExampleFlow": _flow_entry("123", "exampleflow.html")},
+    )
+    manifest.save()
+
+    loaded = DAGManifest.load(str(tmp_path), get_render_hash())
+    assert loaded.files == manifest.files
+    assert loaded.get_graph_hashes() == {"ExampleFlow": "123"}
+    assert (
+        DAGManifest.load(str(tmp_path), get_render_hash(description=False)).files == {}
+    )
+
+    (tmp_path / "flowrunner_manifest.json").write_text("not json")
+    assert DAGManifest.load(str(tmp_path), get_render_hash()).files == {}
+
+
+def test_manifest_is_unchanged(tmp_path):
+    """Test to check that a file is unchanged only if it has the same hash and its DAGs exist"""
+    flow_file = tmp_path / "example.py"
+    flow_file.write_text("x = 1\n")
+    source_hash = get_file_hash(str(flow_file))
+    manifest = DAGManifest(path=str(tmp_path), render_hash=get_render_hash())
+    assert not manifest.is_unchanged(str(flow_file), source_hash)
+
+    manifest.update(
+        str(flow_file),
+        source_hash,
+        {"ExampleFlow": _flow_entry("123", "exampleflow.html")},
+    )
+    # the DAG was not saved
+    assert not manifest.is_unchanged(str(flow_file), source_hash)
+
+    (tmp_path / "exampleflow.html").write_text("<html></html>")
+    assert manifest.is_unchanged(str(flow_file), source_hash)
+
+    flow_file.write_text("x = 2\n")
+    assert not manifest.is_unchanged(str(flow_file), get_file_hash(str(flow_file)))
+
+    manifest.update(str(flow_file), "def", {}, complete=False)
+    assert not manifest.is_unchanged(str(flow_file), "def")
+    assert "ExampleFlow" in manifest.flows
+
+
+def test_manifest_remove(tmp_path):
+    """Test to check that the DAGs of removed Flows are deleted, unless the Flow moved to another file"""
+    manifest = DAGManifest(path=str(tmp_path), render_hash=get_render_hash())
+    for name in ("first", "second"):
+        (tmp_path / f"{name}flow.html").write_text("<html></html>")
+    manifest.update(
+        "a.py",
+        "abc",
+        {
+            "FirstFlow": _flow_entry("1", "firstflow.html"),
+            "SecondFlow": _flow_entry("2", "secondflow.html"),
+        },
+    )
+    manifest.update("b.py", "def", {"SecondFlow": _flow_entry("2", "secondflow.html")})
+    manifest.update("a.py", "ghi", {})
+    assert not os.path.exists(tmp_path / "firstflow.html")
+    assert os.path.exists(tmp_path / "secondflow.html")
+    assert set(manifest.flows) == {"SecondFlow"}
+
+    manifest.remove("b.py")
+    assert not os.path.exists(tmp_path / "secondflow.html")
+    assert manifest.flows == {}
+    assert manifest.files == {"a.py": {"source_hash": "ghi", "flows": []}}
+
+
+def test_save_index(tmp_path):
+    """Test to check that the index links every DAG"""
+    manifest = DAGManifest(path=str(tmp_path), render_hash=get_render_hash())
+    manifest.update("a.py", "abc", {"FirstFlow": _flow_entry("1", "firstflow.html")})
+    manifest.update("b.py", "def", {"SecondFlow": _flow_entry("2", "secondflow.html")})
+
+    index_path = save_index(manifest)
+    assert index_path == os.path.join(str(tmp_path), INDEX_FILENAME)
+    with open(index_path, encoding="utf-8") as index_file:
+        content = index_file.read()
+    assert '<a href="firstflow.html">FirstFlow</a>' in content
+    assert content.index("FirstFlow") < content.index("SecondFlow")
+    assert "&lt;Example&gt; flow" in content
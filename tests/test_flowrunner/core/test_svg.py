@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Module for flowrunner.core.svg module"""
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from flowrunner.core.base import Graph, GraphOptions
+from flowrunner.core.svg import (
+    NODE_GAP,
+    _count_crossings,
+    _order_levels,
+    get_layout,
+    render_svg,
+)
+from tests.test_flowrunner.core.test_base import UnequalPathsFlowExample
+from tests.test_flowrunner.runner.test_flow import ExamplePandas
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+
+
+@pytest.mark.parametrize(
+    "edges, lower_order, expected",
+    [
+        ([("a", "x"), ("b", "y")], ["x", "y"], 0),
+        ([("a", "x"), ("b", "y")], ["y", "x"], 1),
+        ([("a", "x"), ("a", "y"), ("b", "x"), ("b", "y")], ["x", "y"], 1),
+        ([("a", "z"), ("b", "y"), ("c", "x")], ["x", "y", "z"], 3),
+    ],
+)
+def test_count_crossings(edges, lower_order, expected):
+    """Test to check the number of crossings of the edges between two levels"""
+    upper_positions = {"a": 0, "b": 1, "c": 2}
+    lower_positions = {item: position for position, item in enumerate(lower_order)}
+    assert _count_crossings(edges, upper_positions, lower_positions) == expected
+
+
+def test_order_levels():
+    """Test to check that the order of a level is changed to remove the crossings"""
+    levels = [["a", "b"], ["y", "x"]]
+    edges = [[("a", "x"), ("b", "y")]]
+    assert _order_levels(levels, edges) == [["a", "b"], ["x", "y"]]
+
+
+def test_get_layout():
+    """Test to check that the levels are stacked, the nodes of a level do not overlap and long edges are routed
+    through the levels in between"""
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    boxes, routes, width, height = get_layout(graph, labels={"method_1": "first"})
+
+    assert set(boxes) == {node.name for node in graph.nodes}
+    assert boxes["method_1"].label == "first"
+    for level, next_level in zip(graph.levels, graph.levels[1:]):
+        bottom = max(boxes[node.name].bottom for node in level)
+        assert all(boxes[node.name].y > bottom for node in next_level)
+    left, right = sorted(
+        (boxes["method_2"], boxes["method_3_a"]), key=lambda box: box.x
+    )
+    assert right.x - left.x >= (left.width + right.width) / 2 + NODE_GAP - 1e-6
+    assert all(
+        0 <= box.x - box.width / 2
+        and box.x + box.width / 2 <= width
+        and box.bottom <= height
+        for box in boxes.values()
+    )
+
+    routes = {(node_name, next_name): points for node_name, next_name, points in routes}
+    assert len(routes) == 5
+    assert len(routes[("method_1", "method_2")]) == 2
+    # through a dummy point in the level of method_3_b
+    assert len(routes[("method_2", "method_4")]) == 4
+    assert routes[("method_2", "method_4")][-1] == (
+        boxes["method_4"].x,
+        boxes["method_4"].y,
+    )
+
+
+def test_get_layout_description():
+    """Test to check that docstrings are added to the nodes only with description"""
+    graph = ExamplePandas().graph
+    with_description, _, _, _ = get_layout(graph, description=True)
+    without_description, _, _, _ = get_layout(graph, description=False)
+
+    assert with_description["create_data"].description
+    assert not without_description["create_data"].description
+    assert (
+        with_description["create_data"].height
+        > without_description["create_data"].height
+    )
+
+
+def test_render_svg():
+    """Test to check that the SVG is valid XML with a node for each step and a path for each edge"""
+    graph = Graph(graph_options=GraphOptions(base_flow=UnequalPathsFlowExample))
+    svg = render_svg(
+        graph,
+        title="<Unequal>",
+        labels={"method_1": "method_1 & more"},
+        colors={"method_2": ("#e6550d", "white")},
+        highlighted=["method_1", "method_2", "method_4"],
+    )
+
+    root = ElementTree.fromstring(svg)
+    assert root.find(f"{SVG_NAMESPACE}title").text == "<Unequal>"
+    nodes = root.findall(f"{SVG_NAMESPACE}g")
+    assert {node.get("id") for node in nodes} == {
+        f"step-{node.name}" for node in graph.nodes
+    }
+    edges = root.findall(f"{SVG_NAMESPACE}path")
+    assert len(edges) == 5
+    highlighted = {
+        (edge.get("data-from"), edge.get("data-to"))
+        for edge in edges
+        if edge.get("stroke-width") == "3"
+    }
+    assert highlighted == {("method_1", "method_2"), ("method_2", "method_4")}
+    assert "method_1 &amp; more" in svg
+    assert 'fill="#e6550d"' in svg
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+
+import pytest
+
+from flowrunner.runner.batch import (
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_PASSED,
+    find_flow_files,
+    process_files,
+    show_results,
+)
+from flowrunner.runner.report import RunReport
+
+FLOW_FILE = """
+from flowrunner import BaseFlow, end, start, step
+
+
+class {name}(BaseFlow):
+    @start
+    @step(next=["middle"])
+    def first(self):
+        self.param_store["fail"] = {fail}
+
+    @step(next=["last"])
+    def middle(self):
+        pass
+
+    @end
+    @step
+    def last(self):
+        if self.param_store["fail"]:
+            raise ValueError("failed on purpose")
+        print("ran {name}")
+"""
+
+
+def _run(flow_class) -> str:
+    """Action running a Flow, at the top level so that worker processes can unpickle it"""
+    flow_class().run()
+    return flow_class.__name__
+
+
+@pytest.fixture
+def flow_directory(tmp_path):
+    """Fixture of a directory with flow files in nested directories, one Flow failing and one file not importing"""
+    (tmp_path / "nested" / "deeper").mkdir(parents=True)
+    (tmp_path / "first_flow.py").write_text(
+        FLOW_FILE.format(name="FirstFlow", fail=False)
+    )
+    (tmp_path / "nested" / "second_flow.py").write_text(
+        FLOW_FILE.format(name="SecondFlow", fail=True)
+    )
+    (tmp_path / "nested" / "deeper" / "broken_flow.py").write_text(
+        "import not_a_module\n"
+    )
+    (tmp_path / "nested" / "notes.txt").write_text("not a flow")
+    return tmp_path
+
+
+def test_find_flow_files(flow_directory):
+    """Test to check that directories are searched recursively and glob patterns are expanded"""
+    first = os.path.join(flow_directory, "first_flow.py")
+    second = os.path.join(flow_directory, "nested", "second_flow.py")
+    broken = os.path.join(flow_directory, "nested", "deeper", "broken_flow.py")
+
+    assert find_flow_files([str(flow_directory)]) == [first, broken, second]
+    assert find_flow_files([os.path.join(flow_directory, "**", "s*.py")]) == [second]
+    assert find_flow_files([first, str(flow_directory)]) == [first, broken, second]
+
+    with pytest.raises(ValueError):
+        find_flow_files([os.path.join(flow_directory, "missing.py")])
+    with pytest.raises(ValueError):
+        find_flow_files([os.path.join(flow_directory, "*.txt")])
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_process_files(flow_directory, capsys, jobs):
+    """Test to check that every Flow gets a result, in the order of the files, whether it passed or not"""
+    results = process_files(_run, find_flow_files([str(flow_directory)]), jobs=jobs)
+
+    assert [(result.flow_name, result.status) for result in results] == [
+        ("FirstFlow", STATUS_PASSED),
+        (None, STATUS_ERROR),
+        ("SecondFlow", STATUS_FAILED),
+    ]
+    assert results[0].value == "FirstFlow"
+    assert results[0].duration > 0
+    assert results[1].error.startswith("ErrorDuringImport")
+    assert results[2].error == "ValueError: failed on purpose"
+    assert "ran FirstFlow" in capsys.readouterr().out
+
+
+def test_process_files_jobs():
+    """Test to check that jobs has to be at least 1"""
+    with pytest.raises(ValueError):
+        process_files(_run, [], jobs=0)
+
+
+def test_show_results(flow_directory, capsys):
+    """Test to check the summary table"""
+    results = process_files(_run, find_flow_files([str(flow_directory)]))
+    capsys.readouterr()
+    show_results(results, wall_time=1.5)
+
+    output = capsys.readouterr().out
+    assert "FirstFlow" in output
+    assert "ValueError: failed on purpose" in output
+    assert "1 passed, 2 failed in 1.500s" in output
+
+
+def test_run_report_pickle():
+    """Test to check that a RunReport can be returned from a worker process"""
+    run_report = RunReport(flow_name="ExampleFlow")
+    run_report.finish()
+
+    unpickled = pickle.loads(pickle.dumps(run_report))
+    assert unpickled.to_dict() == run_report.to_dict()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.cache import StepCache
+
+CALLS = []  # names of the steps that actually ran
+
+
+class ExampleCacheFlow(BaseFlow):
+    """Flow where only the expensive step is cached"""
+
+    @start
+    @step(next=["expensive"])
+    def create(self):
+        CALLS.append("create")
+        self.base = self.param_store.get("base", 1)
+
+    @step(next=["show"], cache=True)
+    def expensive(self):
+        CALLS.append("expensive")
+        self.result = self.base * 10
+        return self.result
+
+    @end
+    @step
+    def show(self):
+        CALLS.append("show")
+        return self.result + 1
+
+
+@pytest.fixture
+def step_cache(tmp_path):
+    """Fixture of a StepCache in a temporary directory"""
+    CALLS.clear()
+    return StepCache(directory=str(tmp_path / "cache"))
+
+
+def test_cached_step_restored(step_cache):
+    """Test to check that a cached step is not run again and its output and attributes are restored"""
+    first_instance = ExampleCacheFlow()
+    first_instance.run(cache=step_cache)
+    assert CALLS == ["create", "expensive", "show"]
+
+    CALLS.clear()
+    second_instance = ExampleCacheFlow()
+    second_instance.run(cache=step_cache)
+    assert CALLS == []  # every step is cached with a StepCache
+    assert second_instance.result == 10
+    assert second_instance.data_store == {"create": None, "expensive": 10, "show": 11}
+
+
+def test_cache_key_params(step_cache):
+    """Test to check that changing the param_store changes the cache keys"""
+    ExampleCacheFlow(param_store={"base": 1}).run(cache=step_cache)
+    CALLS.clear()
+
+    flow_instance = ExampleCacheFlow(param_store={"base": 2})
+    flow_instance.run(cache=step_cache)
+    assert CALLS == ["create", "expensive", "show"]
+    assert flow_instance.data_store["show"] == 21
+
+
+def test_cache_key_unread_params(step_cache):
+    """Test to check that the cache keys only change with the parameters the steps read"""
+    flow_instance = ExampleCacheFlow(param_store={"base": 1})
+    cache_keys = step_cache.get_keys(flow_instance.graph, flow_instance)
+
+    flow_instance = ExampleCacheFlow(param_store={"base": 1, "unused": 2})
+    assert step_cache.get_keys(flow_instance.graph, flow_instance) == cache_keys
+
+
+def test_cache_stats_and_clear(step_cache):
+    """Test to check the stats of the cache and clearing entries"""
+    ExampleCacheFlow().run(cache=step_cache)
+    stats = step_cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["steps"]["ExampleCacheFlow.expensive"]["entries"] == 1
+
+    assert step_cache.clear(node_name="expensive") == 1
+    assert step_cache.get_stats()["entries"] == 2
+    assert step_cache.clear() == 2
+
+
+def test_cached_step_decorator(tmp_path, monkeypatch):
+    """Test to check that without a flow level setting only @step(cache=True) is cached"""
+    # the default cache directory is relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    CALLS.clear()
+    ExampleCacheFlow().run()
+    CALLS.clear()
+
+    ExampleCacheFlow().run()
+    assert CALLS == ["create", "show"]
+    assert StepCache().get_stats()["entries"] == 1
+
+
+def test_cache_eviction(tmp_path):
+    """Test to check that the cache is kept under max_size"""
+    step_cache = StepCache(directory=str(tmp_path / "cache"), max_size=1)
+    ExampleCacheFlow().run(cache=step_cache)
+    assert step_cache.get_stats()["entries"] <= 1
+
+
+def test_cache_no_eviction(tmp_path):
+    """Test to check that no entries are evicted without max_size"""
+    step_cache = StepCache(directory=str(tmp_path / "cache"), max_size=None)
+    ExampleCacheFlow().run(cache=step_cache)
+    assert step_cache.get_stats()["entries"] == 3
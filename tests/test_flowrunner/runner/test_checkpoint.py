@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.checkpoint import RunCheckpoint
+
+CALLS = []  # names of the steps that actually ran
+
+
+class ExampleFlakyFlow(BaseFlow):
+    """Flow where the last step fails unless 'fail' is turned off"""
+
+    @start
+    @step(next=["transform"])
+    def extract(self):
+        CALLS.append("extract")
+        self.rows = [1, 2, 3]
+        return len(self.rows)
+
+    @step(next=["load"])
+    def transform(self):
+        CALLS.append("transform")
+        self.doubled = [row * 2 for row in self.rows]
+
+    @end
+    @step
+    def load(self):
+        CALLS.append("load")
+        if self.param_store.get("fail"):
+            raise RuntimeError("Storage is not available")
+        return sum(self.doubled)
+
+
+def test_resume_from_failure(tmp_path):
+    """Test to check that resuming a failed run restores the completed steps"""
+    CALLS.clear()
+    run_checkpoint = RunCheckpoint(directory=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        ExampleFlakyFlow(param_store={"fail": True}).run(checkpoint=run_checkpoint)
+    assert run_checkpoint.get_completed("ExampleFlakyFlow") == ["extract", "transform"]
+
+    CALLS.clear()
+    flow_instance = ExampleFlakyFlow(param_store={"fail": False})
+    flow_instance.run(
+        resume=RunCheckpoint(run_checkpoint.run_id, directory=str(tmp_path))
+    )
+
+    assert CALLS == ["load"]
+    assert flow_instance.doubled == [2, 4, 6]
+    assert flow_instance.data_store == {"extract": 3, "transform": None, "load": 12}
+    assert run_checkpoint.get_completed("ExampleFlakyFlow") == [
+        "extract",
+        "load",
+        "transform",
+    ]
+
+
+def test_resume_unknown_run(tmp_path):
+    """Test to check that resuming a run without checkpoints raises an error"""
+    with pytest.raises(ValueError):
+        ExampleFlakyFlow().run(resume=RunCheckpoint("missing", directory=str(tmp_path)))
+
+
+def test_run_id():
+    """Test to check that a new run id is created for each checkpoint"""
+    assert RunCheckpoint().run_id != RunCheckpoint().run_id
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.checkpoint import RunCheckpoint
+from flowrunner.runner.context import RunContext
+
+
+class KeysSeenDataStore(dict):
+    """A data_store recording the keys it held the last time each key was read"""
+
+    def __init__(self):
+        super().__init__()
+        self.keys_seen = {}
+
+    def __getitem__(self, key):
+        self.keys_seen[key] = sorted(self)
+        return super().__getitem__(key)
+
+
+class ExampleReleaseFlow(BaseFlow):
+    """Flow where every step returns a value read from the outputs of its previous steps"""
+
+    @start
+    @step(next=["left", "right"])
+    def create(self):
+        return 1
+
+    @step(next=["combine"], pin=True)
+    def left(self):
+        return self.data_store["create"] + 1
+
+    @step(next=["combine"])
+    def right(self):
+        return self.data_store["create"] + 2
+
+    @step(next=["finish"])
+    def combine(self):
+        return self.data_store["left"] + self.data_store["right"]
+
+    @end
+    @step
+    def finish(self):
+        return self.data_store["combine"] * 10
+
+
+class ExampleLongReadFlow(BaseFlow):
+    """Flow where the last step reads the output of a step that is not its previous step"""
+
+    @start
+    @step(next=["middle"])
+    def create(self):
+        return 1
+
+    @step(next=["finish"])
+    def middle(self):
+        return self.data_store["create"] + 1
+
+    @end
+    @step
+    def finish(self):
+        return self.data_store["middle"] + self.data_store["create"]
+
+
+class ExampleUnknownReadFlow(BaseFlow):
+    """Flow where the last step reads data_store with a key from a variable"""
+
+    @start
+    @step(next=["middle"])
+    def create(self):
+        return 1
+
+    @step(next=["finish"])
+    def middle(self):
+        return self.data_store["create"] + 1
+
+    @end
+    @step
+    def finish(self):
+        key = "create"
+        return self.data_store[key]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_release_outputs(max_workers):
+    """Test to check that only end and pinned outputs are kept and that outputs
+    are released only once all of the nodes reading them have finished"""
+    data_store = KeysSeenDataStore()
+    flow_instance = ExampleReleaseFlow(data_store=data_store)
+    flow_instance.run(max_workers=max_workers, release_outputs=True)
+
+    assert "create" in data_store.keys_seen["create"]
+    # create is released once left and right have finished
+    assert data_store.keys_seen["left"] == ["left", "right"]
+    assert flow_instance.data_store == {"left": 2, "finish": 50}
+
+
+def test_release_outputs_long_read():
+    """Test to check that an output is kept until a step that reads it without being its next step finished"""
+    flow_instance = ExampleLongReadFlow()
+    flow_instance.run(release_outputs=True)
+    assert flow_instance.data_store == {"finish": 3}
+
+
+def test_get_inputs():
+    """Test to check the outputs each node reads, a node using data_store in another way reads every node before it"""
+    flow_instance = ExampleLongReadFlow()
+    inputs = RunContext(
+        flow_instance, flow_instance.graph, release_outputs=True
+    ).get_inputs()
+    assert inputs == {
+        "create": set(),
+        "middle": {"create"},
+        "finish": {"middle", "create"},
+    }
+
+    flow_instance = ExampleUnknownReadFlow()
+    context = RunContext(flow_instance, flow_instance.graph, release_outputs=True)
+    assert context.get_inputs()["finish"] == {"middle", "create"}
+    assert context.consumers == {"create": 2, "middle": 1, "finish": 0}
+
+
+def test_release_outputs_off():
+    """Test to check that every output is kept by default"""
+    flow_instance = ExampleReleaseFlow()
+    flow_instance.run()
+    assert set(flow_instance.data_store) == {
+        "create",
+        "left",
+        "right",
+        "combine",
+        "finish",
+    }
+
+
+def test_keeps_result(tmp_path):
+    """Test to check that attributes are only collected for results stored in a checkpoint, the cache or a RunState"""
+    flow_instance = ExampleReleaseFlow()
+    node = flow_instance.graph.node_map["left"]
+    assert not RunContext(flow_instance, flow_instance.graph).keeps_result(node)
+    checkpoint = RunCheckpoint(directory=str(tmp_path))
+    assert RunContext(
+        flow_instance, flow_instance.graph, checkpoint=checkpoint
+    ).keeps_result(node)
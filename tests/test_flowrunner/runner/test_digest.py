@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowrunner.runner.digest import get_digest
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        (
+            pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}),
+            pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}),
+        ),
+        (pd.Series([1.5, 2.5], name="a"), pd.Series([1.5, 2.5], name="a")),
+        (np.arange(6).reshape(2, 3), np.asfortranarray(np.arange(6).reshape(2, 3))),
+        ({"a": 1, "b": [1, 2]}, {"b": [1, 2], "a": 1}),
+        ({3, 1, 2}, {1, 2, 3}),
+        (None, None),
+    ],
+)
+def test_same_digest(first, second):
+    """Test to check that values with the same content have the same digest"""
+    assert get_digest(first) is not None
+    assert get_digest(first) == get_digest(second)
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        (pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1, 3]})),
+        (pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"b": [1, 2]})),
+        (pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1.0, 2.0]})),
+        (pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [1, 2]}, index=[1, 2])),
+        (np.arange(6), np.arange(6).reshape(2, 3)),
+        (np.arange(6, dtype="int32"), np.arange(6, dtype="int64")),
+        ([1, 2], (1, 2)),
+        (1, True),
+        ("1", 1),
+    ],
+)
+def test_different_digest(first, second):
+    """Test to check that values with different content, shape or type have different digests"""
+    assert get_digest(first) != get_digest(second)
+
+
+def test_digest_unhashable():
+    """Test to check that a value that cannot be pickled has no digest"""
+    assert get_digest(lambda: None) is None
+    # pickled since pandas cannot hash lists
+    assert get_digest(pd.DataFrame({"a": [[1], [2]]})) is not None
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import time
+
 import pandas as pd
 import pytest
 
@@ -173,3 +176,150 @@ def test_data_store():
     pandas_example = ExamplePandas(param_store=param_store)
     pandas_example.run()
     assert pandas_example.param_store["hello_there"] == "general_kenobi"
+
+
+class ExampleSleepFlow(BaseFlow):
+    """Flow with two independent steps that wait on I/O"""
+
+    @start
+    @step(next=["sleep_1", "sleep_2"])
+    def create(self):
+        return 1
+
+    @step(next=["combine"])
+    def sleep_1(self):
+        time.sleep(0.3)
+        return 2
+
+    @step(next=["combine"])
+    def sleep_2(self):
+        time.sleep(0.3)
+        return 3
+
+    @end
+    @step
+    def combine(self):
+        return self.data_store["sleep_1"] + self.data_store["sleep_2"]
+
+
+def test_run_max_workers():
+    """Test to check that the nodes of a level run concurrently with max_workers"""
+    flow_instance = ExampleSleepFlow()
+    start_time = time.perf_counter()
+    flow_instance.run(max_workers=2)
+    elapsed = time.perf_counter() - start_time
+
+    assert elapsed < 0.55  # both sleeps overlap, sequentially this would be 0.6s
+    assert flow_instance.data_store == {
+        "create": 1,
+        "sleep_1": 2,
+        "sleep_2": 3,
+        "combine": 5,
+    }
+
+
+def test_run_max_workers_invalid():
+    """Test to check that max_workers less than 1 is not allowed"""
+    with pytest.raises(ValueError):
+        ExampleSleepFlow().run(max_workers=0)
+
+
+class ExampleAsyncFlow(BaseFlow):
+    """Flow with two independent 'async def' steps and a sync end step"""
+
+    @start
+    @step(next=["fetch_1", "fetch_2"])
+    async def create(self):
+        return 1
+
+    @step(next=["combine"])
+    async def fetch_1(self):
+        await asyncio.sleep(0.3)
+        return 2
+
+    @step(next=["combine"])
+    async def fetch_2(self):
+        await asyncio.sleep(0.3)
+        return 3
+
+    @end
+    @step
+    def combine(self):
+        return self.data_store["fetch_1"] + self.data_store["fetch_2"]
+
+
+def test_arun():
+    """Test to check that coroutine steps are awaited and run concurrently"""
+    flow_instance = ExampleAsyncFlow()
+    start_time = time.perf_counter()
+    asyncio.run(flow_instance.arun())
+    elapsed = time.perf_counter() - start_time
+
+    assert elapsed < 0.55  # both sleeps overlap, sequentially this would be 0.6s
+    assert flow_instance.data_store == {
+        "create": 1,
+        "fetch_1": 2,
+        "fetch_2": 3,
+        "combine": 5,
+    }
+
+
+def test_run_async_flow():
+    """Test to check that the sync run drives an event loop for coroutine steps"""
+    flow_instance = ExampleAsyncFlow()
+    flow_instance.run()
+    assert flow_instance.data_store["combine"] == 5
+
+
+def test_run_async_flow_running_loop():
+    """Test to check that the sync run refuses to start a second event loop"""
+
+    async def run_inside_loop():
+        ExampleAsyncFlow().run()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_inside_loop())
+
+
+def test_graph_cached():
+    """Test to check that all instances of a Flow class share the same compiled Graph"""
+    first_instance = ExampleFlow()
+    second_instance = ExampleFlow()
+    assert first_instance.graph is second_instance.graph
+    assert FlowRunner._get_details(first_instance) is first_instance.graph
+
+    first_instance.validate_with_error(terminal_output=False)
+    assert first_instance.graph.validation_results is not None
+
+
+def test_graph_cache_invalidated():
+    """Test to check that the Graph is built again when the steps of the class change"""
+
+    class ChangingFlow(BaseFlow):
+        @start
+        @step(next=["method2"])
+        def method1(self):
+            return 1
+
+        @step(next=["method3"])
+        def method2(self):
+            return 2
+
+        @end
+        @step
+        def method3(self):
+            return 3
+
+    graph = ChangingFlow().graph
+
+    @end
+    @step
+    def method3(self):
+        return 4
+
+    ChangingFlow.method3 = method3
+
+    flow_instance = ChangingFlow()
+    assert flow_instance.graph is not graph
+    flow_instance.run()
+    assert flow_instance.data_store["method3"] == 4
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.batch import read_flow_file
+from flowrunner.runner.cache import get_param_keys
+from flowrunner.runner.incremental import RunState, get_run_state
+
+CALLS = []  # names of the steps that actually ran
+
+
+class ExampleIncrementalFlow(BaseFlow):
+    """Flow where each step reads a different parameter"""
+
+    @start
+    @step(next=["scale", "offset"])
+    def create(self):
+        CALLS.append("create")
+        return self.param_store.get("size", 3)
+
+    @step(next=["combine"])
+    def scale(self):
+        CALLS.append("scale")
+        return self.data_store["create"] * self.param_store["factor"]
+
+    @step(next=["combine"])
+    def offset(self):
+        CALLS.append("offset")
+        return self.data_store["create"] + 1
+
+    @end
+    @step
+    def combine(self):
+        CALLS.append("combine")
+        return self.data_store["scale"] + self.data_store["offset"]
+
+
+class ExampleCutoffFlow(BaseFlow):
+    """Flow where a parameter change does not always change the output of the step reading it"""
+
+    @start
+    @step(next=["clip"])
+    def create(self):
+        CALLS.append("create")
+        return pd.DataFrame({"value": [1, 2, 3]})
+
+    @step(next=["aggregate"])
+    def clip(self):
+        CALLS.append("clip")
+        return self.data_store["create"].clip(upper=self.param_store["limit"])
+
+    @end
+    @step
+    def aggregate(self):
+        CALLS.append("aggregate")
+        return self.data_store["clip"]["value"].sum()
+
+
+FLOW_FILE = """
+from flowrunner import BaseFlow, end, start, step
+
+
+class FileFlow(BaseFlow):
+    @start
+    @step(next=["transform"])
+    def load(self):
+        return 1
+
+    @step(next=["finish"])
+    def transform(self):
+        return self.data_store["load"] + {increment}
+
+    @end
+    @step
+    def finish(self):
+        return self.data_store["transform"] * 10
+"""
+
+
+def _get_statuses(run_report) -> dict:
+    """Function to get the status of every node of a RunReport"""
+    return {node_report.name: node_report.status for node_report in run_report.nodes}
+
+
+def test_get_param_keys():
+    """Test to check the param_store keys found in the source of a step"""
+    assert get_param_keys(ExampleIncrementalFlow.create) == {"size"}
+    assert get_param_keys(ExampleIncrementalFlow.scale) == {"factor"}
+    assert get_param_keys(ExampleIncrementalFlow.offset) == set()
+
+    def read_all(self):
+        return sorted(self.param_store)
+
+    assert get_param_keys(read_all) is None
+
+
+def test_get_run_state(tmp_path):
+    """Test to check the RunState of each value of incremental"""
+    run_state = RunState()
+    assert get_run_state(False) is None
+    assert get_run_state(True) is get_run_state(True)
+    assert get_run_state(run_state) is run_state
+    assert get_run_state(str(tmp_path)).directory == str(tmp_path)
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_incremental_same_instance(max_workers):
+    """Test to check that only the steps that read a changed parameter and the steps after them run again"""
+    CALLS.clear()
+    run_state = RunState()
+    flow_instance = ExampleIncrementalFlow(param_store={"factor": 2})
+    flow_instance.run(incremental=run_state, max_workers=max_workers)
+    assert sorted(CALLS) == ["combine", "create", "offset", "scale"]
+
+    CALLS.clear()
+    flow_instance.run(incremental=run_state, max_workers=max_workers)
+    assert CALLS == []
+
+    CALLS.clear()
+    flow_instance.param_store["factor"] = 5
+    flow_instance.run(incremental=run_state, max_workers=max_workers)
+    assert CALLS == ["scale", "combine"]
+    assert flow_instance.data_store["combine"] == 19
+
+
+def test_incremental_new_instance(tmp_path):
+    """Test to check that a new instance restores the unchanged steps from a RunState kept in a directory"""
+    CALLS.clear()
+    run_state = RunState(directory=str(tmp_path))
+    ExampleIncrementalFlow(param_store={"factor": 2}).run(incremental=run_state)
+
+    CALLS.clear()
+    flow_instance = ExampleIncrementalFlow(param_store={"factor": 2, "unused": 1})
+    run_report = flow_instance.run(incremental=run_state)
+    assert CALLS == []
+    assert set(_get_statuses(run_report).values()) == {"restored"}
+    assert flow_instance.data_store["combine"] == 10
+
+
+def test_incremental_in_memory_keeps_no_outputs():
+    """Test to check that a RunState without a directory only reuses the outputs in data_store of the last instance"""
+    CALLS.clear()
+    run_state = RunState()
+    flow_instance = ExampleIncrementalFlow(param_store={"factor": 2})
+    flow_instance.run(incremental=run_state)
+    assert run_state.load("ExampleIncrementalFlow", "create") is None
+    assert run_state.load("ExampleIncrementalFlow", "create", flow_instance).output == 3
+
+    # a new instance has no outputs to reuse, so every step runs again
+    CALLS.clear()
+    flow_instance = ExampleIncrementalFlow(param_store={"factor": 2})
+    flow_instance.run(incremental=run_state)
+    assert sorted(CALLS) == ["combine", "create", "offset", "scale"]
+
+    CALLS.clear()
+    run_state.clear()
+    flow_instance.run(incremental=run_state)
+    assert sorted(CALLS) == ["combine", "create", "offset", "scale"]
+
+
+def test_incremental_failed_step():
+    """Test to check that the steps after a changed step are run again if the previous run failed"""
+    CALLS.clear()
+    run_state = RunState()
+    flow_instance = ExampleIncrementalFlow(param_store={"factor": 2})
+    flow_instance.run(incremental=run_state)
+
+    flow_instance.param_store["factor"] = None  # scale fails
+    with pytest.raises(TypeError):
+        flow_instance.run(incremental=run_state)
+
+    CALLS.clear()
+    flow_instance.param_store["factor"] = 2
+    flow_instance.run(incremental=run_state)
+    assert CALLS == ["scale", "combine"]
+
+
+def test_incremental_directory(tmp_path):
+    """Test to check that a changed step in a Flow file is found with the state kept in a directory"""
+    state_directory = str(tmp_path / "state")
+    flow_path = tmp_path / "file_flow.py"
+    flow_path.write_text(FLOW_FILE.format(increment=1))
+    (flow_class,) = read_flow_file(str(flow_path))
+    run_report = flow_class().run(incremental=state_directory)
+    assert set(_get_statuses(run_report).values()) == {"completed"}
+
+    (flow_class,) = read_flow_file(str(flow_path))
+    flow_instance = flow_class()
+    run_report = flow_instance.run(incremental=state_directory)
+    assert set(_get_statuses(run_report).values()) == {"restored"}
+    assert flow_instance.data_store["finish"] == 20
+
+    flow_path.write_text(FLOW_FILE.format(increment=2))
+    (flow_class,) = read_flow_file(str(flow_path))
+    flow_instance = flow_class()
+    run_report = flow_instance.run(incremental=state_directory)
+    assert _get_statuses(run_report) == {
+        "load": "restored",
+        "transform": "completed",
+        "finish": "completed",
+    }
+    assert flow_instance.data_store["finish"] == 30
+
+
+@pytest.mark.parametrize("new_instance", [False, True])
+def test_incremental_early_cutoff(new_instance, tmp_path):
+    """Test to check that the steps after a changed step are not run again if its output did not change"""
+    CALLS.clear()
+    # a new instance can only restore the results kept in a directory
+    run_state = RunState(directory=str(tmp_path) if new_instance else None)
+    flow_instance = ExampleCutoffFlow(param_store={"limit": 10})
+    flow_instance.run(incremental=run_state)
+    assert CALLS == ["create", "clip", "aggregate"]
+
+    CALLS.clear()
+    if new_instance:
+        flow_instance = ExampleCutoffFlow(param_store={"limit": 10})
+    flow_instance.param_store["limit"] = 20  # the values are still below the limit
+    run_report = flow_instance.run(incremental=run_state)
+    assert CALLS == ["clip"]
+    assert run_report.get_node("aggregate").status == "restored"
+    assert flow_instance.data_store["aggregate"] == 6
+
+    CALLS.clear()
+    flow_instance.param_store["limit"] = 2
+    flow_instance.run(incremental=run_state)
+    assert CALLS == ["clip", "aggregate"]
+    assert flow_instance.data_store["aggregate"] == 5
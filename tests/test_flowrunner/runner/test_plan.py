@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.plan import FlowPlan, get_durations, simulate
+from flowrunner.runner.report import NodeReport, RunReport
+
+
+class ExamplePlanFlow(BaseFlow):
+    """Flow with a long step that comes last in the next of its previous step"""
+
+    @start
+    @step(next=["short_2", "short_1", "long"])
+    def create(self):
+        return None
+
+    @end
+    @step
+    def long(self):
+        return None
+
+    @step(next=["after_1"])
+    def short_1(self):
+        return None
+
+    @end
+    @step
+    def short_2(self):
+        return None
+
+    @end
+    @step
+    def after_1(self):
+        return None
+
+
+DURATIONS = {"create": 1, "long": 4, "short_1": 1, "short_2": 1, "after_1": 1}
+
+
+@pytest.mark.parametrize(
+    "workers, policy, expected",
+    [
+        (1, "levels", 8),
+        (1, "fifo", 8),
+        (1, "critical_path", 8),
+        # a barrier after each level, after_1 waits for the long step
+        (2, "levels", 6),
+        # long starts after short_2 and short_1 as it is last in create's next
+        (2, "fifo", 6),
+        # long starts first as it has the longest path to an end step
+        (2, "critical_path", 5),
+        (3, "fifo", 5),
+    ],
+)
+def test_simulate(workers, policy, expected):
+    """Test to check the makespan of each scheduling policy"""
+    graph = ExamplePlanFlow().graph
+    assert simulate(graph, DURATIONS, workers, policy) == expected
+
+
+@pytest.mark.parametrize("workers, policy", [(0, "fifo"), (2, "random")])
+def test_simulate_invalid(workers, policy):
+    """Test to check that bad arguments raise a ValueError"""
+    with pytest.raises(ValueError):
+        simulate(ExamplePlanFlow().graph, DURATIONS, workers, policy)
+
+
+def test_get_durations():
+    """Test to check the durations from a RunReport, steps not in it take the mean duration"""
+    graph = ExamplePlanFlow().graph
+    durations, missing = get_durations(graph)
+    assert durations == dict.fromkeys(DURATIONS, 1.0)
+    assert missing == []
+
+    run_report = RunReport(flow_name="ExamplePlanFlow")
+    run_report.add(NodeReport(name="create", wall_time=1.0))
+    run_report.add(NodeReport(name="long", wall_time=3.0))
+    durations, missing = get_durations(graph, run_report)
+    assert sorted(missing) == ["after_1", "short_1", "short_2"]
+    assert durations["long"] == 3.0
+    assert durations["short_1"] == 2.0
+
+
+def test_flow_plan(capsys):
+    """Test to check the work, span and width of a Flow and that the plan is shown"""
+    run_report = RunReport(flow_name="ExamplePlanFlow")
+    for name, duration in DURATIONS.items():
+        run_report.add(NodeReport(name=name, wall_time=float(duration)))
+
+    flow_plan = ExamplePlanFlow().plan(run_report=run_report, max_workers=3)
+
+    assert isinstance(flow_plan, FlowPlan)
+    assert flow_plan.work == 8
+    assert flow_plan.span == 5
+    assert flow_plan.critical_path == ["create", "long"]
+    assert flow_plan.width == 3
+    assert flow_plan.makespans["critical_path"] == [8, 5, 5]
+    assert flow_plan.get_enough_workers("critical_path") == 2
+    assert flow_plan.get_enough_workers("fifo") == 3
+    output = capsys.readouterr().out
+    assert "ExamplePlanFlow" in output
+    assert "create -> long" in output
+
+
+def test_flow_plan_invalid_max_workers():
+    """Test to check that max_workers must be at least 1"""
+    with pytest.raises(ValueError):
+        FlowPlan.from_graph(ExamplePlanFlow().graph, "ExamplePlanFlow", max_workers=0)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.process import (
+    get_changed_attributes,
+    run_node_in_process,
+    snapshot_attributes,
+)
+
+
+class ExampleProcessFlow(BaseFlow):
+    """Flow with two branches, each step records the data_store entries it can see"""
+
+    @start
+    @step(next=["branch_a", "branch_b"])
+    def create(self):
+        self.numbers = list(range(10))
+        return os.getpid()
+
+    @step(next=["combine_a"])
+    def branch_a(self):
+        self.total_a = sum(self.numbers)
+        return sorted(self.data_store)
+
+    @step(next=["combine_b"])
+    def branch_b(self):
+        self.total_b = sum(self.numbers) * 2
+        return sorted(self.data_store)
+
+    @end
+    @step
+    def combine_a(self):
+        return sorted(self.data_store)
+
+    @end
+    @step
+    def combine_b(self):
+        return self.total_b
+
+
+def test_run_process_executor():
+    """Test to check that outputs and attributes are merged back into the parent instance"""
+    flow_instance = ExampleProcessFlow()
+    flow_instance.run(max_workers=2, executor="process")
+
+    assert flow_instance.data_store["create"] != os.getpid()  # ran in a worker process
+    assert flow_instance.numbers == list(range(10))
+    assert flow_instance.total_a == 45
+    assert flow_instance.total_b == 90
+    assert flow_instance.data_store["combine_b"] == 90
+
+
+def test_run_process_ships_upstream_only():
+    """Test to check that a node only gets the data_store entries of nodes upstream of it"""
+    flow_instance = ExampleProcessFlow()
+    flow_instance.run(max_workers=2, executor="process")
+
+    assert flow_instance.data_store["branch_a"] == ["create"]
+    assert flow_instance.data_store["branch_b"] == ["create"]
+    assert flow_instance.data_store["combine_a"] == ["branch_a", "create"]
+
+
+def test_run_invalid_executor():
+    """Test to check that only 'thread' and 'process' executors are allowed"""
+    with pytest.raises(ValueError):
+        ExampleProcessFlow().run(executor="fibre")
+
+
+def test_changed_attributes():
+    """Test to check that only new or re-assigned attributes are picked up"""
+    flow_instance = ExampleProcessFlow()
+    flow_instance.unchanged = [1]
+    flow_instance.reassigned = [2]
+    snapshot = snapshot_attributes(flow_instance)
+    flow_instance.reassigned = [2]
+    flow_instance.new = 3
+
+    assert get_changed_attributes(flow_instance, snapshot) == {
+        "reassigned": [2],
+        "new": 3,
+    }
+
+
+def test_run_node_in_process():
+    """Test to check the function run by the worker process"""
+    node_result = run_node_in_process(
+        ExampleProcessFlow, "branch_b", {"numbers": [1, 2]}, {}, {"create": 1}
+    )
+    assert node_result.name == "branch_b"
+    assert node_result.output == ["create"]
+    assert node_result.attributes == {"total_b": 6}
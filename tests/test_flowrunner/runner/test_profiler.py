@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.profiler import (
+    StepProfile,
+    profile_node,
+    save_profiles,
+    show_profiles,
+)
+
+
+def busy(seconds: float) -> int:
+    """Function keeping the CPU busy for a number of seconds"""
+    end_time = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end_time:
+        total += sum(range(100))
+    return total
+
+
+class ExampleProfileFlow(BaseFlow):
+    """Flow where only the 'hot' step is profiled"""
+
+    @start
+    @step(next=["hot", "cold"])
+    def first(self):
+        return 1
+
+    @step(next=["last"], profile=True)
+    def hot(self):
+        return busy(0.1)
+
+    @step(next=["last"])
+    def cold(self):
+        return 2
+
+    @end
+    @step
+    def last(self):
+        return 3
+
+
+class ExampleAsyncProfileFlow(BaseFlow):
+    """Flow with a profiled 'async def' step"""
+
+    @start
+    @step(next=["wait"])
+    def first(self):
+        return 1
+
+    @step(next=["last"], profile=True)
+    async def wait(self):
+        await asyncio.sleep(0.01)
+        return busy(0.05)
+
+    @end
+    @step
+    def last(self):
+        return 3
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [{}, {"max_workers": 2}, {"max_workers": 2, "executor": "process"}],
+)
+def test_run_profile(run_kwargs):
+    """Test to check that only steps with @step(profile=True) are profiled, in any executor"""
+    run_report = ExampleProfileFlow().run(**run_kwargs)
+
+    assert set(run_report.profiles) == {"hot"}
+    step_profile = run_report.profiles["hot"]
+    assert step_profile.total_time == pytest.approx(0.1, abs=0.05)
+    hot_function = step_profile.get_hot_functions(top=1)[0][0]
+    assert hot_function.startswith("busy (test_profiler.py:")
+    # the stacks start at the step, without the frames of the runner
+    assert all(stack.startswith("hot (") for stack in step_profile.stacks)
+
+
+def test_run_profile_steps():
+    """Test to check that profile_steps profiles every step"""
+    run_report = ExampleProfileFlow().run(profile_steps=True)
+    assert set(run_report.profiles) == {"first", "hot", "cold", "last"}
+
+
+def test_run_profile_async():
+    """Test to check that an 'async def' step is profiled while it runs on the event loop"""
+    run_report = ExampleAsyncProfileFlow().run()
+    hot_functions = [
+        function for function, _, _ in run_report.profiles["wait"].get_hot_functions()
+    ]
+    assert hot_functions[0].startswith("busy (")
+
+
+def test_step_profile():
+    """Test to check the self and total time of functions and the collapsed stacks"""
+    step_profile = StepProfile(name="load")
+    step_profile.stacks.update(
+        {"load (a.py:1);read (a.py:5)": 3_000_000, "load (a.py:1)": 1_000_000}
+    )
+    assert step_profile.total_time == 4
+    assert step_profile.get_hot_functions() == [
+        ("read (a.py:5)", 3, 3),
+        ("load (a.py:1)", 1, 4),
+    ]
+    assert step_profile.to_collapsed(prefix="Flow") == (
+        "Flow;load (a.py:1) 1000000\nFlow;load (a.py:1);read (a.py:5) 3000000\n"
+    )
+
+
+def test_profile_node_failed():
+    """Test to check that the sampler thread is stopped when the step raises"""
+    with pytest.raises(ZeroDivisionError):
+        with profile_node("broken", busy) as step_profile:
+            1 / 0  # pylint: disable=pointless-statement
+    assert isinstance(step_profile, StepProfile)
+
+
+def test_save_and_show_profiles(tmp_path, capsys):
+    """Test to check that a file is written for each node and one for the Flow"""
+    run_report = ExampleProfileFlow().run(profile_steps=True)
+    paths = save_profiles(run_report, str(tmp_path))
+
+    assert (tmp_path / "ExampleProfileFlow" / "hot.folded").exists()
+    assert len(paths) == 5
+    flow_stacks = (tmp_path / "ExampleProfileFlow.folded").read_text(encoding="utf-8")
+    assert all(
+        line.startswith("ExampleProfileFlow;") for line in flow_stacks.splitlines()
+    )
+
+    show_profiles(run_report, top=3)
+    assert "busy (test_profiler.py:" in capsys.readouterr().out
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.cache import StepCache
+from flowrunner.runner.report import (
+    NodeReport,
+    RunReport,
+    format_size,
+    load_reports,
+    measure_node,
+    save_reports,
+)
+
+
+class ExampleReportFlow(BaseFlow):
+    """Flow with a slow step and a step returning a large output"""
+
+    @start
+    @step(next=["slow", "large"])
+    def first(self):
+        return 1
+
+    @step(next=["last"])
+    def slow(self):
+        time.sleep(0.05)
+        return 2
+
+    @step(next=["last"])
+    def large(self):
+        return list(range(10_000))
+
+    @end
+    @step
+    def last(self):
+        return self.data_store["slow"] + len(self.data_store["large"])
+
+
+class ExampleAsyncReportFlow(BaseFlow):
+    """Flow with an 'async def' step"""
+
+    @start
+    @step(next="wait")
+    def first(self):
+        return 1
+
+    @step(next="last")
+    async def wait(self):
+        await asyncio.sleep(0.05)
+        return 2
+
+    @end
+    @step
+    def last(self):
+        return self.data_store["wait"]
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [{}, {"max_workers": 2}, {"max_workers": 2, "executor": "process"}],
+)
+def test_run_report(run_kwargs):
+    """Test to check that every node is recorded in the RunReport returned by run"""
+    run_report = ExampleReportFlow().run(**run_kwargs)
+
+    assert isinstance(run_report, RunReport)
+    assert run_report.flow_name == "ExampleReportFlow"
+    assert [node_report.name for node_report in run_report.nodes][0] == "first"
+    assert {node_report.name for node_report in run_report.nodes} == {
+        "first",
+        "slow",
+        "large",
+        "last",
+    }
+    slow = run_report.get_node("slow")
+    assert slow.wall_time >= 0.05
+    assert slow.cpu_time < slow.wall_time  # sleeping does not use the CPU
+    assert slow.end_time >= slow.start_time + 0.05
+    assert run_report.get_node("large").output_size > 10_000
+    assert run_report.wall_time >= 0.05
+    if run_kwargs.get("executor") == "process":
+        assert slow.process_id != os.getpid()
+    else:
+        assert slow.process_id == os.getpid()
+
+
+def test_run_report_async():
+    """Test to check that 'async def' steps are recorded without CPU time"""
+    run_report = ExampleAsyncReportFlow().run()
+    assert run_report.get_node("wait").wall_time >= 0.05
+    assert run_report.get_node("wait").cpu_time is None
+    assert run_report.get_node("first").cpu_time is not None
+
+
+def test_run_report_restored(tmp_path):
+    """Test to check that nodes restored from the cache are recorded as restored"""
+    step_cache = StepCache(directory=str(tmp_path))
+    ExampleReportFlow().run(cache=step_cache)
+    run_report = ExampleReportFlow().run(cache=step_cache)
+    assert {node_report.status for node_report in run_report.nodes} == {"restored"}
+
+
+def test_measure_node_failed():
+    """Test to check that a node that raises is recorded as failed"""
+    with pytest.raises(ZeroDivisionError):
+        with measure_node("broken") as node_report:
+            1 / 0  # pylint: disable=pointless-statement
+    assert node_report.status == "failed"
+    assert node_report.wall_time is not None
+
+
+def test_save_and_load_reports(tmp_path):
+    """Test to check that reports are written to and read from JSON"""
+    run_report = ExampleReportFlow().run()
+    path = str(tmp_path / "report.json")
+    save_reports([run_report], path)
+
+    loaded = load_reports(path)["ExampleReportFlow"]
+    assert loaded.to_dict() == run_report.to_dict()
+    assert isinstance(loaded.nodes[0], NodeReport)
+
+    json_path = str(tmp_path / "single.json")
+    assert json.loads(run_report.to_json(json_path))["flow_name"] == "ExampleReportFlow"
+    assert "ExampleReportFlow" in load_reports(json_path)
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [(None, "-"), (10, "10 B"), (2048, "2.0 KB"), (3 * 1024**3, "3.0 GB")],
+)
+def test_format_size(size, expected):
+    """Test to check format_size"""
+    assert format_size(size) == expected
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.scheduler import DependencyScheduler
+
+
+class UnbalancedFlow(BaseFlow):
+    """Flow with one slow branch and one chain of quick steps"""
+
+    @start
+    @step(next=["slow", "quick_1"])
+    def create(self):
+        return None
+
+    @end
+    @step
+    def slow(self):
+        time.sleep(0.4)
+        return None
+
+    @step(next=["quick_2"])
+    def quick_1(self):
+        time.sleep(0.2)
+        return None
+
+    @end
+    @step
+    def quick_2(self):
+        time.sleep(0.2)
+        return None
+
+
+def test_in_degrees():
+    """Test to check the number of predecessors for each node"""
+    scheduler = DependencyScheduler(UnbalancedFlow().graph)
+    assert scheduler.get_in_degrees() == {
+        "create": 0,
+        "slow": 1,
+        "quick_1": 1,
+        "quick_2": 1,
+    }
+
+
+def test_dependency_order():
+    """Test to check that every node starts only after its predecessors are done"""
+    graph = UnbalancedFlow().graph
+    finished = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        DependencyScheduler(graph).run(
+            submit=lambda node: executor.submit(lambda: None),
+            on_complete=lambda node, future: finished.append(node.name),
+        )
+
+    assert finished.index("create") == 0
+    assert finished.index("quick_1") < finished.index("quick_2")
+    assert finished.index("create") < finished.index("slow")
+
+
+def test_no_level_barrier():
+    """Test to check that quick_2 does not wait for slow, which is in the level before it.
+    With level barriers quick_2 waits for slow and this flow takes 0.4 + 0.2 seconds"""
+    flow_instance = UnbalancedFlow()
+    start_time = time.perf_counter()
+    flow_instance.run(max_workers=2)
+    elapsed = time.perf_counter() - start_time
+    assert elapsed < 0.55
+    assert set(flow_instance.data_store) == {"create", "slow", "quick_1", "quick_2"}
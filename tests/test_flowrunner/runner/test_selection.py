@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.cache import StepCache
+from flowrunner.runner.selection import select_nodes
+
+
+class ExamplePartialFlow(BaseFlow):
+    """Flow with two branches that counts how many times each step ran"""
+
+    @start
+    @step(next=["load", "load_other"])
+    def create(self):
+        self.calls = []
+        return 1
+
+    @step(next=["append_data"])
+    def load(self):
+        self.calls.append("load")
+        return self.data_store["create"] + 1
+
+    @step(next=["summarize"])
+    def load_other(self):
+        self.calls.append("load_other")
+        return self.data_store["create"] + 2
+
+    @step(next=["summarize"])
+    def append_data(self):
+        self.calls.append("append_data")
+        return self.data_store["load"] * 10
+
+    @end
+    @step
+    def summarize(self):
+        self.calls.append("summarize")
+        return self.data_store["append_data"] + self.data_store["load_other"]
+
+
+@pytest.mark.parametrize(
+    "targets, from_steps, available, expected",
+    [
+        (["append_data"], None, (), {"create", "load", "append_data"}),
+        (["append_data"], None, ("create", "load"), {"append_data"}),
+        # create is not needed since load is reused
+        (["append_data"], None, ("load",), {"append_data"}),
+        (
+            None,
+            ["append_data"],
+            ("create", "load", "load_other"),
+            {"append_data", "summarize"},
+        ),
+        (["append_data"], ["load"], ("create", "load"), {"load", "append_data"}),
+        (
+            None,
+            ["load"],
+            (),
+            {"create", "load", "load_other", "append_data", "summarize"},
+        ),
+    ],
+)
+def test_select_nodes(targets, from_steps, available, expected):
+    """Test to check the smallest set of nodes to run for targets and from_steps"""
+    graph = ExamplePartialFlow().graph
+    assert select_nodes(graph, targets, from_steps, available=available) == expected
+
+
+@pytest.mark.parametrize(
+    "targets, from_steps",
+    [
+        (["missing"], None),
+        (None, ["missing"]),
+        (["load"], ["load_other"]),  # load_other does not come before load
+    ],
+)
+def test_select_nodes_invalid(targets, from_steps):
+    """Test to check that unknown steps and from_steps that are not needed by the targets are rejected"""
+    graph = ExamplePartialFlow().graph
+    with pytest.raises(ValueError):
+        select_nodes(graph, targets, from_steps)
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_run_targets(max_workers):
+    """Test to check that a partial run only runs the targets and reuses the outputs in data_store"""
+    flow_instance = ExamplePartialFlow()
+    flow_instance.run(targets=["append_data"], max_workers=max_workers)
+    assert flow_instance.calls == ["load", "append_data"]
+    assert "summarize" not in flow_instance.data_store
+
+    flow_instance.calls = []
+    run_report = flow_instance.run(targets=["append_data"], max_workers=max_workers)
+    assert flow_instance.calls == ["append_data"]
+    assert [node_report.name for node_report in run_report.nodes] == ["append_data"]
+
+
+def test_run_from_steps():
+    """Test to check that from_steps runs a step again with every step after it"""
+    flow_instance = ExamplePartialFlow()
+    flow_instance.run()
+    flow_instance.calls = []
+    flow_instance.run(from_steps=["append_data"])
+    assert flow_instance.calls == ["append_data", "summarize"]
+    assert flow_instance.data_store["summarize"] == 23
+
+
+def test_run_from_steps_cached(tmp_path):
+    """Test to check that from_steps are run again even if they are cached"""
+    step_cache = StepCache(directory=str(tmp_path))
+    ExamplePartialFlow().run(cache=step_cache)
+
+    run_report = ExamplePartialFlow().run(cache=step_cache, from_steps=["append_data"])
+    assert {
+        node_report.name: node_report.status for node_report in run_report.nodes
+    } == {
+        "create": "restored",
+        "load": "restored",
+        "load_other": "restored",
+        "append_data": "completed",
+        "summarize": "completed",
+    }
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.store import SpillableDataStore, get_size, parse_size
+
+
+class ExampleSpillFlow(BaseFlow):
+    """Flow where every step returns an array bigger than the memory budget used in the tests"""
+
+    @start
+    @step(next=["left", "right"])
+    def create(self):
+        return np.arange(1000)
+
+    @step(next=["combine"])
+    def left(self):
+        return self.data_store["create"] + 1
+
+    @step(next=["combine"])
+    def right(self):
+        return self.data_store["create"] * 2
+
+    @end
+    @step
+    def combine(self):
+        return pd.DataFrame(
+            {"left": self.data_store["left"], "right": self.data_store["right"]}
+        )
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [(10, 10), ("10", 10), ("2KB", 2048), ("1.5 mb", 1572864), ("1GB", 1024**3)],
+)
+def test_parse_size(size, expected):
+    """Test to check parse_size with and without units"""
+    assert parse_size(size) == expected
+
+
+def test_parse_size_invalid():
+    """Test to check parse_size with a value that is not a size"""
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_get_size():
+    """Test to check get_size for arrays and DataFrames"""
+    assert get_size(np.zeros(100, dtype="int64")) == 800
+    assert get_size(pd.DataFrame({"a": np.zeros(100)})) >= 800
+    strings = pd.DataFrame({"a": ["x" * 100] * 100})
+    assert get_size(strings, deep=True) > get_size(strings) + 100 * 100
+
+
+def test_spill_and_load(tmp_path):
+    """Test to check that least recently used values are spilled and loaded back"""
+    data_store = SpillableDataStore(memory_budget=1000, directory=str(tmp_path))
+    data_store["array"] = np.arange(100)  # 800 bytes
+    data_store["frame"] = pd.DataFrame({"a": range(100)})
+    data_store["object"] = list(range(100))
+
+    assert data_store.spilled_keys == ["array", "frame"]
+    assert "array" in data_store
+    assert list(data_store) == ["array", "frame", "object"]
+
+    # arrays are memory mapped from disk
+    array = data_store["array"]
+    assert isinstance(array, np.memmap)
+    np.testing.assert_array_equal(array, np.arange(100))
+    pd.testing.assert_frame_equal(data_store["frame"], pd.DataFrame({"a": range(100)}))
+    assert data_store["object"] == list(range(100))
+
+
+def test_delete(tmp_path):
+    """Test to check that deleting a spilled value removes its file"""
+    data_store = SpillableDataStore(memory_budget=0, directory=str(tmp_path))
+    data_store["first"] = [1, 2, 3]
+    data_store["second"] = [4, 5, 6]
+    assert data_store.spilled_keys == ["first"]
+    assert len(list(tmp_path.iterdir())) == 1
+
+    del data_store["first"]
+    assert "first" not in data_store
+    assert len(data_store) == 1
+    assert not list(tmp_path.iterdir())
+    with pytest.raises(KeyError):
+        data_store["first"]  # pylint: disable=pointless-statement
+
+
+def test_memory_size(tmp_path):
+    """Test to check that memory_size follows the values written, replaced, spilled and deleted"""
+    data_store = SpillableDataStore(memory_budget=1000, directory=str(tmp_path))
+    data_store["first"] = np.arange(50)  # 400 bytes
+    data_store["second"] = np.arange(50)
+    assert data_store.memory_size == 800
+    data_store["first"] = np.arange(25)  # replaced by 200 bytes
+    assert data_store.memory_size == 600
+    data_store["third"] = np.arange(100)  # 800 bytes, second is the least recently used
+    assert data_store.spilled_keys == ["second"]
+    assert data_store.memory_size == 1000
+    del data_store["third"]
+    assert data_store.memory_size == 200
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_flow_with_spillable_data_store(max_workers):
+    """Test to check that a Flow runs the same with a SpillableDataStore as with a dict"""
+    expected = ExampleSpillFlow()
+    expected.run()
+
+    flow_instance = ExampleSpillFlow(data_store=SpillableDataStore(memory_budget="4KB"))
+    flow_instance.run(max_workers=max_workers)
+    assert set(flow_instance.data_store.spilled_keys) == {"create", "left", "right"}
+    pd.testing.assert_frame_equal(
+        flow_instance.data_store["combine"], expected.data_store["combine"]
+    )
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import pytest
+
+from flowrunner.runner.trace import get_trace_events, save_trace
+from tests.test_flowrunner.runner.test_report import ExampleReportFlow
+
+
+def _read_slices(path: str) -> dict:
+    """Function to read the node slices of a trace file, {node name: event}"""
+    with open(path, encoding="utf-8") as json_file:
+        events = json.load(json_file)["traceEvents"]
+    return {
+        event["name"]: event
+        for event in events
+        if event["ph"] == "X" and event["cat"] != "run"
+    }
+
+
+@pytest.mark.parametrize(
+    "run_kwargs",
+    [{}, {"max_workers": 2}, {"max_workers": 2, "executor": "process"}],
+)
+def test_run_trace(tmp_path, run_kwargs):
+    """Test to check that run writes a slice for every node on the track of the worker that ran it"""
+    path = str(tmp_path / "trace.json")
+    run_report = ExampleReportFlow(param_store={"day": "2023-06-01"}).run(
+        trace=path, **run_kwargs
+    )
+
+    slices = _read_slices(path)
+    assert set(slices) == {"first", "slow", "large", "last"}
+    assert slices["slow"]["dur"] >= 50_000  # microseconds
+    assert slices["slow"]["ts"] >= slices["first"]["ts"] + slices["first"]["dur"]
+    assert (
+        slices["large"]["args"]["output_size"]
+        == run_report.get_node("large").output_size
+    )
+    assert slices["last"]["args"]["param_store"] == {"day": "2023-06-01"}
+    if run_kwargs.get("executor") == "process":
+        assert slices["slow"]["pid"] != os.getpid()
+    else:
+        assert slices["slow"]["pid"] == os.getpid()
+
+
+def test_trace_tracks():
+    """Test to check that each worker gets its own track and the run gets a slice of its own"""
+    run_report = ExampleReportFlow().run(max_workers=2)
+    events = get_trace_events(run_report, param_store={"model": object()})
+
+    thread_names = {
+        event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"
+    }
+    assert len(thread_names) == len({node.thread_name for node in run_report.nodes})
+    assert 0 not in thread_names  # the track of the run
+    run_slice = events[0]
+    assert run_slice["name"] == "ExampleReportFlow"
+    assert run_slice["dur"] == pytest.approx(run_report.wall_time * 1_000_000, abs=1)
+    assert run_slice["args"]["param_store"]["model"].startswith("<object")
+    json.dumps(events)
+
+
+def test_save_trace_several_runs(tmp_path):
+    """Test to check that the runs in a trace share the same time axis"""
+    first = ExampleReportFlow().run()
+    second = ExampleReportFlow().run()
+    path = str(tmp_path / "trace.json")
+    save_trace([first, second], path)
+
+    with open(path, encoding="utf-8") as json_file:
+        events = json.load(json_file)["traceEvents"]
+    runs = [event for event in events if event["ph"] == "X" and event["cat"] == "run"]
+    assert runs[0]["ts"] == 0
+    assert runs[1]["ts"] >= runs[0]["dur"]
+    assert any(event["name"] == "process_name" for event in events)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from flowrunner import BaseFlow, end, start, step
+from flowrunner.runner.transport import (
+    SharedArrayHandle,
+    SharedFrameHandle,
+    SharedMemoryTransport,
+    attach,
+    close_segments,
+    publish,
+)
+
+
+class ExampleSharedFlow(BaseFlow):
+    """Flow where the steps pass a DataFrame and an array bigger than the min_size used in the tests"""
+
+    @start
+    @step(next=["double", "total"])
+    def create(self):
+        return pd.DataFrame(
+            {"x": np.arange(10_000, dtype="float64"), "y": np.arange(10_000)},
+            index=pd.RangeIndex(10_000, 20_000),
+        )
+
+    @step(next=["combine"])
+    def double(self):
+        return self.data_store["create"]["x"].to_numpy() * 2
+
+    @step(next=["combine"])
+    def total(self):
+        return int(self.data_store["create"]["y"].sum())
+
+    @end
+    @step
+    def combine(self):
+        self.double_is_writeable = self.data_store["double"].flags.writeable
+        return float(self.data_store["double"].sum()) + self.data_store["total"]
+
+
+def test_publish_and_attach_array():
+    """Test to check that an array is mapped read-only from shared memory"""
+    array = np.arange(1000, dtype="int64").reshape(10, 100)
+    handle, segment = publish(array, min_size=0)
+    assert isinstance(handle, SharedArrayHandle)
+
+    shared_array, shared_segment = attach(handle)
+    np.testing.assert_array_equal(shared_array, array)
+    assert not shared_array.flags.writeable
+    del shared_array
+    close_segments([shared_segment])
+    segment.close()
+    segment.unlink()
+
+
+def test_publish_and_attach_frame():
+    """Test to check that a DataFrame of numeric columns is mapped from shared memory"""
+    frame = pd.DataFrame(
+        {
+            "a": np.arange(5, dtype="int8"),
+            "b": np.linspace(0, 1, 5),
+            "c": pd.date_range("2023-01-01", periods=5),
+        },
+        index=list("vwxyz"),
+    )
+    handle, segment = publish(frame, min_size=0)
+    assert isinstance(handle, SharedFrameHandle)
+
+    shared_frame, shared_segment = attach(handle)
+    pd.testing.assert_frame_equal(shared_frame, frame)
+    del shared_frame
+    close_segments([shared_segment])
+    segment.close()
+    segment.unlink()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        np.arange(10),  # smaller than min_size
+        np.array(["a", "b"] * 1000, dtype=object),
+        pd.DataFrame({"a": ["text"] * 1000}),
+        list(range(1000)),
+    ],
+)
+def test_publish_fallback(value):
+    """Test to check that values that are small or cannot be shared are returned as they are"""
+    shipped, segment = publish(value, min_size=1000)
+    assert shipped is value
+    assert segment is None
+    assert attach(shipped) == (value, None)
+
+
+def test_transport_publishes_once():
+    """Test to check that an output is published once and its segment is removed on close"""
+    transport = SharedMemoryTransport(min_size=0)
+    array = np.arange(100)
+    handle = transport.publish("create", array)
+    assert transport.publish("create", array) is handle
+    assert len(transport.segments) == 1
+
+    transport.close({"create": array})
+    assert not transport.segments
+
+
+def test_run_shared_memory():
+    """Test to check that a Flow gives the same results with shared memory and that the
+    results are copied out of shared memory at the end of the run"""
+    expected = ExampleSharedFlow()
+    expected.run()
+
+    flow_instance = ExampleSharedFlow()
+    flow_instance.run(
+        max_workers=2,
+        executor="process",
+        shared_memory=SharedMemoryTransport(min_size=1024),
+    )
+    assert flow_instance.data_store["combine"] == expected.data_store["combine"]
+    assert expected.double_is_writeable
+    # mapped from shared memory in the worker
+    assert not flow_instance.double_is_writeable
+    pd.testing.assert_frame_equal(
+        flow_instance.data_store["create"], expected.data_store["create"]
+    )
+    assert flow_instance.data_store["double"].flags.writeable
+
+
+def test_run_shared_memory_thread_executor():
+    """Test to check that shared memory is only used with the process executor"""
+    with pytest.raises(ValueError):
+        ExampleSharedFlow().run(max_workers=2, shared_memory=True)
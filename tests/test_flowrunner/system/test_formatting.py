@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from flowrunner.system.formatting import format_duration
+
+
+@pytest.mark.parametrize(
+    "seconds, expected",
+    [(None, "-"), (0.0032, "3.2ms"), (1.25, "1.25s"), (90, "90.00s")],
+)
+def test_format_duration(seconds, expected):
+    """Test to check format_duration"""
+    assert format_duration(seconds) == expected
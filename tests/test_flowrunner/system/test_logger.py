@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
+import json
+import logging
+import queue
+
 import pytest
 
-from flowrunner.system.logger import logger
+from flowrunner.system.logger import (
+    LazyQueueHandler,
+    configure_logging,
+    logger,
+    stop_logging,
+)
 
 
 @pytest.fixture(scope="module")
@@ -31,3 +40,67 @@ def test_logger_output(fixture_logger, caplog):
         caplog.records[3].msg,
         "ERROR | hello world error | flowrunner.system.logger:test_logger.py:16",
     )
+
+
+@pytest.fixture
+def restore_logging():
+    """Fixture to put back the default configuration of the logger after a test"""
+    yield
+    configure_logging("development", use_queue=False)
+
+
+def test_configure_logging_json(tmp_path, restore_logging):
+    """Test to check the json profile writes one JSON object per message from the listener thread"""
+    path = str(tmp_path / "flowrunner.log")
+    configure_logging("json", filename=path)
+    logger.debug("hidden")
+    logger.info("Running flow %s", "ExampleFlow")
+    try:
+        1 / 0  # pylint: disable=pointless-statement
+    except ZeroDivisionError:
+        logger.exception("failed")
+    stop_logging()
+
+    with open(path, encoding="utf-8") as log_file:
+        lines = [json.loads(line) for line in log_file]
+    assert [line["message"] for line in lines] == ["Running flow ExampleFlow", "failed"]
+    assert lines[0]["level"] == "INFO"
+    assert lines[0]["thread"] == "MainThread"
+    assert "ZeroDivisionError" in lines[1]["exception"]
+
+
+def test_configure_logging_production(tmp_path, restore_logging):
+    """Test to check the production profile only writes warnings and above"""
+    path = str(tmp_path / "flowrunner.log")
+    configure_logging("production", filename=path)
+    logger.info("hidden")
+    logger.warning("shown %d", 1)
+    stop_logging()
+
+    with open(path, encoding="utf-8") as log_file:
+        content = log_file.read()
+    assert "hidden" not in content
+    assert content.startswith("WARNING | shown 1 |")
+
+
+def test_configure_logging_bad_profile():
+    """Test to check that only the known profiles can be used"""
+    with pytest.raises(ValueError):
+        configure_logging("verbose")
+
+
+def test_lazy_queue_handler():
+    """Test to check that messages are only formatted when they are enqueued if their arguments can change"""
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    record = logging.LogRecord(
+        "flowrunner", logging.INFO, __file__, 1, "%s took %d", ("load", 3), None
+    )
+    assert handler.prepare(record).args == ("load", 3)
+
+    data_store = {"load": 1}
+    record = logging.LogRecord(
+        "flowrunner", logging.INFO, __file__, 1, "%s", (data_store,), None
+    )
+    handler.prepare(record)
+    data_store["load"] = 2
+    assert record.getMessage() == "{'load': 1}"
@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 """Commands to check the cli"""
 
+import json
+import os
+
 import pytest
 from click.testing import CliRunner
 
-from flowrunner.cli import cli, display, display_dir, init, run, show, validate
+from flowrunner.cli import cli, display, display_dir, init, plan, run, show, validate
+from flowrunner.system.logger import configure_logging, stop_logging
 
 
 @pytest.fixture(scope="session")
@@ -85,3 +89,246 @@ def test_cli():
     runner = CliRunner()
     result = runner.invoke(cli)
     assert result.exit_code == 0
+
+
+def test_run_workers():
+    """Test to check cli::run function with the --workers option"""
+    runner = CliRunner()
+    result = runner.invoke(run, ["--workers", "2", "examples/example.py"])
+    assert result.exit_code == 0
+
+
+def test_run_process_executor():
+    """Test to check cli::run function with the process executor"""
+    runner = CliRunner()
+    result = runner.invoke(
+        run, ["--workers", "2", "--executor", "process", "examples/example.py"]
+    )
+    assert result.exit_code == 0
+
+
+def test_cache_stats_and_clear(tmp_path):
+    """Test to check cli::cache stats and clear commands"""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cache", "stats", f"--directory={tmp_path}"])
+    assert result.exit_code == 0
+    assert "Total: 0 entries" in result.output
+
+    result = runner.invoke(cli, ["cache", "clear", f"--directory={tmp_path}"])
+    assert result.exit_code == 0
+    assert "Removed 0 entries" in result.output
+
+
+def test_run_checkpoint_and_resume(tmp_path, monkeypatch):
+    """Test to check cli::run function with the --checkpoint and --resume options"""
+    example_path = os.path.abspath("examples/example.py")
+    # checkpoints are stored relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    result = runner.invoke(run, ["--checkpoint", example_path])
+    assert result.exit_code == 0
+    run_id = result.output.split("Run id: ")[1].split()[0]
+
+    result = runner.invoke(run, ["--resume", run_id, example_path])
+    assert result.exit_code == 0
+
+
+def test_run_memory_budget():
+    """Test to check cli::run function with the --memory-budget option"""
+    runner = CliRunner()
+    result = runner.invoke(run, ["--memory-budget", "1KB", "examples/example.py"])
+    assert result.exit_code == 0
+
+    result = runner.invoke(run, ["--memory-budget", "lots", "examples/example.py"])
+    assert result.exit_code != 0
+    assert "--memory-budget" in result.output
+
+
+def test_run_shared_memory():
+    """Test to check cli::run function with the --shared-memory option"""
+    runner = CliRunner()
+    result = runner.invoke(
+        run,
+        [
+            "--workers",
+            "2",
+            "--executor",
+            "process",
+            "--shared-memory",
+            "examples/example.py",
+        ],
+    )
+    assert result.exit_code == 0
+
+    result = runner.invoke(run, ["--shared-memory", "examples/example.py"])
+    assert result.exit_code != 0
+
+
+def test_run_profile(tmp_path):
+    """Test to check cli::run function with the --profile and --report options"""
+    report_path = str(tmp_path / "report.json")
+    runner = CliRunner()
+    result = runner.invoke(
+        run, ["--profile", "--report", report_path, "examples/example.py"]
+    )
+    assert result.exit_code == 0
+    assert "Total:" in result.output
+    assert os.path.exists(report_path)
+
+
+def test_display_report(tmp_path):
+    """Test to check cli::display function with the report of a run written by run --report"""
+    report_path = str(tmp_path / "report.json")
+    runner = CliRunner()
+    runner.invoke(run, ["--report", report_path, "examples/example.py"])
+    result = runner.invoke(
+        display,
+        ["examples/example.py", f"--path={tmp_path}/", "--report", report_path],
+    )
+    assert result.exit_code == 0
+    html_files = list(tmp_path.glob("*.html"))
+    assert html_files
+    assert "critical path:" in html_files[0].read_text(encoding="utf-8")
+
+
+def test_plan(tmp_path):
+    """Test to check cli::plan function, with and without the report of a run written by run --report"""
+    runner = CliRunner()
+    result = runner.invoke(plan, ["--max-workers", "2", "examples/example.py"])
+    assert result.exit_code == 0
+    assert "critical_path" in result.output
+
+    report_path = str(tmp_path / "report.json")
+    runner.invoke(run, ["--report", report_path, "examples/example.py"])
+    result = runner.invoke(plan, ["--report", report_path, "examples/example.py"])
+    assert result.exit_code == 0
+
+
+def test_run_trace(tmp_path):
+    """Test to check cli::run function with the --trace option"""
+    trace_path = str(tmp_path / "trace.json")
+    runner = CliRunner()
+    result = runner.invoke(
+        run, ["--trace", trace_path, "--workers", "2", "examples/example.py"]
+    )
+    assert result.exit_code == 0
+    with open(trace_path, encoding="utf-8") as json_file:
+        assert json.load(json_file)["traceEvents"]
+
+
+def test_run_profile_steps(tmp_path):
+    """Test to check cli::run function with the --profile-steps option"""
+    runner = CliRunner()
+    result = runner.invoke(
+        run,
+        [
+            "--profile-steps",
+            "--top",
+            "3",
+            f"--profile-dir={tmp_path}",
+            "examples/example.py",
+        ],
+    )
+    assert result.exit_code == 0
+    assert (tmp_path / "ExampleFlow.folded").exists()
+
+
+def test_cli_log_profile(tmp_path):
+    """Test to check cli::cli function with the --log-profile option"""
+    log_path = str(tmp_path / "flowrunner.log")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["--log-profile", "json", "--log-file", log_path, "run", "examples/example.py"],
+    )
+    stop_logging()
+    configure_logging("development", use_queue=False)
+    assert result.exit_code == 0
+    with open(log_path, encoding="utf-8") as log_file:
+        assert json.loads(log_file.readline())["message"].startswith("Found Flows")
+
+
+def test_validate_directory(tmp_path):
+    """Test to check cli::validate function on a directory and a glob pattern with the --jobs option"""
+    (tmp_path / "nested").mkdir()
+    with open("examples/example.py", encoding="utf-8") as example_file:
+        example = example_file.read()
+    (tmp_path / "first.py").write_text(example)
+    (tmp_path / "nested" / "second.py").write_text(example)
+    runner = CliRunner()
+    result = runner.invoke(validate, ["--jobs", "2", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "4 passed, 0 failed" in result.output
+
+    result = runner.invoke(show, [str(tmp_path / "**" / "second.py")])
+    assert result.exit_code == 0
+
+    (tmp_path / "nested" / "broken.py").write_text("import not_a_module\n")
+    result = runner.invoke(validate, ["--jobs", "2", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "4 passed, 1 failed" in result.output
+
+    result = runner.invoke(validate, [str(tmp_path / "missing.py")])
+    assert result.exit_code != 0
+
+
+def test_display_directory_incremental(tmp_path):
+    """Test to check that cli::display_dir only renders the DAGs of the Flows which changed"""
+    flow_directory = tmp_path / "flows"
+    (flow_directory / "nested").mkdir(parents=True)
+    with open("examples/example.py", encoding="utf-8") as example_file:
+        example = example_file.read()
+    (flow_directory / "first.py").write_text(example)
+    (flow_directory / "nested" / "second.py").write_text(
+        example.replace("ExampleFlow", "OtherFlow")
+    )
+    output_path = f"--path={tmp_path / 'dags'}"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        display_dir, ["--jobs", "2", output_path, str(flow_directory)]
+    )
+    assert result.exit_code == 0
+    assert "Rendered 4 of 4 DAGs, 0 unchanged files skipped" in result.output
+    assert (tmp_path / "dags" / "index.html").exists()
+    assert (tmp_path / "dags" / "otherflow2.html").exists()
+
+    result = runner.invoke(display_dir, [output_path, str(flow_directory)])
+    assert "Rendered 0 of 4 DAGs, 2 unchanged files skipped" in result.output
+
+    # a change outside of the steps does not change the DAGs
+    (flow_directory / "first.py").write_text(example + "\nx = 1\n")
+    result = runner.invoke(display_dir, [output_path, str(flow_directory)])
+    assert "Rendered 0 of 4 DAGs, 1 unchanged files skipped" in result.output
+
+    (flow_directory / "nested" / "second.py").unlink()
+    result = runner.invoke(display_dir, [output_path, str(flow_directory)])
+    assert "Rendered 0 of 2 DAGs" in result.output
+    assert not (tmp_path / "dags" / "otherflow2.html").exists()
+
+    result = runner.invoke(display_dir, ["--force", output_path, str(flow_directory)])
+    assert "Rendered 2 of 2 DAGs" in result.output
+
+
+def test_run_target_and_from():
+    """Test to check cli::run function with the --target and --from options"""
+    runner = CliRunner()
+    result = runner.invoke(run, ["--target", "method2", "examples/example.py"])
+    assert result.exit_code == 0
+
+    result = runner.invoke(run, ["--from", "method3", "examples/example.py"])
+    assert result.exit_code == 0
+
+    result = runner.invoke(run, ["--target", "missing", "examples/example.py"])
+    assert result.exit_code == 1
+
+
+def test_run_incremental(tmp_path):
+    """Test to check cli::run function with the --incremental option"""
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(
+            run, ["--incremental", f"--state-dir={tmp_path}", "examples/example.py"]
+        )
+        assert result.exit_code == 0
+    assert os.path.exists(os.path.join(tmp_path, "ExampleFlow", "fingerprints.json"))
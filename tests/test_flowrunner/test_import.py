@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Tests to check that importing flowrunner does not import its heavy dependencies
+
+The import time itself is checked against a budget by benchmarks/import_time.py, outside of the test suite
+"""
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_time import HEAVY_MODULES
+
+
+@pytest.mark.parametrize("module", ["flowrunner", "flowrunner.cli"])
+def test_import_without_heavy_modules(module):
+    """Test to check that the heavy dependencies are only imported when they are used"""
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(','.join(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {name.split(".")[0] for name in process.stdout.strip().split(",")}
+    assert not imported & set(HEAVY_MODULES)
+
+
+def test_logger_installs_coloredlogs_on_first_message():
+    """Test to check that coloredlogs and the QueueListener thread are started by the first message and the level
+    of the logger is kept"""
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import logging, sys, threading\n"
+            "from flowrunner.system.logger import LazyQueueHandler, logger\n"
+            "logger.setLevel(logging.WARNING)\n"
+            "logger.info('hidden')\n"
+            "assert 'coloredlogs' not in sys.modules\n"
+            "assert threading.active_count() == 1\n"
+            "logger.warning('shown')\n"
+            "assert isinstance(logger.handlers[0], LazyQueueHandler)\n"
+            "assert threading.active_count() == 2\n"
+            "assert logger.level == logging.WARNING\n",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "shown" in process.stderr
+    assert "hidden" not in process.stderr